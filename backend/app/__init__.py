@@ -1,7 +1,23 @@
 from flask import Flask, g, jsonify
 from flask_cors import CORS
+import threading
+import logging
 import os
 
+# Queue each task is routed to. Shared by Celery and the in-process executor.
+TASK_ROUTES = {
+    'app.tasks.ai_tasks.generate_summary_task': {'queue': 'llm'},
+    'app.tasks.ai_tasks.generate_quiz_task': {'queue': 'llm'},
+    'app.tasks.ai_tasks.precompute_quizzes_task': {'queue': 'maintenance'},
+    'app.tasks.ai_tasks.cleanup_old_chats_task': {'queue': 'maintenance'},
+    'app.tasks.ai_tasks.apply_retention_task': {'queue': 'maintenance'},
+    'app.tasks.ai_tasks.rebuild_user_stats_task': {'queue': 'maintenance'},
+    'app.tasks.ai_tasks.backfill_usage_task': {'queue': 'maintenance'},
+    'app.tasks.ai_tasks.rebuild_tutor_stats_task': {'queue': 'maintenance'},
+    'app.tasks.ai_tasks.daily_maintenance_task': {'queue': 'maintenance'},
+    'app.tasks.bulk_tasks.bulk_generate_task': {'queue': 'llm'},
+}
+
 def create_app(config_name=None):
     """Application factory pattern."""
     app = Flask(__name__)
@@ -69,6 +85,10 @@ def create_app(config_name=None):
         }), 401
     
     # Configure Celery
+    # LLM-bound tasks go to the I/O-optimized 'llm' queue, housekeeping to the
+    # low-priority 'maintenance' queue; see WORKERS_README.md for worker profiles.
+    from celery.schedules import crontab
+    from kombu import Queue
     celery.conf.update(
         broker_url=app.config['CELERY_BROKER_URL'],
         result_backend=app.config['CELERY_RESULT_BACKEND'],
@@ -77,8 +97,95 @@ def create_app(config_name=None):
         result_serializer='json',
         timezone='UTC',
         enable_utc=True,
+        imports=('app.tasks.ai_tasks', 'app.tasks.bulk_tasks', 'app.tasks.notification_tasks'),
+        task_queues=(
+            Queue('llm', routing_key='llm', queue_arguments={'x-max-priority': 10}),
+            Queue('default', routing_key='default', queue_arguments={'x-max-priority': 10}),
+            Queue('maintenance', routing_key='maintenance', queue_arguments={'x-max-priority': 10}),
+        ),
+        task_default_queue='default',
+        task_default_priority=5,
+        task_queue_max_priority=10,
+        task_routes=TASK_ROUTES,
+        task_annotations={
+            'app.tasks.ai_tasks.generate_summary_task': {
+                'priority': 8,
+                'soft_time_limit': app.config['CELERY_LLM_SOFT_TIME_LIMIT'],
+                'time_limit': app.config['CELERY_LLM_SOFT_TIME_LIMIT'] + 30,
+            },
+            'app.tasks.ai_tasks.generate_quiz_task': {
+                'priority': 8,
+                'soft_time_limit': app.config['CELERY_LLM_SOFT_TIME_LIMIT'],
+                'time_limit': app.config['CELERY_LLM_SOFT_TIME_LIMIT'] + 30,
+            },
+            'app.tasks.bulk_tasks.bulk_generate_task': {
+                'priority': 4,
+                'soft_time_limit': app.config['CELERY_MAINTENANCE_SOFT_TIME_LIMIT'],
+            },
+            'app.tasks.ai_tasks.precompute_quizzes_task': {
+                'priority': 2,
+                'soft_time_limit': app.config['CELERY_MAINTENANCE_SOFT_TIME_LIMIT'],
+            },
+            'app.tasks.ai_tasks.cleanup_old_chats_task': {
+                'priority': 0,
+                'soft_time_limit': app.config['CELERY_MAINTENANCE_SOFT_TIME_LIMIT'],
+            },
+            'app.tasks.ai_tasks.apply_retention_task': {
+                'priority': 0,
+                'soft_time_limit': app.config['CELERY_MAINTENANCE_SOFT_TIME_LIMIT'],
+            },
+            'app.tasks.ai_tasks.rebuild_user_stats_task': {
+                'priority': 0,
+                'soft_time_limit': app.config['CELERY_MAINTENANCE_SOFT_TIME_LIMIT'],
+            },
+            'app.tasks.ai_tasks.backfill_usage_task': {
+                'priority': 0,
+                'soft_time_limit': app.config['CELERY_MAINTENANCE_SOFT_TIME_LIMIT'],
+            },
+            'app.tasks.ai_tasks.rebuild_tutor_stats_task': {
+                'priority': 0,
+                'soft_time_limit': app.config['CELERY_MAINTENANCE_SOFT_TIME_LIMIT'],
+            },
+            'app.tasks.ai_tasks.daily_maintenance_task': {
+                'priority': 0,
+                'soft_time_limit': app.config['CELERY_MAINTENANCE_SOFT_TIME_LIMIT'],
+            },
+        },
+        # Fetch one task at a time by default; the llm worker profile raises this on the command line
+        worker_prefetch_multiplier=1,
+        task_acks_late=True,
+        beat_schedule={
+            'flush-notifications': {
+                'task': 'app.tasks.notification_tasks.flush_notifications_task',
+                'schedule': app.config['NOTIFICATION_WINDOW'],
+            },
+            'precompute-quizzes': {
+                'task': 'app.tasks.ai_tasks.precompute_quizzes_task',
+                'schedule': crontab(hour=app.config['QUIZ_PRECOMPUTE_HOUR'], minute=0),
+            },
+            'apply-retention': {
+                'task': 'app.tasks.ai_tasks.apply_retention_task',
+                'schedule': crontab(hour=app.config['RETENTION_HOUR'], minute=0),
+            },
+            'rebuild-user-stats': {
+                'task': 'app.tasks.ai_tasks.rebuild_user_stats_task',
+                'schedule': crontab(hour=app.config['RETENTION_HOUR'], minute=30, day_of_week='sun'),
+            },
+            'rebuild-tutor-stats': {
+                'task': 'app.tasks.ai_tasks.rebuild_tutor_stats_task',
+                'schedule': crontab(hour=app.config['RETENTION_HOUR'], minute=45, day_of_week='sun'),
+            },
+            'backfill-usage': {
+                'task': 'app.tasks.ai_tasks.backfill_usage_task',
+                'schedule': crontab(hour=app.config['RETENTION_HOUR'], minute=15),
+            },
+        },
     )
     
+    # Fall back to an in-process executor when no broker is configured
+    from app.tasks.backend import task_backend
+    task_backend.init_app(app)
+    
     # Enable CORS
     CORS(app, supports_credentials=True)
     
@@ -98,6 +205,14 @@ def create_app(config_name=None):
     # Register middleware
     from app.middlewares import register_middlewares
     register_middlewares(app)
+    
+    # Register CLI commands (flask ensure-indexes, flask index-report)
+    from app.commands import register_commands
+    register_commands(app)
+    
+    # Sync model indexes without holding up startup
+    if app.config.get('INDEX_SYNC_ON_STARTUP'):
+        threading.Thread(target=_sync_indexes, args=(app,), daemon=True).start()
 
     # JWT error handlers: provide clear JSON responses instead of default 422
     from flask_jwt_extended.exceptions import NoAuthorizationError, JWTExtendedException
@@ -126,5 +241,16 @@ def create_app(config_name=None):
     
     return app
 
+def _sync_indexes(app):
+    """Build missing indexes declared on the models."""
+    from app.models.indexes import Indexes
+    with app.app_context():
+        try:
+            result = Indexes.ensure()
+            if result['created'] or result['failed'] or result['conflicts']:
+                app.logger.info(f"Index sync: {result}")
+        except Exception as e:
+            logging.error(f"Index sync failed: {str(e)}")
+
 # Import for Celery worker
 from app.extensions import celery
\ No newline at end of file
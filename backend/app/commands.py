@@ -0,0 +1,53 @@
+import json
+import click
+
+def register_commands(app):
+    """Register maintenance CLI commands (``flask <command>``)."""
+
+    @app.cli.command('ensure-indexes')
+    @click.option('--dry-run', is_flag=True, help='Only list the indexes that would be built.')
+    def ensure_indexes(dry_run):
+        """Build indexes declared on the models that are missing from MongoDB."""
+        from app.models.indexes import Indexes
+        click.echo(json.dumps(Indexes.ensure(dry_run=dry_run), indent=2, default=str))
+
+    @app.cli.command('migrate-message-users')
+    @click.option('--batch-size', default=500, show_default=True, help='Chats per bulk write.')
+    def migrate_message_users(batch_size):
+        """Backfill user_id onto messages and switch search to the per-user text index."""
+        from app.models.message import Message
+        from app.models.indexes import Indexes
+        click.echo(f"Backfilled user_id on {Message.backfill_user_ids(batch_size)} messages")
+        dropped = Message.drop_legacy_text_index()
+        if dropped:
+            click.echo(f"Dropped legacy index messages.{dropped}")
+        click.echo(json.dumps(Indexes.ensure(), indent=2, default=str))
+
+    @app.cli.command('backfill-usage')
+    @click.option('--days', default=365, show_default=True, help='Complete days to rebuild, ending yesterday.')
+    def backfill_usage(days):
+        """Rebuild hourly and daily usage buckets from historical AI messages."""
+        from datetime import datetime, timedelta
+        from app.models.usage import UsageBucket
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        click.echo(f"Wrote {UsageBucket.backfill(today - timedelta(days=days), today)} usage buckets")
+
+    @app.cli.command('migrate-school-keys')
+    @click.option('--batch-size', default=1000, show_default=True, help='Documents per bulk write.')
+    def migrate_school_keys(batch_size):
+        """Backfill school_key on users and tutors and rebuild the schools registry."""
+        from app.models.school import School
+        click.echo(json.dumps(School.rebuild(batch_size), indent=2))
+
+    @app.cli.command('index-report')
+    def index_report():
+        """List unused, redundant and undeclared indexes."""
+        from app.models.indexes import Indexes
+        findings = Indexes.report()
+        for finding in findings:
+            details = ', '.join(
+                f"{k}={v}" for k, v in finding.items() if k not in ('collection', 'index', 'issue')
+            )
+            click.echo(f"{finding['issue']:<10} {finding['collection']}.{finding['index']} {details}".rstrip())
+        if not findings:
+            click.echo('No index issues found')
@@ -31,6 +31,62 @@ class Config:
     CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL')
     CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND')
     
+    CELERY_LLM_SOFT_TIME_LIMIT = int(os.environ.get('CELERY_LLM_SOFT_TIME_LIMIT', 60))  # seconds
+    CELERY_MAINTENANCE_SOFT_TIME_LIMIT = int(os.environ.get('CELERY_MAINTENANCE_SOFT_TIME_LIMIT', 1800))  # seconds
+    GEMINI_REQUEST_TIMEOUT = int(os.environ.get('GEMINI_REQUEST_TIMEOUT', 45))  # seconds, per model call
+    
+    # In-process task executor (used when CELERY_BROKER_URL is not set)
+    TASK_EXECUTOR_WORKERS = int(os.environ.get('TASK_EXECUTOR_WORKERS', 4))  # 'llm' queue threads
+    TASK_EXECUTOR_QUEUE_WORKERS = {'default': 2, 'maintenance': 1}
+    TASK_EXECUTOR_MAX_PENDING = int(os.environ.get('TASK_EXECUTOR_MAX_PENDING', 100))
+    TASK_RESULT_STORE = os.environ.get('TASK_RESULT_STORE', 'memory')  # 'memory' or 'mongo'
+    TASK_RESULT_TTL = int(os.environ.get('TASK_RESULT_TTL', 3600))  # seconds
+    TASK_STREAM_TIMEOUT = int(os.environ.get('TASK_STREAM_TIMEOUT', 300))  # seconds an SSE stream stays open
+    
+    # Quiz cache
+    QUIZ_CACHE_TTL = int(os.environ.get('QUIZ_CACHE_TTL', 7 * 24 * 3600))  # seconds
+    QUIZ_PRECOMPUTE_HOUR = int(os.environ.get('QUIZ_PRECOMPUTE_HOUR', 3))  # UTC, off-peak
+    QUIZ_PRECOMPUTE_WINDOW_HOURS = 24
+    QUIZ_PRECOMPUTE_LIMIT = 500
+    
+    # Notifications: staged entries are coalesced per user and delivered every window
+    NOTIFICATION_WINDOW = int(os.environ.get('NOTIFICATION_WINDOW', 30))  # seconds
+    NOTIFICATION_BATCH_SIZE = 5000  # outbox entries per flush
+    
+    # Bulk summary/quiz jobs
+    BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 100))  # chats per checkpoint
+    BULK_LLM_CONCURRENCY = int(os.environ.get('BULK_LLM_CONCURRENCY', 8))  # concurrent model calls per job
+    
+    # Admin dashboard statistics are cached per process for this long
+    PLATFORM_STATS_TTL = int(os.environ.get('PLATFORM_STATS_TTL', 60))  # seconds
+    
+    # Tutor catalog snapshot: how often each process checks the shared version
+    # counter bumped by admin writes, and the age at which it reloads regardless
+    TUTOR_CATALOG_VERSION_CHECK = int(os.environ.get('TUTOR_CATALOG_VERSION_CHECK', 5))  # seconds
+    TUTOR_CATALOG_TTL = int(os.environ.get('TUTOR_CATALOG_TTL', 300))  # seconds
+    
+    # Build missing model indexes in a background thread when the app starts
+    # (or run `flask ensure-indexes`)
+    INDEX_SYNC_ON_STARTUP = os.environ.get('INDEX_SYNC_ON_STARTUP', 'true').lower() == 'true'
+    
+    # Data retention: 'ttl' collections expire through a TTL index, 'partition'
+    # collections are written per month and dropped whole, 'sweep' collections
+    # are deleted in index-driven chunks together with their dependents.
+    RETENTION_HOUR = int(os.environ.get('RETENTION_HOUR', 4))  # UTC, off-peak
+    RETENTION_POLICIES = {
+        'chats': {
+            'strategy': 'sweep',
+            'field': 'last_activity',
+            'days': 90,
+            'filter': {'message_count': {'$lt': 5}},  # only near-empty chats
+            'schools': {},  # per-school overrides by name, matched normalized, e.g. {'MIT': 365}
+        },
+        'notifications': {'strategy': 'partition', 'months': 6},
+        'notification_outbox': {'strategy': 'ttl', 'field': 'created_at', 'days': 7},
+        'task_results': {'strategy': 'ttl', 'field': 'date_done', 'seconds': TASK_RESULT_TTL},
+        'quiz_cache': {'strategy': 'ttl', 'field': 'expires_at', 'seconds': 0},
+    }
+    
     # File upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     
@@ -44,7 +100,8 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
-    MONGO_URI = 'mongodb://localhost:27017/learning_platform_test'
+    MONGO_URI = os.environ.get('TEST_MONGO_URI', 'mongodb://localhost:27017/learning_platform_test')
+    INDEX_SYNC_ON_STARTUP = False
     
 class ProductionConfig(Config):
     """Production configuration."""
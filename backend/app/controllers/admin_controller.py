@@ -1,8 +1,9 @@
 from app.models.user import User
 from app.models.tutor import Tutor
-from app.models.chat import Chat
-from app.models.message import Message
-from app.models.rating import Rating
+from app.models.platform_stats import PlatformStats
+from app.models.usage import UsageBucket
+from app.models.tutor_catalog import TutorCatalog
+from app.utils.helpers import normalize_school
 from datetime import datetime, timedelta
 from typing import List, Dict
 from app.extensions import mongo
@@ -55,6 +56,12 @@ class AdminController:
             )
 
             if result.modified_count > 0:
+                from app.tasks.notification_tasks import notify
+                notify([{
+                    'user_id': student_id,
+                    'message': 'Your account has been verified. You can now sign in.',
+                    'type': 'verification'
+                }])
                 return {
                     'success': True,
                     'message': 'Student verified successfully'
@@ -78,16 +85,7 @@ class AdminController:
             if not admin or admin.get('role') != 'admin':
                 return {'success': False, 'message': 'Admin not found or unauthorized'}
 
-            total_students = len(User.find_all_students())
-            verified_students = len(User.find_all_students(verified_only=True))
-            pending_students = total_students - verified_students
-
-            total_tutors = len(Tutor.find_all(active_only=False))
-            active_tutors = len(Tutor.find_all(active_only=True))
-
-            thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-            avg_rating = Rating.get_average_rating()
-            token_stats = Message.get_token_usage_stats(date_from=thirty_days_ago)
+            stats = PlatformStats.get()
 
             return {
                 'success': True,
@@ -99,25 +97,38 @@ class AdminController:
                     'created_at': admin['created_at']
                 },
                 'stats': {
-                    'students': {
-                        'total': total_students,
-                        'verified': verified_students,
-                        'pending_verification': pending_students
-                    },
-                    'tutors': {
-                        'total': total_tutors,
-                        'active': active_tutors
-                    },
+                    'students': stats['students'],
+                    'tutors': stats['tutors'],
                     'ai_usage': {
-                        'avg_rating': avg_rating,
-                        'tokens_used_30d': token_stats.get('total_tokens', 0),
-                        'messages_30d': token_stats.get('total_messages', 0)
+                        'avg_rating': stats['ai_usage']['avg_rating'],
+                        'tokens_used_30d': stats['ai_usage']['tokens_used_30d'],
+                        'messages_30d': stats['ai_usage']['messages_30d']
                     }
                 }
             }
         except Exception as e:
             return {'success': False, 'message': f'Failed to get admin profile: {str(e)}'}
 
+    @staticmethod
+    def get_platform_stats() -> dict:
+        """Get platform statistics (cached snapshot, see PlatformStats)."""
+        try:
+            return {'success': True, 'stats': PlatformStats.get()}
+        except Exception as e:
+            return {'success': False, 'message': f'Failed to get platform stats: {str(e)}'}
+
+    @staticmethod
+    def get_usage(days: int = 30, user_id: str = None) -> dict:
+        """Get AI usage for the last ``days`` days from the usage buckets."""
+        try:
+            if user_id and not ObjectId.is_valid(user_id):
+                return {'success': False, 'message': 'Invalid user id'}
+
+            date_from = datetime.utcnow() - timedelta(days=days)
+            return {'success': True, 'days': days, 'usage': UsageBucket.usage(date_from, user_id=user_id)}
+        except Exception as e:
+            return {'success': False, 'message': f'Failed to get usage: {str(e)}'}
+
     @staticmethod
     def add_tutor(admin_id: str, tutor_data: dict) -> dict:
         """Add a new tutor."""
@@ -159,11 +170,128 @@ class AdminController:
             )
 
             tutor_id = tutor.save()
+            TutorCatalog.invalidate()
             return {'success': True, 'message': 'Tutor added successfully', 'tutor_id': tutor_id}
 
         except Exception as e:
             return {'success': False, 'message': f'Failed to add tutor: {str(e)}'}
 
+    @staticmethod
+    def start_bulk_job(admin_id: str, data: dict) -> dict:
+        """Start a bulk summary/quiz generation job for a cohort of students."""
+        try:
+            from app.models.bulk_job import BulkJob
+            from app.tasks.bulk_tasks import bulk_generate_task
+            from app.tasks.backend import task_backend
+
+            kind = data.get('kind')
+            if kind not in BulkJob.KINDS:
+                return {'success': False, 'message': f'Kind must be one of: {", ".join(BulkJob.KINDS)}'}
+
+            school = data.get('school')
+            user_ids = data.get('user_ids') or []
+            if not school and not user_ids:
+                return {'success': False, 'message': 'Provide a school or a list of user_ids'}
+
+            if not isinstance(user_ids, list) or not all(ObjectId.is_valid(uid) for uid in user_ids):
+                return {'success': False, 'message': 'user_ids must be a list of valid ids'}
+
+            job = BulkJob(
+                kind=kind,
+                created_by=admin_id,
+                school=school,
+                user_ids=user_ids,
+                topic=data.get('topic')
+            )
+            job_id = job.save()
+
+            task = task_backend.delay(bulk_generate_task, job_id)
+            return {
+                'success': True,
+                'message': 'Bulk job started',
+                'job_id': job_id,
+                'task_id': task.id
+            }
+
+        except Exception as e:
+            return {'success': False, 'message': f'Failed to start bulk job: {str(e)}'}
+
+    @staticmethod
+    def get_bulk_job(job_id: str) -> dict:
+        """Get bulk job progress."""
+        try:
+            from app.models.bulk_job import BulkJob
+
+            job = BulkJob.find_by_id(job_id)
+            if not job:
+                return {'success': False, 'message': 'Bulk job not found'}
+
+            return {'success': True, 'job': BulkJob.to_dict(job)}
+
+        except Exception as e:
+            return {'success': False, 'message': f'Failed to get bulk job: {str(e)}'}
+
+    @staticmethod
+    def resume_bulk_job(job_id: str) -> dict:
+        """Resume a paused or failed bulk job from its checkpoint."""
+        try:
+            from app.models.bulk_job import BulkJob
+            from app.tasks.bulk_tasks import bulk_generate_task
+            from app.tasks.backend import task_backend
+
+            job = BulkJob.find_by_id(job_id)
+            if not job:
+                return {'success': False, 'message': 'Bulk job not found'}
+
+            if job['status'] not in ('paused', 'failed'):
+                return {'success': False, 'message': f"Bulk job is {job['status']}"}
+
+            BulkJob.set_status(job_id, 'pending')
+            task = task_backend.delay(bulk_generate_task, job_id)
+            return {
+                'success': True,
+                'message': 'Bulk job resumed',
+                'job_id': job_id,
+                'task_id': task.id
+            }
+
+        except Exception as e:
+            return {'success': False, 'message': f'Failed to resume bulk job: {str(e)}'}
+
+    @staticmethod
+    def send_notification(data: dict) -> dict:
+        """Notify every student of a school (or a list of users) with one job."""
+        try:
+            from app.tasks.notification_tasks import send_bulk_notification_task
+            from app.tasks.backend import task_backend
+
+            message = (data.get('message') or '').strip()
+            if not message:
+                return {'success': False, 'message': 'Message cannot be empty'}
+
+            user_ids = data.get('user_ids') or []
+            if not isinstance(user_ids, list) or not all(ObjectId.is_valid(uid) for uid in user_ids):
+                return {'success': False, 'message': 'user_ids must be a list of valid ids'}
+
+            # The task pages through the school's students itself
+            school = data.get('school') or None
+            recipients = len(user_ids) + (User.count_students_at_school(school) if school else 0)
+            if not recipients:
+                return {'success': False, 'message': 'No recipients matched'}
+
+            task = task_backend.delay(
+                send_bulk_notification_task, user_ids, message, data.get('type', 'info'), school
+            )
+            return {
+                'success': True,
+                'message': 'Notification queued',
+                'recipients': recipients,
+                'task_id': task.id
+            }
+
+        except Exception as e:
+            return {'success': False, 'message': f'Failed to send notification: {str(e)}'}
+
     @staticmethod
     def update_profile(admin_id: str, data: dict) -> dict:
         """Update admin profile (name, email, school) safely."""
@@ -173,6 +301,8 @@ class AdminController:
 
             if not update_data:
                 return {'success': False, 'message': 'No valid fields to update'}
+            if 'school' in update_data:
+                update_data['school_key'] = normalize_school(update_data['school'])
 
             result = mongo.db.users.update_one(
                 {'_id': ObjectId(admin_id), 'role': 'admin'},
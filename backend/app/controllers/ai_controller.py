@@ -2,9 +2,11 @@ import google.generativeai as genai
 from app.models.chat import Chat
 from app.models.message import Message
 from app.models.tutor import Tutor
+from app.models.usage import UsageBucket
 # Redis removed; rate limiting will be handled in-process or via external service if added
 from flask import current_app
 import json
+import logging
 import time
 from typing import List, Dict
 
@@ -61,7 +63,7 @@ class AIController:
         # No-op: Redis removed. Implement counters if needed.
         return
     
-    def chat_with_ai(self, user_id: str, chat_id: str, message: str) -> dict:
+    def chat_with_ai(self, user_id: str, chat_id: str, message: str, school: str = None) -> dict:
         """Process AI chat interaction."""
         try:
             # Validate inputs
@@ -96,6 +98,7 @@ class AIController:
             # Save user message
             user_message = Message(
                 chat_id=chat_id,
+                user_id=user_id,
                 sender='user',
                 text=message.strip()
             )
@@ -138,6 +141,7 @@ class AIController:
             # Save AI response
             ai_message = Message(
                 chat_id=chat_id,
+                user_id=user_id,
                 sender='ai',
                 text=ai_response,
                 tokens_used=tokens_used,
@@ -149,8 +153,13 @@ class AIController:
             )
             ai_message_id = ai_message.save()
             
-            # Update chat activity
+            # Update chat activity and usage rollups
             Chat.update_activity(chat_id, tokens_used)
+            try:
+                UsageBucket.record(user_id, tokens_used, model='gemini-pro', school=school, latency=response_time)
+            except Exception as e:
+                # Analytics must never fail a saved chat turn; backfill-usage repairs the buckets
+                logging.error(f"Failed to record usage for chat {chat_id}: {str(e)}")
             
             # Increment rate limits
             self._increment_rate_limit(user_id)
@@ -1,6 +1,7 @@
 from flask_jwt_extended import create_access_token, create_refresh_token
 from app.utils.helpers import jwt_current_user
 from app.models.user import User
+from app.models.school import School
 from app.utils.validators import validate_email, validate_password
 from datetime import datetime
 
@@ -131,7 +132,8 @@ class AuthController:
             additional = {
                 'user_id': uid_str,  # <-- add this line
                 'email': user_data['email'],
-                'role': user_data['role']
+                'role': user_data['role'],
+                'school': user_data.get('school')
             }
 
             access_token = create_access_token(identity=uid_str, additional_claims=additional)
@@ -192,7 +194,8 @@ class AuthController:
 
             additional = {
                 'email': current_user.get('email') if isinstance(current_user, dict) else None,
-                'role': current_user.get('role') if isinstance(current_user, dict) else None
+                'role': current_user.get('role') if isinstance(current_user, dict) else None,
+                'school': user_data.get('school')
             }
 
             access_token = create_access_token(identity=str(uid), additional_claims=additional)
@@ -240,4 +243,18 @@ class AuthController:
             return {
                 'success': False,
                 'message': f'Failed to get user: {str(e)}'
-            }
\ No newline at end of file
+            }
+    
+    @staticmethod
+    def suggest_schools(query: str, limit: int = 10) -> dict:
+        """Suggest school names for a typeahead."""
+        try:
+            return {
+                'success': True,
+                'schools': School.suggest(query, limit)
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Failed to suggest schools: {str(e)}'
+            }
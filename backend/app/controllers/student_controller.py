@@ -1,7 +1,9 @@
 from app.models.chat import Chat
 from app.models.message import Message
 from app.models.rating import Rating
-from app.models.tutor import Tutor
+from app.models.tutor_catalog import TutorCatalog
+from app.models.user_stats import UserStats
+from app.utils.helpers import encode_cursor, decode_cursor, build_snippet
 from typing import List, Dict
 
 class StudentController:
@@ -20,9 +22,13 @@ class StudentController:
                     'message': 'User not found'
                 }
             
-            # Get user statistics
-            chat_stats = Chat.get_user_stats(user_id)
-            rating_stats = Rating.get_user_rating_stats(user_id)
+            # Get user statistics (materialized on write; built on first view)
+            stats = UserStats.find_by_user(user_id)
+            if stats is None:
+                UserStats.rebuild([user_id])
+                stats = UserStats.find_by_user(user_id)
+            chat_stats = UserStats.chat_stats(stats)
+            rating_stats = UserStats.rating_stats(stats)
             
             profile = {
                 'id': str(user_data['_id']),
@@ -51,8 +57,13 @@ class StudentController:
             }
     
     @staticmethod
-    def get_chat_history(user_id: str, chat_id: str = None, page: int = 1, per_page: int = 50) -> dict:
-        """Get chat history for a student."""
+    def get_chat_history(user_id: str, chat_id: str = None, page: int = 1, per_page: int = 50,
+                         before: str = None, after: str = None) -> dict:
+        """Get chat history for a student.
+        
+        Messages are paged by ``page`` number, or by the opaque ``before``/``after``
+        cursors returned with every page, which stay fast on late pages of long chats.
+        """
         try:
             if chat_id:
                 # Get specific chat
@@ -65,10 +76,35 @@ class StudentController:
                     }
                 
                 # Get messages with pagination
-                skip = (page - 1) * per_page
-                messages = Message.find_by_chat(chat_id, limit=per_page, skip=skip)
+                cursor = before or after
+                if cursor:
+                    try:
+                        position = decode_cursor(cursor)
+                    except ValueError:
+                        return {
+                            'success': False,
+                            'message': 'Invalid cursor'
+                        }
+                    
+                    # Fetch one extra message to know whether another page follows
+                    if after:
+                        messages = Message.find_after(chat_id, *position, limit=per_page + 1)
+                        has_more = len(messages) > per_page
+                        messages = messages[:per_page]
+                    else:
+                        messages = Message.find_before(chat_id, *position, limit=per_page + 1)
+                        has_more = len(messages) > per_page
+                        messages = messages[-per_page:]
+                else:
+                    skip = (page - 1) * per_page
+                    messages = Message.find_by_chat(chat_id, limit=per_page, skip=skip)
                 total_messages = Message.count_by_chat(chat_id)
                 
+                # One lookup for the ratings of every AI message on the page
+                ratings = Rating.find_by_messages(
+                    [msg['_id'] for msg in messages if msg['sender'] == 'ai'], user_id
+                )
+                
                 message_list = []
                 for msg in messages:
                     message_data = {
@@ -81,7 +117,7 @@ class StudentController:
                     
                     # Include rating if it's an AI message
                     if msg['sender'] == 'ai':
-                        rating = Rating.find_by_message(str(msg['_id']))
+                        rating = ratings.get(msg['_id'])
                         if rating:
                             message_data['rating'] = {
                                 'rating': rating['rating'],
@@ -101,12 +137,10 @@ class StudentController:
                         'total_tokens': chat_data['total_tokens']
                     },
                     'messages': message_list,
-                    'pagination': {
-                        'page': page,
-                        'per_page': per_page,
-                        'total': total_messages,
-                        'pages': (total_messages + per_page - 1) // per_page
-                    }
+                    'pagination': StudentController._message_pagination(
+                        messages, page, per_page, total_messages,
+                        has_more if cursor else None
+                    )
                 }
             else:
                 # Get all chats for user
@@ -135,6 +169,25 @@ class StudentController:
                 'message': f'Failed to get chat history: {str(e)}'
             }
     
+    @staticmethod
+    def _message_pagination(messages: List[dict], page: int, per_page: int, total: int,
+                            has_more: bool = None) -> dict:
+        """Pagination block for a page of messages, with cursors to its neighbours."""
+        pagination = {
+            'per_page': per_page,
+            'total': total,
+            'before': encode_cursor(messages[0]['created_at'], messages[0]['_id']) if messages else None,
+            'after': encode_cursor(messages[-1]['created_at'], messages[-1]['_id']) if messages else None
+        }
+        
+        if has_more is None:
+            pagination['page'] = page
+            pagination['pages'] = (total + per_page - 1) // per_page
+        else:
+            pagination['has_more'] = has_more
+        
+        return pagination
+    
     @staticmethod
     def rate_ai_response(user_id: str, message_id: str, rating: int, feedback: str = None) -> dict:
         """Rate an AI response."""
@@ -146,8 +199,8 @@ class StudentController:
                     'message': 'Rating must be between 1 and 5'
                 }
             
-            # Find the message
-            message_data = Message.find_by_id(message_id)
+            # Find the message and its chat's owner
+            message_data = Message.find_with_chat_owner(message_id)
             if not message_data:
                 return {
                     'success': False,
@@ -162,8 +215,7 @@ class StudentController:
                 }
             
             # Verify user owns the chat
-            chat_data = Chat.find_by_id(str(message_data['chat_id']))
-            if not chat_data or str(chat_data['user_id']) != user_id:
+            if str(message_data.get('chat_owner')) != user_id:
                 return {
                     'success': False,
                     'message': 'Access denied'
@@ -197,8 +249,8 @@ class StudentController:
             }
     
     @staticmethod
-    def search_messages(user_id: str, query: str, limit: int = 20) -> dict:
-        """Search user's messages."""
+    def search_messages(user_id: str, query: str, limit: int = 20, page: int = 1) -> dict:
+        """Search user's messages, most relevant first, with highlighted snippets."""
         try:
             if not query.strip():
                 return {
@@ -206,21 +258,26 @@ class StudentController:
                     'message': 'Search query cannot be empty'
                 }
             
-            messages = Message.search_messages(user_id, query.strip(), limit)
+            # Fetch one extra result to know whether another page follows
+            messages = Message.search_messages(user_id, query.strip(), limit + 1, (page - 1) * limit)
+            has_more = len(messages) > limit
+            messages = messages[:limit]
+            
+            # Resolve every result's chat title with one query
+            chat_titles = Chat.find_titles([msg['chat_id'] for msg in messages])
             
             message_list = []
             for msg in messages:
-                # Get chat info
-                chat_data = Chat.find_by_id(str(msg['chat_id']))
-                
                 message_list.append({
                     'id': str(msg['_id']),
                     'text': msg['text'],
                     'sender': msg['sender'],
                     'created_at': msg['created_at'],
+                    'score': round(msg.get('score', 0), 3),
+                    **build_snippet(msg['text'], query),
                     'chat': {
                         'id': str(msg['chat_id']),
-                        'title': chat_data['title'] if chat_data else 'Unknown Chat'
+                        'title': chat_titles.get(msg['chat_id'], 'Unknown Chat')
                     }
                 })
             
@@ -228,7 +285,12 @@ class StudentController:
                 'success': True,
                 'results': message_list,
                 'query': query,
-                'total_results': len(message_list)
+                'total_results': len(message_list),
+                'pagination': {
+                    'page': page,
+                    'per_page': limit,
+                    'has_more': has_more
+                }
             }
             
         except Exception as e:
@@ -299,14 +361,15 @@ class StudentController:
     
     @staticmethod
     def get_recommended_tutors(user_id: str, subjects: List[str] = None, limit: int = 5) -> dict:
-        """Get recommended tutors for a student."""
+        """Get recommended tutors for a student, served from the tutor catalog snapshot."""
         try:
+            catalog = TutorCatalog.get()
             if subjects:
                 # Get tutors for specific subjects
-                tutors = Tutor.find_by_subjects(subjects, limit)
+                tutors = catalog.with_subjects(subjects)[:limit]
             else:
                 # Get general recommendations (top-rated tutors)
-                tutors = Tutor.get_recommendations([], limit)
+                tutors = catalog.top('rating', limit)
             
             tutor_list = []
             for tutor in tutors:
@@ -1,4 +1,5 @@
-from app.models.tutor import Tutor
+from app.models.tutor_catalog import TutorCatalog
+from app.utils.helpers import encode_rank_cursor, decode_rank_cursor
 from typing import List, Dict
 
 class TutorController:
@@ -8,7 +9,8 @@ class TutorController:
     def get_all_tutors(active_only: bool = True) -> dict:
         """Get all tutors with optional filtering."""
         try:
-            tutors = Tutor.find_all(active_only=active_only)
+            catalog = TutorCatalog.get()
+            tutors = catalog.active['gpa'] if active_only else catalog.all_by_gpa
             
             tutor_list = []
             for tutor in tutors:
@@ -40,7 +42,7 @@ class TutorController:
     def get_tutor_by_id(tutor_id: str) -> dict:
         """Get specific tutor details."""
         try:
-            tutor = Tutor.find_by_id(tutor_id)
+            tutor = TutorCatalog.find_by_id(tutor_id)
             
             if not tutor:
                 return {
@@ -74,15 +76,25 @@ class TutorController:
             }
     
     @staticmethod
-    def search_tutors(school: str = None, min_gpa: float = None, 
-                     subjects: List[str] = None, max_rate: float = None) -> dict:
-        """Search tutors with filters."""
+    def search_tutors(school: str = None, min_gpa: float = None, subjects: List[str] = None,
+                      max_rate: float = None, limit: int = 20, after: str = None) -> dict:
+        """Search tutors with filters, one page at a time."""
         try:
-            tutors = Tutor.search_tutors(school=school, min_gpa=min_gpa, subjects=subjects)
+            try:
+                position = decode_rank_cursor(after) if after else None
+            except ValueError as e:
+                return {
+                    'success': False,
+                    'message': str(e)
+                }
             
-            # Apply additional filters
-            if max_rate is not None:
-                tutors = [t for t in tutors if t['hourly_rate'] <= max_rate]
+            # Fetch one extra tutor to know whether another page exists
+            tutors = TutorCatalog.get().search(
+                school=school, min_gpa=min_gpa, subjects=subjects, max_rate=max_rate,
+                limit=limit + 1, after=position
+            )
+            has_more = len(tutors) > limit
+            tutors = tutors[:limit]
             
             tutor_list = []
             for tutor in tutors:
@@ -106,6 +118,13 @@ class TutorController:
                     'min_gpa': min_gpa,
                     'subjects': subjects,
                     'max_rate': max_rate
+                },
+                'pagination': {
+                    'per_page': limit,
+                    'has_more': has_more,
+                    'after': encode_rank_cursor(
+                        tutors[-1]['gpa'], tutors[-1]['rating_average'], tutors[-1]['_id']
+                    ) if has_more else None
                 }
             }
             
@@ -125,7 +144,7 @@ class TutorController:
                     'message': 'At least one subject is required'
                 }
             
-            tutors = Tutor.find_by_subjects(subjects, limit)
+            tutors = TutorCatalog.get().with_subjects(subjects)[:limit]
             
             tutor_list = []
             for tutor in tutors:
@@ -167,18 +186,8 @@ class TutorController:
             if sort_by not in valid_sort_options:
                 sort_by = 'gpa'
             
-            tutors = Tutor.find_all(active_only=True)
-            
-            # Sort tutors
-            if sort_by == 'gpa':
-                tutors.sort(key=lambda x: x['gpa'], reverse=True)
-            elif sort_by == 'rating':
-                tutors.sort(key=lambda x: x['rating_average'], reverse=True)
-            elif sort_by == 'sessions':
-                tutors.sort(key=lambda x: x['total_sessions'], reverse=True)
-            
-            # Limit results
-            tutors = tutors[:limit]
+            # Active tutors are kept pre-sorted by each option, so this is O(limit)
+            tutors = TutorCatalog.get().top(sort_by, limit)
             
             tutor_list = []
             for tutor in tutors:
@@ -211,24 +220,7 @@ class TutorController:
     def get_available_subjects() -> dict:
         """Get all unique subjects offered by tutors."""
         try:
-            from app.extensions import mongo
-            
-            # Use aggregation to get unique subjects
-            pipeline = [
-                {'$match': {'is_active': True}},
-                {'$unwind': '$subjects'},
-                {'$group': {'_id': '$subjects', 'tutor_count': {'$sum': 1}}},
-                {'$sort': {'tutor_count': -1}}
-            ]
-            
-            results = list(mongo.db.tutors.aggregate(pipeline))
-            
-            subjects = []
-            for result in results:
-                subjects.append({
-                    'subject': result['_id'],
-                    'tutor_count': result['tutor_count']
-                })
+            subjects = [dict(entry) for entry in TutorCatalog.get().subjects]
             
             return {
                 'success': True,
@@ -126,10 +126,17 @@ def require_role(required_role):
         return decorated_function
     return decorator
 
-def require_verified_student(f):
-    """Decorator to require verified student."""
+def require_verified_student(f=None, locations=None):
+    """Decorator to require verified student.
+    
+    ``locations`` overrides where the JWT is read from, e.g. to also accept
+    it from the ``jwt`` query parameter where headers cannot be set.
+    """
+    if f is None:
+        return lambda view: require_verified_student(view, locations=locations)
+    
     @wraps(f)
-    @jwt_required()
+    @jwt_required(locations=locations)
     def decorated_function(*args, **kwargs):
         from app.utils.helpers import jwt_current_user
         current_user = jwt_current_user()
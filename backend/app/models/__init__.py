@@ -4,5 +4,16 @@ from .tutor import Tutor
 from .chat import Chat
 from .message import Message
 from .rating import Rating
+from .summary import ChatSummary
+from .quiz import QuizCache
+from .bulk_job import BulkJob
+from .notification import Notification
+from .retention import Retention
+from .user_stats import UserStats
+from .platform_stats import PlatformStats
+from .usage import UsageBucket
+from .tutor_catalog import TutorCatalog
+from .school import School
+from .indexes import Indexes
 
-__all__ = ['User', 'Tutor', 'Chat', 'Message', 'Rating']
\ No newline at end of file
+__all__ = ['User', 'Tutor', 'Chat', 'Message', 'Rating', 'ChatSummary', 'QuizCache', 'BulkJob', 'Notification', 'Retention', 'Indexes', 'UserStats', 'PlatformStats', 'UsageBucket', 'TutorCatalog', 'School']
\ No newline at end of file
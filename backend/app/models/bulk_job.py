@@ -0,0 +1,199 @@
+from datetime import datetime
+from typing import Optional, List
+from bson import ObjectId
+from pymongo import IndexModel
+from app.extensions import mongo
+from app.utils.helpers import normalize_school
+
+class BulkJob:
+    """Bulk summary/quiz generation job with a resumable checkpoint.
+
+    ``last_chat_id`` records the highest chat ``_id`` whose results have been
+    written, so a restarted job continues from there instead of starting over.
+    Chats whose generation failed are kept in ``failed_chat_ids`` and retried
+    when the job is resumed.
+    """
+
+    INDEXES = {
+        'bulk_jobs': [IndexModel([('created_at', -1)])]
+    }
+
+    KINDS = ('summary', 'quiz')
+
+    def __init__(self, kind: str, created_by: str, school: str = None,
+                 user_ids: List[str] = None, topic: str = None):
+        self.kind = kind
+        self.created_by = ObjectId(created_by)
+        self.school = school.strip() if school else None
+        self.user_ids = [ObjectId(user_id) for user_id in (user_ids or [])]
+        self.topic = topic
+        self.status = 'pending'
+        self.created_at = datetime.utcnow()
+
+    def save(self):
+        """Save job to database."""
+        job_data = {
+            'kind': self.kind,
+            'created_by': self.created_by,
+            'filters': {
+                'school': self.school,
+                'user_ids': self.user_ids
+            },
+            'topic': self.topic,
+            'status': self.status,
+            'last_chat_id': None,
+            'processed': 0,
+            'generated': 0,
+            'skipped': 0,
+            'failed': 0,
+            'failed_chat_ids': [],
+            'created_at': self.created_at,
+            'updated_at': self.created_at
+        }
+        result = mongo.db.bulk_jobs.insert_one(job_data)
+        return str(result.inserted_id)
+
+    @staticmethod
+    def find_by_id(job_id: str) -> Optional[dict]:
+        """Find job by ID."""
+        try:
+            return mongo.db.bulk_jobs.find_one({'_id': ObjectId(job_id)})
+        except:
+            return None
+
+    @staticmethod
+    def set_status(job_id: str, status: str, error: str = None):
+        """Update job status."""
+        try:
+            updates = {'status': status, 'updated_at': datetime.utcnow()}
+            if error:
+                updates['error'] = error
+            mongo.db.bulk_jobs.update_one({'_id': ObjectId(job_id)}, {'$set': updates})
+            return True
+        except:
+            return False
+
+    @staticmethod
+    def checkpoint(job_id: str, last_chat_id: ObjectId, processed: int,
+                   generated: int, skipped: int, failed_chat_ids: List[ObjectId]):
+        """Advance the checkpoint after a chunk's results have been written."""
+        try:
+            mongo.db.bulk_jobs.update_one(
+                {'_id': ObjectId(job_id)},
+                {
+                    '$set': {'last_chat_id': last_chat_id, 'updated_at': datetime.utcnow()},
+                    '$inc': {
+                        'processed': processed,
+                        'generated': generated,
+                        'skipped': skipped,
+                        'failed': len(failed_chat_ids)
+                    },
+                    '$addToSet': {'failed_chat_ids': {'$each': list(failed_chat_ids)}}
+                }
+            )
+            return True
+        except:
+            return False
+
+    @staticmethod
+    def record_retry(job_id: str, chat_ids: List[ObjectId], generated: int,
+                     skipped: int, failed_chat_ids: List[ObjectId]):
+        """Record a retry of previously failed chats; those that failed again stay listed."""
+        try:
+            still_failed = set(failed_chat_ids)
+            recovered = [chat_id for chat_id in chat_ids if chat_id not in still_failed]
+            mongo.db.bulk_jobs.update_one(
+                {'_id': ObjectId(job_id)},
+                {
+                    '$set': {'updated_at': datetime.utcnow()},
+                    '$inc': {
+                        'generated': generated,
+                        'skipped': skipped,
+                        'failed': -len(recovered)
+                    },
+                    '$pull': {'failed_chat_ids': {'$in': recovered}}
+                }
+            )
+            return True
+        except:
+            return False
+
+    @staticmethod
+    def iter_failed_chunks(job: dict, chunk_size: int = 100):
+        """Yield (chat ids, chats) for the job's failed chats, ``chunk_size`` at a time.
+
+        Ids of chats deleted since they failed are yielded without a chat, so
+        retrying drops them from the list.
+        """
+        failed_ids = list(job.get('failed_chat_ids') or [])
+        for i in range(0, len(failed_ids), chunk_size):
+            chat_ids = failed_ids[i:i + chunk_size]
+            chats = list(
+                mongo.db.chats.find({'_id': {'$in': chat_ids}}, {'_id': 1, 'title': 1, 'message_count': 1})
+                .sort('_id', 1)
+            )
+            yield chat_ids, chats
+
+    @staticmethod
+    def _chat_query(job: dict) -> dict:
+        """Query for the chats the job has still to process."""
+        filters = job.get('filters', {})
+        user_ids = list(filters.get('user_ids') or [])
+
+        if filters.get('school'):
+            students = mongo.db.users.find(
+                {'role': 'student', 'school_key': normalize_school(filters['school'])},
+                {'_id': 1}
+            )
+            user_ids.extend(student['_id'] for student in students)
+
+        query = {'user_id': {'$in': user_ids}}
+        if job.get('last_chat_id'):
+            query['_id'] = {'$gt': job['last_chat_id']}
+        return query
+
+    @staticmethod
+    def count_remaining(job: dict) -> int:
+        """Count the chats the job has still to process, including failed ones to retry."""
+        return mongo.db.chats.count_documents(BulkJob._chat_query(job)) + len(job.get('failed_chat_ids') or [])
+
+    @staticmethod
+    def iter_chat_chunks(job: dict, chunk_size: int = 100):
+        """Yield chats matching the job's filters in ``_id`` order, ``chunk_size`` at a time."""
+        cursor = (
+            mongo.db.chats.find(BulkJob._chat_query(job), {'_id': 1, 'title': 1, 'message_count': 1})
+            .sort('_id', 1)
+            .batch_size(chunk_size)
+        )
+
+        chunk = []
+        for chat in cursor:
+            chunk.append(chat)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def to_dict(job: dict) -> dict:
+        """Convert a job document for API responses."""
+        return {
+            'id': str(job['_id']),
+            'kind': job['kind'],
+            'status': job['status'],
+            'filters': {
+                'school': job['filters'].get('school'),
+                'user_ids': [str(user_id) for user_id in job['filters'].get('user_ids', [])]
+            },
+            'topic': job.get('topic'),
+            'processed': job.get('processed', 0),
+            'generated': job.get('generated', 0),
+            'skipped': job.get('skipped', 0),
+            'failed': job.get('failed', 0),
+            'failed_chat_ids': [str(chat_id) for chat_id in job.get('failed_chat_ids', [])],
+            'last_chat_id': str(job['last_chat_id']) if job.get('last_chat_id') else None,
+            'error': job.get('error'),
+            'created_at': job['created_at'],
+            'updated_at': job['updated_at']
+        }
@@ -1,11 +1,22 @@
 from datetime import datetime
 from typing import Optional, List
 from bson import ObjectId
+from pymongo import IndexModel
 from app.extensions import mongo
+from app.models.user_stats import UserStats
+import logging
 
 class Chat:
     """Chat model for storing conversation sessions."""
     
+    INDEXES = {
+        'chats': [
+            IndexModel([('user_id', 1), ('last_activity', -1)]),  # find_by_user
+            IndexModel([('user_id', 1), ('_id', 1)]),  # bulk job chunks
+            IndexModel([('last_activity', 1), ('message_count', 1)]),  # retention sweep
+        ]
+    }
+    
     def __init__(self, user_id: str, title: str = "New Chat", 
                  is_ai_session: bool = True, ai_model: str = "gemini-pro"):
         self.user_id = ObjectId(user_id)
@@ -30,6 +41,11 @@ class Chat:
             'total_tokens': self.total_tokens
         }
         result = mongo.db.chats.insert_one(chat_data)
+        try:
+            UserStats.record_chat(self.user_id, self.is_ai_session)
+        except Exception as e:
+            # The chat exists now; the weekly stats rebuild corrects the drift
+            logging.error(f"Failed to record chat stats for user {self.user_id}: {str(e)}")
         return str(result.inserted_id)
     
     @staticmethod
@@ -40,6 +56,20 @@ class Chat:
         except:
             return None
     
+    @staticmethod
+    def find_titles(chat_ids: List[ObjectId]) -> dict:
+        """Find the titles of many chats in one query, keyed by chat ID."""
+        if not chat_ids:
+            return {}
+        try:
+            chats = mongo.db.chats.find(
+                {'_id': {'$in': list({ObjectId(chat_id) for chat_id in chat_ids})}},
+                {'title': 1}
+            )
+            return {chat['_id']: chat['title'] for chat in chats}
+        except:
+            return {}
+    
     @staticmethod
     def find_by_user(user_id: str, limit: int = 50) -> List[dict]:
         """Find chats by user ID."""
@@ -64,10 +94,13 @@ class Chat:
             if token_count > 0:
                 updates['$inc']['total_tokens'] = token_count
             
-            mongo.db.chats.update_one(
+            chat = mongo.db.chats.find_one_and_update(
                 {'_id': ObjectId(chat_id)},
-                updates
+                updates,
+                projection={'user_id': 1}
             )
+            if chat:
+                UserStats.record_activity(chat['user_id'], token_count)
             return True
         except:
             return False
@@ -100,12 +133,22 @@ class Chat:
             # Delete messages
             mongo.db.messages.delete_many({'chat_id': ObjectId(chat_id)})
             
-            # Delete ratings
+            # Delete ratings, keeping their values for the user's statistics
+            ratings = [
+                rating['rating']
+                for rating in mongo.db.ratings.find({'chat_id': ObjectId(chat_id)}, {'rating': 1})
+            ]
             mongo.db.ratings.delete_many({'chat_id': ObjectId(chat_id)})
             
+            # Delete stored summary
+            mongo.db.chat_summaries.delete_one({'chat_id': ObjectId(chat_id)})
+            
             # Delete chat
             result = mongo.db.chats.delete_one({'_id': ObjectId(chat_id)})
             
+            if result.deleted_count:
+                UserStats.remove_chat(chat['user_id'], chat, ratings)
+            
             return result.deleted_count > 0
         except:
             return False
@@ -0,0 +1,184 @@
+from typing import List
+import logging
+from pymongo.errors import OperationFailure
+from app.extensions import mongo
+from app.models.user import User
+from app.models.tutor import Tutor
+from app.models.chat import Chat
+from app.models.message import Message
+from app.models.rating import Rating
+from app.models.summary import ChatSummary
+from app.models.bulk_job import BulkJob
+from app.models.notification import Notification
+from app.models.usage import UsageBucket
+from app.models.school import School
+from app.models.retention import Retention
+
+# Models whose ``INDEXES`` are kept in sync with the database
+INDEXED_MODELS = (User, Tutor, Chat, Message, Rating, ChatSummary, BulkJob, Notification, UsageBucket, School)
+
+def _key(spec, weights: dict = None) -> tuple:
+    """Normalize an index key (IndexModel document or index_information entry).
+
+    The server reports a text index's fields as ``_fts``/``_ftsx`` plus
+    ``weights``; both forms become one ``(field, 'text')`` pair per field.
+    """
+    key, text_at, text_fields = [], None, []
+    for field, direction in spec:
+        if field == '_ftsx':
+            continue
+        if field == '_fts' or direction == 'text':
+            text_at = len(key) if text_at is None else text_at
+            text_fields.extend(sorted(weights or {}) if field == '_fts' else [field])
+            continue
+        key.append((field, direction))
+
+    if text_at is not None:
+        key[text_at:text_at] = [(field, 'text') for field in sorted(text_fields)]
+    return tuple(key)
+
+class Indexes:
+    """Index definitions declared next to each model, synced to MongoDB.
+
+    ``ensure`` diffs each model's ``INDEXES`` against the live collections and
+    builds whatever is missing; TTL indexes come from ``RETENTION_POLICIES``.
+    ``report`` lists indexes that are unused, redundant or no longer declared.
+    """
+
+    @staticmethod
+    def declared() -> dict:
+        """Declared IndexModels per collection."""
+        declared = {}
+        for model in INDEXED_MODELS:
+            for collection, indexes in model.INDEXES.items():
+                declared.setdefault(collection, []).extend(indexes)
+        return declared
+
+    @staticmethod
+    def diff() -> dict:
+        """Compare declared indexes with the database.
+
+        Returns ``missing`` IndexModels per collection and ``conflicts`` where an
+        index on the same keys exists with different options (e.g. not unique);
+        conflicts are reported, never dropped automatically.
+        """
+        missing, conflicts = {}, []
+        for collection, indexes in Indexes.declared().items():
+            existing = {
+                _key(info['key'], info.get('weights')): (name, info)
+                for name, info in mongo.db[collection].index_information().items()
+            }
+            for index in indexes:
+                document = index.document
+                key = _key(document['key'].items())
+                if key not in existing:
+                    missing.setdefault(collection, []).append(index)
+                    continue
+
+                name, info = existing[key]
+                for option in ('unique', 'sparse'):
+                    if bool(document.get(option)) != bool(info.get(option)):
+                        conflicts.append({
+                            'collection': collection,
+                            'index': name,
+                            'option': option,
+                            'declared': bool(document.get(option))
+                        })
+        return {'missing': missing, 'conflicts': conflicts}
+
+    @staticmethod
+    def ensure(dry_run: bool = False) -> dict:
+        """Build missing indexes without blocking foreground traffic."""
+        diff = Indexes.diff()
+        created, failed = [], []
+
+        for collection, indexes in diff['missing'].items():
+            for index in indexes:
+                name = index.document['name']
+                if dry_run:
+                    created.append(f"{collection}.{name}")
+                    continue
+                try:
+                    # background only matters before MongoDB 4.2; newer servers
+                    # always use the optimized, mostly lock-free build
+                    mongo.db[collection].create_index(
+                        list(index.document['key'].items()),
+                        background=True,
+                        **{k: v for k, v in index.document.items() if k != 'key'}
+                    )
+                    created.append(f"{collection}.{name}")
+                except OperationFailure as e:
+                    # e.g. a unique index over data that already has duplicates
+                    logging.error(f"Failed to build index {collection}.{name}: {str(e)}")
+                    failed.append({'index': f"{collection}.{name}", 'error': str(e)})
+
+        ttl = [] if dry_run else Retention.apply_ttl_policies()
+
+        return {
+            'created': created,
+            'ttl': ttl,
+            'failed': failed,
+            'conflicts': diff['conflicts']
+        }
+
+    @staticmethod
+    def report() -> List[dict]:
+        """List unused, redundant and undeclared indexes.
+
+        Usage counts come from ``$indexStats`` and reset when mongod restarts,
+        so ``unused`` is only meaningful after the server has seen real traffic.
+        """
+        declared = {
+            collection: {_key(index.document['key'].items()) for index in indexes}
+            for collection, indexes in Indexes.declared().items()
+        }
+        ttl_keys = {
+            (spec['collection'], ((spec['field'], 1),)) for spec in Retention.ttl_index_specs()
+        }
+
+        findings = []
+        for collection in declared:
+            info = mongo.db[collection].index_information()
+            usage = {
+                stats['name']: stats['accesses']
+                for stats in mongo.db[collection].aggregate([{'$indexStats': {}}])
+            }
+            keys = {
+                name: _key(index['key'], index.get('weights'))
+                for name, index in info.items() if name != '_id_'
+            }
+
+            for name, key in keys.items():
+                index = info[name]
+                accesses = usage.get(name, {})
+
+                if accesses.get('ops', 0) == 0:
+                    findings.append({
+                        'collection': collection,
+                        'index': name,
+                        'issue': 'unused',
+                        'since': accesses.get('since')
+                    })
+
+                # A plain index that is a prefix of another index is served by it
+                special = index.get('unique') or index.get('sparse') or 'expireAfterSeconds' in index
+                covering = [
+                    other for other, other_key in keys.items()
+                    if other != name and len(other_key) > len(key) and other_key[:len(key)] == key
+                ]
+                if covering and not special:
+                    findings.append({
+                        'collection': collection,
+                        'index': name,
+                        'issue': 'redundant',
+                        'covered_by': covering[0]
+                    })
+
+                if key not in declared[collection] and (collection, key) not in ttl_keys:
+                    findings.append({
+                        'collection': collection,
+                        'index': name,
+                        'issue': 'undeclared'
+                    })
+
+        return findings
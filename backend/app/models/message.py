@@ -1,14 +1,30 @@
 from datetime import datetime
 from typing import Optional, List
 from bson import ObjectId
+from pymongo import IndexModel, TEXT, UpdateMany
 from app.extensions import mongo
+from app.models.summary import ChatSummary
 
 class Message:
     """Message model for chat messages."""
     
+    # The per-user text index; a collection may only have one text index
+    TEXT_INDEX = 'user_text_search'
+    
+    INDEXES = {
+        'messages': [
+            IndexModel([('chat_id', 1), ('created_at', 1), ('_id', 1)]),  # history, latest, find_after
+            IndexModel([('chat_id', 1), ('sender', 1), ('created_at', -1)]),  # ratable AI messages
+            IndexModel([('sender', 1), ('created_at', -1)]),  # token usage stats
+            IndexModel([('user_id', 1), ('created_at', -1)]),  # per-user stats
+            IndexModel([('user_id', 1), ('text', TEXT)], name=TEXT_INDEX, default_language='english'),
+        ]
+    }
+    
     def __init__(self, chat_id: str, sender: str, text: str, 
-                 tokens_used: int = 0, metadata: dict = None):
+                 tokens_used: int = 0, metadata: dict = None, user_id: str = None):
         self.chat_id = ObjectId(chat_id)
+        self.user_id = ObjectId(user_id) if user_id else None  # chat owner, denormalized
         self.sender = sender  # 'user', 'ai', 'tutor'
         self.text = text
         self.tokens_used = tokens_used
@@ -19,8 +35,13 @@ class Message:
     
     def save(self):
         """Save message to database."""
+        if self.user_id is None:
+            chat = mongo.db.chats.find_one({'_id': self.chat_id}, {'user_id': 1})
+            self.user_id = chat['user_id'] if chat else None
+        
         message_data = {
             'chat_id': self.chat_id,
+            'user_id': self.user_id,
             'sender': self.sender,
             'text': self.text,
             'tokens_used': self.tokens_used,
@@ -40,19 +61,68 @@ class Message:
         except:
             return None
     
+    @staticmethod
+    def find_with_chat_owner(message_id: str) -> Optional[dict]:
+        """Find a message with its chat's owner as ``chat_owner`` in one query.
+
+        ``chat_owner`` is None when the chat no longer exists.
+        """
+        try:
+            result = list(mongo.db.messages.aggregate([
+                {'$match': {'_id': ObjectId(message_id)}},
+                {'$limit': 1},
+                {'$lookup': {
+                    'from': 'chats',
+                    'localField': 'chat_id',
+                    'foreignField': '_id',
+                    'as': 'chat'
+                }},
+                {'$project': {
+                    'chat_id': 1,
+                    'sender': 1,
+                    'chat_owner': {'$arrayElemAt': ['$chat.user_id', 0]}
+                }}
+            ]))
+            return result[0] if result else None
+        except:
+            return None
+    
     @staticmethod
     def find_by_chat(chat_id: str, limit: int = 100, skip: int = 0) -> List[dict]:
         """Find messages by chat ID with pagination."""
         try:
             return list(
                 mongo.db.messages.find({'chat_id': ObjectId(chat_id)})
-                .sort('created_at', 1)  # Ascending order for chat history
+                .sort([('created_at', 1), ('_id', 1)])  # Ascending order for chat history
                 .skip(skip)
                 .limit(limit)
             )
         except:
             return []
     
+    @staticmethod
+    def find_first_by_chats(chat_ids: List[ObjectId], limit: int = 10) -> dict:
+        """Find the first ``limit`` messages of many chats, keyed by chat ``_id``."""
+        try:
+            chats = mongo.db.chats.aggregate([
+                {'$match': {'_id': {'$in': list(chat_ids)}}},
+                {'$lookup': {
+                    'from': 'messages',
+                    'let': {'chat_id': '$_id'},
+                    'pipeline': [
+                        {'$match': {'$expr': {'$eq': ['$chat_id', '$$chat_id']}}},
+                        {'$sort': {'created_at': 1, '_id': 1}},
+                        {'$limit': limit},
+                        {'$project': {'sender': 1, 'text': 1}}
+                    ],
+                    'as': 'messages'
+                }},
+                {'$project': {'messages': 1}}
+            ])
+            return {chat['_id']: chat['messages'] for chat in chats}
+        except:
+            return {}
+    
     @staticmethod
     def get_latest_messages(chat_id: str, count: int = 10) -> List[dict]:
         """Get latest messages from a chat."""
@@ -65,6 +135,46 @@ class Message:
         except:
             return []
     
+    @staticmethod
+    def find_after(chat_id: str, after_created_at: datetime, after_id: ObjectId,
+                   limit: int = 50) -> List[dict]:
+        """Find messages written after a given message, oldest first."""
+        try:
+            return list(
+                mongo.db.messages.find({
+                    'chat_id': ObjectId(chat_id),
+                    '$or': [
+                        {'created_at': {'$gt': after_created_at}},
+                        {'created_at': after_created_at, '_id': {'$gt': after_id}}
+                    ]
+                })
+                .sort([('created_at', 1), ('_id', 1)])
+                .limit(limit)
+            )
+        except:
+            return []
+    
+    @staticmethod
+    def find_before(chat_id: str, before_created_at: datetime, before_id: ObjectId,
+                    limit: int = 50) -> List[dict]:
+        """Find the ``limit`` messages written just before a given message, oldest first."""
+        try:
+            messages = list(
+                mongo.db.messages.find({
+                    'chat_id': ObjectId(chat_id),
+                    '$or': [
+                        {'created_at': {'$lt': before_created_at}},
+                        {'created_at': before_created_at, '_id': {'$lt': before_id}}
+                    ]
+                })
+                .sort([('created_at', -1), ('_id', -1)])
+                .limit(limit)
+            )
+            messages.reverse()
+            return messages
+        except:
+            return []
+    
     @staticmethod
     def count_by_chat(chat_id: str) -> int:
         """Count messages in a chat."""
@@ -75,9 +185,9 @@ class Message:
     
     @staticmethod
     def update_message(message_id: str, new_text: str) -> bool:
-        """Update message text."""
+        """Update message text, discarding the chat's now stale summary."""
         try:
-            result = mongo.db.messages.update_one(
+            message = mongo.db.messages.find_one_and_update(
                 {'_id': ObjectId(message_id)},
                 {
                     '$set': {
@@ -85,18 +195,28 @@ class Message:
                         'is_edited': True,
                         'edited_at': datetime.utcnow()
                     }
-                }
+                },
+                projection={'chat_id': 1}
             )
-            return result.modified_count > 0
+            if not message:
+                return False
+            ChatSummary.delete_by_chat(str(message['chat_id']))
+            return True
         except:
             return False
     
     @staticmethod
     def delete_message(message_id: str) -> bool:
-        """Delete a message."""
+        """Delete a message, discarding the chat's now stale summary."""
         try:
-            result = mongo.db.messages.delete_one({'_id': ObjectId(message_id)})
-            return result.deleted_count > 0
+            message = mongo.db.messages.find_one_and_delete(
+                {'_id': ObjectId(message_id)},
+                projection={'chat_id': 1}
+            )
+            if not message:
+                return False
+            ChatSummary.delete_by_chat(str(message['chat_id']))
+            return True
         except:
             return False
     
@@ -114,23 +234,22 @@ class Message:
             return []
     
     @staticmethod
-    def search_messages(user_id: str, query: str, limit: int = 50) -> List[dict]:
-        """Search messages by text content."""
+    def search_messages(user_id: str, query: str, limit: int = 50, skip: int = 0) -> List[dict]:
+        """Search messages by text content, most relevant first.
+        
+        Uses the ``user_text_search`` index: terms are stemmed, ``"quoted phrases"``
+        and ``-negations`` are supported and the input is never treated as a regex.
+        Each result carries its relevance as ``score``.
+        """
         try:
-            # First get user's chats
-            user_chats = mongo.db.chats.find(
-                {'user_id': ObjectId(user_id)},
-                {'_id': 1}
-            )
-            chat_ids = [chat['_id'] for chat in user_chats]
-            
-            # Search messages in user's chats
             return list(
-                mongo.db.messages.find({
-                    'chat_id': {'$in': chat_ids},
-                    'text': {'$regex': query, '$options': 'i'}
-                })
-                .sort('created_at', -1)
+                mongo.db.messages.find(
+                    {'user_id': ObjectId(user_id), '$text': {'$search': query}},
+                    {'score': {'$meta': 'textScore'}, 'chat_id': 1, 'sender': 1,
+                     'text': 1, 'created_at': 1}
+                )
+                .sort([('score', {'$meta': 'textScore'}), ('created_at', -1)])
+                .skip(skip)
                 .limit(limit)
             )
         except:
@@ -143,13 +262,7 @@ class Message:
             match_filter = {'sender': 'ai'}
             
             if user_id:
-                # Get user's chats first
-                user_chats = mongo.db.chats.find(
-                    {'user_id': ObjectId(user_id)},
-                    {'_id': 1}
-                )
-                chat_ids = [chat['_id'] for chat in user_chats]
-                match_filter['chat_id'] = {'$in': chat_ids}
+                match_filter['user_id'] = ObjectId(user_id)
             
             if date_from:
                 match_filter['created_at'] = {'$gte': date_from}
@@ -184,4 +297,40 @@ class Message:
                 'total_tokens': 0,
                 'total_messages': 0,
                 'avg_tokens_per_message': 0
-            }
\ No newline at end of file
+            }
+    
+    @staticmethod
+    def backfill_user_ids(batch_size: int = 500) -> int:
+        """Copy each chat's owner onto its messages that predate ``user_id``.
+        
+        Walks chats in ``_id`` order and issues one ``bulk_write`` of per-chat
+        ``update_many`` calls per batch, so it can be interrupted and rerun.
+        """
+        updated = 0
+        batch = []
+        for chat in mongo.db.chats.find({}, {'user_id': 1}).sort('_id', 1).batch_size(batch_size):
+            batch.append(UpdateMany(
+                {'chat_id': chat['_id'], 'user_id': {'$exists': False}},
+                {'$set': {'user_id': chat['user_id']}}
+            ))
+            if len(batch) >= batch_size:
+                updated += mongo.db.messages.bulk_write(batch, ordered=False).modified_count
+                batch = []
+        if batch:
+            updated += mongo.db.messages.bulk_write(batch, ordered=False).modified_count
+        
+        return updated
+    
+    @staticmethod
+    def drop_legacy_text_index() -> Optional[str]:
+        """Drop the pre-``user_id`` text index so ``user_text_search`` can be built.
+        
+        The legacy index is matched by being a text index (it has ``weights``)
+        other than ``user_text_search``, since depending on how it was built
+        it is named ``text_search`` or ``text_text``. Returns its name.
+        """
+        for name, info in mongo.db.messages.index_information().items():
+            if 'weights' in info and name != Message.TEXT_INDEX:
+                mongo.db.messages.drop_index(name)
+                return name
+        return None
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+from pymongo import IndexModel
+from app.extensions import mongo
+from app.models.retention import Retention
+
+class Notification:
+    """User notifications, staged in an outbox and written in batches.
+
+    Producers append (user, message) pairs to ``notification_outbox`` with a
+    single ``insert_many``; a periodic flush claims the pending entries,
+    coalesces them per user and writes the results to the current monthly
+    ``notifications_YYYYMM`` partition, which retention drops as a whole.
+    """
+
+    # Monthly notifications_YYYYMM partitions are indexed as they are created
+    PARTITION_INDEXES = [[('user_id', 1), ('created_at', -1)]]
+
+    INDEXES = {
+        'notification_outbox': [
+            IndexModel([('batch_id', 1), ('created_at', 1)]),
+            IndexModel([('claimed_at', 1)], sparse=True),  # stale claims
+        ]
+    }
+
+    @staticmethod
+    def enqueue(items: List[dict]) -> int:
+        """Stage notifications for delivery.
+
+        Each item holds ``user_id``, ``message`` and optionally ``type``.
+        """
+        if not items:
+            return 0
+
+        now = datetime.utcnow()
+        entries = [
+            {
+                'user_id': ObjectId(item['user_id']),
+                'message': item['message'],
+                'type': item.get('type', 'info'),
+                'batch_id': None,
+                'created_at': now
+            }
+            for item in items
+        ]
+        result = mongo.db.notification_outbox.insert_many(entries, ordered=False)
+        return len(result.inserted_ids)
+
+    @staticmethod
+    def claim_pending(batch_id: str, limit: int = 5000, stale_after: int = 600) -> List[dict]:
+        """Claim up to ``limit`` outbox entries for one flush.
+
+        Entries claimed by a flush that died more than ``stale_after`` seconds
+        ago are claimed again.
+        """
+        claimable = {'$or': [
+            {'batch_id': None},
+            {'claimed_at': {'$lt': datetime.utcnow() - timedelta(seconds=stale_after)}}
+        ]}
+        pending_ids = [
+            entry['_id'] for entry in mongo.db.notification_outbox.find(
+                claimable, {'_id': 1}
+            ).sort('created_at', 1).limit(limit)
+        ]
+        if not pending_ids:
+            return []
+
+        mongo.db.notification_outbox.update_many(
+            {'_id': {'$in': pending_ids}, **claimable},
+            {'$set': {'batch_id': batch_id, 'claimed_at': datetime.utcnow()}}
+        )
+        return list(mongo.db.notification_outbox.find({'batch_id': batch_id}))
+
+    @staticmethod
+    def coalesce(entries: List[dict]) -> List[dict]:
+        """Merge outbox entries into one notification per user."""
+        now = datetime.utcnow()
+        by_user = {}
+        for entry in entries:
+            notification = by_user.setdefault(entry['user_id'], {
+                'user_id': entry['user_id'],
+                'type': entry['type'],
+                'messages': [],
+                'created_at': now,
+                'is_read': False
+            })
+            notification['messages'].append(entry['message'])
+            if entry['type'] != notification['type']:
+                notification['type'] = 'mixed'
+
+        return list(by_user.values())
+
+    @staticmethod
+    def _partition(when: datetime = None):
+        return Retention.partition('notifications', when, Notification.PARTITION_INDEXES)
+
+    @staticmethod
+    def insert_many(notifications: List[dict]) -> List[ObjectId]:
+        """Write coalesced notifications in one round trip."""
+        if not notifications:
+            return []
+        partition = Notification._partition(notifications[0]['created_at'])
+        result = partition.insert_many(notifications, ordered=False)
+        return result.inserted_ids
+
+    @staticmethod
+    def mark_delivered(notifications: List[dict], channel: str):
+        """Record that a channel delivered the given notifications."""
+        by_partition = {}
+        for notification in notifications:
+            name = Retention.partition_name('notifications', notification['created_at'])
+            by_partition.setdefault(name, []).append(notification['_id'])
+
+        for name, notification_ids in by_partition.items():
+            mongo.db[name].update_many(
+                {'_id': {'$in': notification_ids}},
+                {'$set': {f'delivered.{channel}': datetime.utcnow()}}
+            )
+
+    @staticmethod
+    def release_batch(batch_id: str):
+        """Drop outbox entries once their batch has been written."""
+        mongo.db.notification_outbox.delete_many({'batch_id': batch_id})
+
+    @staticmethod
+    def find_by_user(user_id: str, limit: int = 50) -> List[dict]:
+        """Find a user's notifications, newest first, reading partitions newest first."""
+        try:
+            results = []
+            for name in Retention.list_partitions('notifications'):
+                remaining = limit - len(results)
+                if remaining <= 0:
+                    break
+                results.extend(
+                    mongo.db[name].find({'user_id': ObjectId(user_id)})
+                    .sort('created_at', -1)
+                    .limit(remaining)
+                )
+            return results
+        except:
+            return []
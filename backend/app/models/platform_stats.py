@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+import threading
+import logging
+from flask import current_app
+from app.extensions import mongo
+from app.models.usage import UsageBucket
+
+class PlatformStats:
+    """Platform-wide counts for the admin dashboard, cached per process.
+
+    Each collection is read with one aggregation (a ``$facet`` where several
+    counts are needed from it), and collections whose size only needs to be
+    approximate use ``estimated_document_count``. The combined snapshot is served from
+    memory for ``PLATFORM_STATS_TTL`` seconds; after that the stale snapshot
+    is still returned while a background thread recomputes it.
+    """
+
+    _snapshot = None
+    _computed_at = None
+    _refreshing = False
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _facet_counts(collection: str, pipeline: list) -> dict:
+        result = list(mongo.db[collection].aggregate(pipeline))
+        facets = result[0] if result else {}
+        return {name: (rows[0]['n'] if rows else 0) for name, rows in facets.items()}
+
+    @staticmethod
+    def compute() -> dict:
+        """Compute a fresh snapshot."""
+        students = PlatformStats._facet_counts('users', [
+            {'$match': {'role': 'student'}},
+            {'$facet': {
+                'total': [{'$count': 'n'}],
+                'verified': [{'$match': {'is_verified': True}}, {'$count': 'n'}]
+            }}
+        ])
+        tutors = PlatformStats._facet_counts('tutors', [
+            {'$facet': {
+                'total': [{'$count': 'n'}],
+                'active': [{'$match': {'is_active': True}}, {'$count': 'n'}]
+            }}
+        ])
+
+        rating_counts = mongo.db.ratings.aggregate([
+            {'$group': {'_id': '$rating', 'count': {'$sum': 1}}}
+        ])
+        distribution = {i: 0 for i in range(1, 6)}
+        for row in rating_counts:
+            distribution[row['_id']] = row['count']
+        total_ratings = sum(distribution.values())
+        rating_sum = sum(rating * count for rating, count in distribution.items())
+
+        token_stats = UsageBucket.usage(datetime.utcnow() - timedelta(days=30))
+
+        return {
+            'students': {
+                'total': students.get('total', 0),
+                'verified': students.get('verified', 0),
+                'pending_verification': students.get('total', 0) - students.get('verified', 0)
+            },
+            'tutors': {
+                'total': tutors.get('total', 0),
+                'active': tutors.get('active', 0)
+            },
+            'chats': {
+                'total_estimated': mongo.db.chats.estimated_document_count()
+            },
+            'messages': {
+                'total_estimated': mongo.db.messages.estimated_document_count()
+            },
+            'ai_usage': {
+                'avg_rating': round(rating_sum / total_ratings, 2) if total_ratings else 0.0,
+                'total_ratings': total_ratings,
+                'rating_distribution': distribution,
+                'tokens_used_30d': token_stats.get('total_tokens', 0),
+                'messages_30d': token_stats.get('total_messages', 0)
+            },
+            'computed_at': datetime.utcnow()
+        }
+
+    @staticmethod
+    def _refresh(app):
+        with app.app_context():
+            try:
+                snapshot = PlatformStats.compute()
+                with PlatformStats._lock:
+                    PlatformStats._snapshot = snapshot
+                    PlatformStats._computed_at = datetime.utcnow()
+            except Exception as e:
+                logging.error(f"Platform stats refresh failed: {str(e)}")
+            finally:
+                PlatformStats._refreshing = False
+
+    @staticmethod
+    def get() -> dict:
+        """Return the cached snapshot, computing it on first use."""
+        ttl = current_app.config.get('PLATFORM_STATS_TTL', 60)
+
+        if PlatformStats._snapshot is None:
+            PlatformStats._refresh(current_app._get_current_object())
+            if PlatformStats._snapshot is None:
+                raise RuntimeError('Platform statistics are unavailable')
+            return PlatformStats._snapshot
+
+        age = (datetime.utcnow() - PlatformStats._computed_at).total_seconds()
+        if age > ttl:
+            with PlatformStats._lock:
+                start_refresh = not PlatformStats._refreshing
+                PlatformStats._refreshing = True
+            if start_refresh:
+                threading.Thread(
+                    target=PlatformStats._refresh,
+                    args=(current_app._get_current_object(),),
+                    daemon=True
+                ).start()
+
+        return PlatformStats._snapshot
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from typing import Optional, List
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.extensions import mongo
+from app.utils.helpers import generate_hash
+
+class QuizCache:
+    """Generated quizzes keyed by a hash of their source content and topic.
+
+    Documents carry an ``expires_at`` date backed by a TTL index, so stale
+    entries are removed by MongoDB rather than by a cleanup job.
+    """
+
+    @staticmethod
+    def content_key(content_text: str, topic: str = None) -> str:
+        """Build the cache key for a quiz source text and optional topic."""
+        normalized_topic = (topic or '').strip().lower()
+        return generate_hash(f"{normalized_topic}\n{content_text}")
+
+    @staticmethod
+    def find(content_key: str) -> Optional[dict]:
+        """Find a cached quiz that has not yet expired."""
+        try:
+            return mongo.db.quiz_cache.find_one({
+                '_id': content_key,
+                'expires_at': {'$gt': datetime.utcnow()}
+            })
+        except:
+            return None
+
+    @staticmethod
+    def find_existing_keys(content_keys: List[str]) -> set:
+        """Return which of ``content_keys`` already have an unexpired quiz."""
+        try:
+            cached = mongo.db.quiz_cache.find(
+                {'_id': {'$in': list(content_keys)}, 'expires_at': {'$gt': datetime.utcnow()}},
+                {'_id': 1}
+            )
+            return {entry['_id'] for entry in cached}
+        except:
+            return set()
+
+    @staticmethod
+    def store(content_key: str, chat_id: str, topic: str, quiz: str, ttl: int) -> bool:
+        """Cache a generated quiz for ``ttl`` seconds."""
+        try:
+            now = datetime.utcnow()
+            mongo.db.quiz_cache.update_one(
+                {'_id': content_key},
+                {
+                    '$set': {
+                        'chat_id': ObjectId(chat_id),
+                        'topic': topic,
+                        'quiz': quiz,
+                        'created_at': now,
+                        'expires_at': now + timedelta(seconds=ttl)
+                    }
+                },
+                upsert=True
+            )
+            return True
+        except:
+            return False
+
+    @staticmethod
+    def bulk_store(entries: List[dict], ttl: int) -> int:
+        """Cache many quizzes in one round trip.
+
+        Each entry holds ``content_key``, ``chat_id``, ``topic`` and ``quiz``.
+        """
+        if not entries:
+            return 0
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {'_id': entry['content_key']},
+                {
+                    '$set': {
+                        'chat_id': ObjectId(entry['chat_id']),
+                        'topic': entry['topic'],
+                        'quiz': entry['quiz'],
+                        'created_at': now,
+                        'expires_at': now + timedelta(seconds=ttl)
+                    }
+                },
+                upsert=True
+            )
+            for entry in entries
+        ]
+        result = mongo.db.quiz_cache.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
@@ -1,11 +1,22 @@
 from datetime import datetime
 from typing import Optional, List
 from bson import ObjectId
+from pymongo import IndexModel, ReturnDocument
 from app.extensions import mongo
+from app.models.user_stats import UserStats
 
 class Rating:
     """Rating model for AI responses."""
     
+    INDEXES = {
+        'ratings': [
+            IndexModel([('message_id', 1), ('user_id', 1)], unique=True),  # one rating per user and message
+            IndexModel([('user_id', 1), ('created_at', -1)]),
+            IndexModel([('chat_id', 1)]),
+            IndexModel([('created_at', -1)]),  # recent feedback
+        ]
+    }
+    
     def __init__(self, chat_id: str, message_id: str, user_id: str, 
                  rating: int, feedback: str = None):
         self.chat_id = ObjectId(chat_id)
@@ -36,6 +47,23 @@ class Rating:
         except:
             return None
     
+    @staticmethod
+    def find_by_messages(message_ids: List[ObjectId], user_id: str = None) -> dict:
+        """Find ratings for many messages in one query, keyed by message ID."""
+        if not message_ids:
+            return {}
+        try:
+            query = {'message_id': {'$in': [ObjectId(message_id) for message_id in message_ids]}}
+            if user_id:
+                query['user_id'] = ObjectId(user_id)
+            
+            return {
+                rating['message_id']: rating
+                for rating in mongo.db.ratings.find(query, {'message_id': 1, 'rating': 1, 'feedback': 1})
+            }
+        except:
+            return {}
+    
     @staticmethod
     def find_by_user(user_id: str, limit: int = 50) -> List[dict]:
         """Find ratings by user ID."""
@@ -62,24 +90,22 @@ class Rating:
                 'created_at': datetime.utcnow()
             }
             
-            result = mongo.db.ratings.update_one(
+            # Returns the rating as it was before this write (None when it is new),
+            # so the id and the user's statistics adjust need no second query
+            new_id = ObjectId()
+            previous = mongo.db.ratings.find_one_and_update(
                 {
                     'message_id': ObjectId(message_id),
                     'user_id': ObjectId(user_id)
                 },
-                {'$set': rating_data},
-                upsert=True
+                {'$set': rating_data, '$setOnInsert': {'_id': new_id}},
+                projection={'rating': 1},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
             )
             
-            if result.upserted_id:
-                return str(result.upserted_id)
-            else:
-                # Find the existing rating
-                existing = mongo.db.ratings.find_one({
-                    'message_id': ObjectId(message_id),
-                    'user_id': ObjectId(user_id)
-                })
-                return str(existing['_id']) if existing else None
+            UserStats.record_rating(user_id, rating, previous['rating'] if previous else None)
+            return str(previous['_id'] if previous else new_id)
         except:
             return None
     
@@ -194,10 +220,15 @@ class Rating:
     def delete_rating(rating_id: str, user_id: str) -> bool:
         """Delete a rating (only by the user who created it)."""
         try:
-            result = mongo.db.ratings.delete_one({
-                '_id': ObjectId(rating_id),
-                'user_id': ObjectId(user_id)
-            })
-            return result.deleted_count > 0
+            deleted = mongo.db.ratings.find_one_and_delete(
+                {
+                    '_id': ObjectId(rating_id),
+                    'user_id': ObjectId(user_id)
+                },
+                projection={'rating': 1}
+            )
+            if deleted:
+                UserStats.remove_rating(user_id, deleted['rating'])
+            return deleted is not None
         except:
             return False
\ No newline at end of file
@@ -0,0 +1,205 @@
+from datetime import datetime, timedelta
+from typing import List
+import re
+import time
+import logging
+from pymongo.errors import OperationFailure
+from app.extensions import mongo
+from app.models.user_stats import UserStats
+from app.utils.helpers import normalize_school
+
+class Retention:
+    """Declarative data retention driven by ``RETENTION_POLICIES``.
+
+    Each policy names a collection and one of three strategies:
+
+    - ``ttl``: a TTL index on ``field`` lets MongoDB expire documents itself.
+    - ``partition``: documents are written to monthly ``<collection>_YYYYMM``
+      collections and whole months are dropped once they age out.
+    - ``sweep``: for data that has to be removed together with dependent
+      collections (chats with their messages, ratings and summaries), an
+      index-driven sweep deletes in chunks with one ``delete_many`` per
+      collection, pausing between chunks to stay out of foreground traffic.
+      ``schools`` overrides the retention period per school, matched on the
+      normalized ``school_key``.
+    """
+
+    @staticmethod
+    def policies() -> dict:
+        from flask import current_app
+        return current_app.config.get('RETENTION_POLICIES', {})
+
+    # TTL -----------------------------------------------------------------
+
+    @staticmethod
+    def ttl_index_specs() -> List[dict]:
+        """TTL index definitions implied by the ``ttl`` policies."""
+        specs = []
+        for collection, policy in Retention.policies().items():
+            if policy.get('strategy') != 'ttl':
+                continue
+            specs.append({
+                'collection': collection,
+                'field': policy['field'],
+                'expire_after': int(timedelta(days=policy.get('days', 0),
+                                              seconds=policy.get('seconds', 0)).total_seconds())
+            })
+        return specs
+
+    @staticmethod
+    def apply_ttl_policies() -> List[str]:
+        """Create TTL indexes, or retune them in place when a policy's period changed."""
+        applied = []
+        for spec in Retention.ttl_index_specs():
+            coll = mongo.db[spec['collection']]
+            index_name, existing = f"{spec['field']}_ttl", None
+            for name, info in coll.index_information().items():
+                if info['key'] == [(spec['field'], 1)]:
+                    index_name, existing = name, info
+                    break
+
+            if existing is None:
+                coll.create_index(
+                    [(spec['field'], 1)],
+                    name=index_name,
+                    expireAfterSeconds=spec['expire_after']
+                )
+            elif existing.get('expireAfterSeconds') != spec['expire_after']:
+                mongo.db.command({
+                    'collMod': spec['collection'],
+                    'index': {'name': index_name, 'expireAfterSeconds': spec['expire_after']}
+                })
+            else:
+                continue
+
+            applied.append(f"{spec['collection']}.{index_name}")
+        return applied
+
+    # Partitions ----------------------------------------------------------
+
+    _known_partitions = set()
+
+    @staticmethod
+    def partition_name(collection: str, when: datetime = None) -> str:
+        """Monthly partition a document written at ``when`` belongs to."""
+        when = when or datetime.utcnow()
+        return f"{collection}_{when:%Y%m}"
+
+    @staticmethod
+    def partition(collection: str, when: datetime = None, indexes: List[list] = None):
+        """Return the partition collection for ``when``, indexing it on first use."""
+        name = Retention.partition_name(collection, when)
+        if name not in Retention._known_partitions:
+            for keys in indexes or []:
+                mongo.db[name].create_index(keys)
+            Retention._known_partitions.add(name)
+        return mongo.db[name]
+
+    @staticmethod
+    def list_partitions(collection: str) -> List[str]:
+        """Existing partitions of ``collection``, newest first."""
+        pattern = re.compile(rf'^{re.escape(collection)}_\d{{6}}$')
+        names = [name for name in mongo.db.list_collection_names() if pattern.match(name)]
+        return sorted(names, reverse=True)
+
+    @staticmethod
+    def drop_expired_partitions() -> List[str]:
+        """Drop monthly partitions older than each ``partition`` policy keeps."""
+        dropped = []
+        now = datetime.utcnow()
+        for collection, policy in Retention.policies().items():
+            if policy.get('strategy') != 'partition':
+                continue
+
+            months = policy.get('months', 6)
+            month_index = now.year * 12 + now.month - 1 - months
+            oldest_kept = Retention.partition_name(
+                collection, datetime(month_index // 12, month_index % 12 + 1, 1)
+            )
+            for name in Retention.list_partitions(collection):
+                if name < oldest_kept:
+                    mongo.db.drop_collection(name)
+                    dropped.append(name)
+        return dropped
+
+    # Sweeps --------------------------------------------------------------
+
+    @staticmethod
+    def sweep_chats(chunk_size: int = 500, pause: float = 0.1) -> int:
+        """Delete inactive chats past their school's retention period, with their dependents."""
+        policy = Retention.policies().get('chats')
+        if not policy or policy.get('strategy') != 'sweep':
+            return 0
+
+        now = datetime.utcnow()
+        default_days = policy.get('days', 90)
+        # Overrides are matched on school_key, so 'MIT' also covers 'M.I.T.' and 'mit'
+        school_days = {
+            normalize_school(school): days for school, days in policy.get('schools', {}).items()
+        }
+        earliest_cutoff = now - timedelta(days=min([default_days, *school_days.values()]))
+
+        query = {policy.get('field', 'last_activity'): {'$lt': earliest_cutoff}}
+        query.update(policy.get('filter', {}))
+        cursor = mongo.db.chats.find(
+            query, {'_id': 1, 'user_id': 1, 'last_activity': 1}
+        ).batch_size(chunk_size)
+
+        deleted = 0
+        chunk = []
+        for chat in cursor:
+            chunk.append(chat)
+            if len(chunk) >= chunk_size:
+                deleted += Retention._delete_chat_chunk(chunk, now, default_days, school_days)
+                chunk = []
+                time.sleep(pause)
+        if chunk:
+            deleted += Retention._delete_chat_chunk(chunk, now, default_days, school_days)
+
+        return deleted
+
+    @staticmethod
+    def _delete_chat_chunk(chats: List[dict], now: datetime, default_days: int,
+                           school_days: dict) -> int:
+        """Apply per-school cutoffs to a chunk and delete the expired chats in bulk."""
+        schools = {}
+        if school_days:
+            owners = mongo.db.users.find(
+                {'_id': {'$in': list({chat['user_id'] for chat in chats})}},
+                {'school': 1, 'school_key': 1}
+            )
+            schools = {
+                owner['_id']: owner.get('school_key') or normalize_school(owner.get('school'))
+                for owner in owners
+            }
+
+        expired_ids = []
+        for chat in chats:
+            days = school_days.get(schools.get(chat['user_id']), default_days)
+            if chat['last_activity'] < now - timedelta(days=days):
+                expired_ids.append(chat['_id'])
+
+        if not expired_ids:
+            return 0
+
+        mongo.db.messages.delete_many({'chat_id': {'$in': expired_ids}})
+        mongo.db.ratings.delete_many({'chat_id': {'$in': expired_ids}})
+        mongo.db.chat_summaries.delete_many({'chat_id': {'$in': expired_ids}})
+        result = mongo.db.chats.delete_many({'_id': {'$in': expired_ids}})
+
+        # Recompute the owners' statistics rather than decrementing chat by chat
+        expired = set(expired_ids)
+        UserStats.rebuild(list({chat['user_id'] for chat in chats if chat['_id'] in expired}))
+        return result.deleted_count
+
+    @staticmethod
+    def apply_all() -> dict:
+        """Run every retention policy once."""
+        results = {'ttl_indexes': [], 'dropped_partitions': [], 'deleted_chats': 0}
+        try:
+            results['ttl_indexes'] = Retention.apply_ttl_policies()
+        except OperationFailure as e:
+            logging.error(f"Failed to apply TTL policies: {str(e)}")
+        results['dropped_partitions'] = Retention.drop_expired_partitions()
+        results['deleted_chats'] = Retention.sweep_chats()
+        return results
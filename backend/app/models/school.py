@@ -0,0 +1,121 @@
+from collections import Counter
+from typing import List
+from pymongo import IndexModel, UpdateOne, ReplaceOne
+from app.extensions import mongo
+from app.utils.helpers import normalize_school, trigrams
+
+# A fuzzy match must share at least this fraction of the query's trigrams
+MIN_TRIGRAM_SIMILARITY = 0.3
+
+class School:
+    """Registry of school names for lookup and typeahead.
+
+    One document per normalized ``school_key`` (its ``_id``) holds the display
+    name, the key's trigrams and member counts. Prefix matches are a range
+    scan on ``_id``; fuzzy matches use the multikey ``trigrams`` index.
+    """
+
+    INDEXES = {
+        'schools': [
+            IndexModel([('trigrams', 1)]),
+        ]
+    }
+
+    # Student counts stay internal; suggestions are served to anonymous users
+    PROJECTION = {'name': 1, 'tutors': 1}
+
+    @staticmethod
+    def register(name: str, role: str):
+        """Count a new tutor or student at ``name``, adding the school if needed."""
+        key = normalize_school(name)
+        if not key or role not in ('tutor', 'student'):
+            return
+        mongo.db.schools.update_one(
+            {'_id': key},
+            {'$setOnInsert': {'name': name.strip(), 'trigrams': trigrams(key)},
+             '$inc': {'tutors' if role == 'tutor' else 'students': 1}},
+            upsert=True
+        )
+
+    @staticmethod
+    def suggest(query: str, limit: int = 10) -> List[dict]:
+        """School names starting with ``query``, topped up with fuzzy matches."""
+        key = normalize_school(query)
+        if not key:
+            return []
+
+        # Every key starting with ``key`` sorts between it and key + U+FFFF
+        matches = [
+            dict(school, match='prefix')
+            for school in mongo.db.schools.find(
+                {'_id': {'$gte': key, '$lt': key + '\uffff'}}, School.PROJECTION
+            ).sort('_id', 1).limit(limit)
+        ]
+
+        grams = trigrams(key)
+        if len(matches) < limit and len(key) >= 3:
+            fuzzy = mongo.db.schools.aggregate([
+                {'$match': {
+                    'trigrams': {'$in': grams},
+                    '_id': {'$nin': [school['_id'] for school in matches]}
+                }},
+                {'$project': dict(School.PROJECTION, score={'$size': {'$setIntersection': ['$trigrams', grams]}})},
+                {'$match': {'score': {'$gte': max(1, round(len(grams) * MIN_TRIGRAM_SIMILARITY))}}},
+                {'$sort': {'score': -1, '_id': 1}},
+                {'$limit': limit - len(matches)}
+            ])
+            matches.extend(dict(school, match='fuzzy') for school in fuzzy)
+
+        return [
+            {
+                'key': school['_id'],
+                'name': school['name'],
+                'tutors': school.get('tutors', 0),
+                'match': school['match']
+            }
+            for school in matches
+        ]
+
+    @staticmethod
+    def rebuild(batch_size: int = 1000) -> dict:
+        """Backfill ``school_key`` on users and tutors and rebuild the registry.
+
+        Returns the number of documents updated per collection and the number
+        of schools.
+        """
+        updated = {}
+        names, counts = {}, {}
+        for collection, counter in (('users', 'students'), ('tutors', 'tutors')):
+            operations, updated[collection] = [], 0
+            cursor = mongo.db[collection].find(
+                {'school': {'$exists': True}}, {'school': 1, 'school_key': 1, 'role': 1}
+            ).batch_size(batch_size)
+            for doc in cursor:
+                key = normalize_school(doc.get('school'))
+                if doc.get('school_key') != key:
+                    operations.append(UpdateOne({'_id': doc['_id']}, {'$set': {'school_key': key}}))
+                if not key or doc.get('role') == 'admin':
+                    continue
+                names.setdefault(key, Counter())[doc['school'].strip()] += 1
+                tally = counts.setdefault(key, {'tutors': 0, 'students': 0})
+                tally[counter] += 1
+                if len(operations) >= batch_size:
+                    updated[collection] += mongo.db[collection].bulk_write(operations, ordered=False).modified_count
+                    operations = []
+            if operations:
+                updated[collection] += mongo.db[collection].bulk_write(operations, ordered=False).modified_count
+
+        # The most common spelling becomes the display name
+        documents = [
+            ReplaceOne({'_id': key}, {
+                'name': names[key].most_common(1)[0][0],
+                'trigrams': trigrams(key),
+                **counts[key]
+            }, upsert=True)
+            for key in counts
+        ]
+        for i in range(0, len(documents), batch_size):
+            mongo.db.schools.bulk_write(documents[i:i + batch_size], ordered=False)
+        mongo.db.schools.delete_many({'_id': {'$nin': list(counts)}})
+
+        return {'updated': updated, 'schools': len(counts)}
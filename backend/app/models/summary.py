@@ -0,0 +1,118 @@
+from datetime import datetime
+from typing import Optional, List
+from bson import ObjectId
+from pymongo import IndexModel, UpdateOne
+from app.extensions import mongo
+
+class ChatSummary:
+    """Persisted AI summary of a chat, tagged with the activity watermark it covers."""
+
+    INDEXES = {
+        'chat_summaries': [IndexModel([('chat_id', 1)], unique=True)]
+    }
+
+    @staticmethod
+    def find_by_chat(chat_id: str) -> Optional[dict]:
+        """Find the stored summary for a chat."""
+        try:
+            return mongo.db.chat_summaries.find_one({'chat_id': ObjectId(chat_id)})
+        except:
+            return None
+
+    @staticmethod
+    def find_by_chats(chat_ids: List[ObjectId]) -> dict:
+        """Find stored summaries for many chats, keyed by chat ``_id``."""
+        try:
+            summaries = mongo.db.chat_summaries.find({'chat_id': {'$in': list(chat_ids)}})
+            return {summary['chat_id']: summary for summary in summaries}
+        except:
+            return {}
+    
+    @staticmethod
+    def is_current(summary: Optional[dict], chat_data: dict) -> bool:
+        """Check whether a stored summary still covers the chat's latest activity.
+        
+        Summaries are only written once every message is folded in, and are
+        discarded when a message is edited or deleted, so an unchanged
+        ``message_count`` means nothing new was written since.
+        """
+        return bool(
+            summary and
+            summary.get('last_message_id') and
+            summary.get('message_count') == chat_data.get('message_count', 0)
+        )
+
+    @staticmethod
+    def upsert(chat_id: str, summary: str, message_count: int,
+               last_message_id: ObjectId, last_message_at: datetime) -> bool:
+        """Create or replace the summary for a chat."""
+        try:
+            mongo.db.chat_summaries.update_one(
+                {'chat_id': ObjectId(chat_id)},
+                {
+                    '$set': {
+                        'summary': summary,
+                        'message_count': message_count,
+                        'last_message_id': last_message_id,
+                        'last_message_at': last_message_at,
+                        'updated_at': datetime.utcnow()
+                    },
+                    '$setOnInsert': {'created_at': datetime.utcnow()}
+                },
+                upsert=True
+            )
+            return True
+        except:
+            return False
+
+    @staticmethod
+    def mark_current(summary: dict, message_count: int) -> bool:
+        """Record that a summary still covers the chat at ``message_count`` messages."""
+        try:
+            mongo.db.chat_summaries.update_one(
+                {'_id': summary['_id']},
+                {'$set': {'message_count': message_count, 'updated_at': datetime.utcnow()}}
+            )
+            return True
+        except:
+            return False
+
+    @staticmethod
+    def bulk_upsert(entries: List[dict]) -> int:
+        """Write many summaries in one round trip.
+
+        Each entry holds ``chat_id``, ``summary``, ``message_count``,
+        ``last_message_id`` and ``last_message_at``.
+        """
+        if not entries:
+            return 0
+        
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {'chat_id': ObjectId(entry['chat_id'])},
+                {
+                    '$set': {
+                        'summary': entry['summary'],
+                        'message_count': entry['message_count'],
+                        'last_message_id': entry['last_message_id'],
+                        'last_message_at': entry['last_message_at'],
+                        'updated_at': now
+                    },
+                    '$setOnInsert': {'created_at': now}
+                },
+                upsert=True
+            )
+            for entry in entries
+        ]
+        result = mongo.db.chat_summaries.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+    
+    @staticmethod
+    def delete_by_chat(chat_id: str) -> bool:
+        """Delete the stored summary for a chat."""
+        try:
+            mongo.db.chat_summaries.delete_one({'chat_id': ObjectId(chat_id)})
+            return True
+        except:
+            return False
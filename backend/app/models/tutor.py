@@ -1,11 +1,30 @@
 from datetime import datetime
+import re
 from typing import Optional, List, Dict
 from bson import ObjectId
+from pymongo import IndexModel
 from app.extensions import mongo
+from app.models.school import School
+from app.utils.helpers import normalize_school
+import logging
 
 class Tutor:
     """Tutor model for human tutors."""
     
+    INDEXES = {
+        'tutors': [
+            # find_all and search_tutors: equality, then the ranking, then max_rate
+            IndexModel([('is_active', 1), ('gpa', -1), ('rating_average', -1), ('_id', -1), ('hourly_rate', 1)]),
+            IndexModel([('is_active', 1), ('rating_average', -1), ('gpa', -1)]),  # top-rated recommendations
+            IndexModel([('subjects', 1), ('is_active', 1), ('gpa', -1), ('rating_average', -1), ('_id', -1), ('hourly_rate', 1)]),
+            IndexModel([('gpa', -1)]),  # find_all(active_only=False)
+            IndexModel([('school_key', 1), ('is_active', 1)]),  # search_tutors by school prefix
+        ],
+        'tutor_ratings': [
+            IndexModel([('tutor_id', 1), ('created_at', -1)]),
+        ]
+    }
+    
     def __init__(self, name: str, subjects: List[str], hourly_rate: float,
                  school: str, gpa: float, contact_info: Dict[str, str],
                  created_by_admin: str):
@@ -19,6 +38,8 @@ class Tutor:
         self.created_at = datetime.utcnow()
         self.is_active = True
         self.rating_average = 0.0
+        self.rating_sum = 0
+        self.rating_count = 0
         self.total_sessions = 0
     
     def save(self):
@@ -28,15 +49,23 @@ class Tutor:
             'subjects': self.subjects,
             'hourly_rate': self.hourly_rate,
             'school': self.school,
+            'school_key': normalize_school(self.school),
             'gpa': self.gpa,
             'contact_info': self.contact_info,
             'created_by_admin': self.created_by_admin,
             'created_at': self.created_at,
             'is_active': self.is_active,
             'rating_average': self.rating_average,
+            'rating_sum': self.rating_sum,
+            'rating_count': self.rating_count,
             'total_sessions': self.total_sessions
         }
         result = mongo.db.tutors.insert_one(tutor_data)
+        try:
+            School.register(self.school, 'tutor')
+        except Exception as e:
+            # The tutor exists now; School.rebuild repairs the registry
+            logging.error(f"Failed to register school {self.school!r}: {str(e)}")
         return str(result.inserted_id)
     
     @staticmethod
@@ -70,25 +99,41 @@ class Tutor:
         )
     
     @staticmethod
-    def search_tutors(school: str = None, min_gpa: float = None, 
-                     subjects: List[str] = None) -> List[dict]:
-        """Advanced tutor search."""
+    def search_tutors(school: str = None, min_gpa: float = None, subjects: List[str] = None,
+                      max_rate: float = None, limit: int = None, after: tuple = None) -> List[dict]:
+        """Advanced tutor search, ranked by gpa then rating.
+
+        Every filter runs in the query. ``after`` is the (gpa, rating_average,
+        _id) of the last tutor on the previous page.
+        """
         query = {'is_active': True}
         
         if school:
-            query['school'] = {'$regex': school, '$options': 'i'}
+            # Anchored and case-sensitive on the normalized key, so the index bounds the scan
+            query['school_key'] = {'$regex': '^' + re.escape(normalize_school(school))}
         
         if min_gpa:
             query['gpa'] = {'$gte': min_gpa}
         
+        if max_rate is not None:
+            query['hourly_rate'] = {'$lte': max_rate}
+        
         if subjects:
             normalized_subjects = [subject.strip().lower() for subject in subjects]
             query['subjects'] = {'$in': normalized_subjects}
         
-        return list(
-            mongo.db.tutors.find(query)
-            .sort([('gpa', -1), ('rating_average', -1)])
-        )
+        if after:
+            gpa, rating_average, tutor_id = after
+            query['$or'] = [
+                {'gpa': {'$lt': gpa}},
+                {'gpa': gpa, 'rating_average': {'$lt': rating_average}},
+                {'gpa': gpa, 'rating_average': rating_average, '_id': {'$lt': tutor_id}}
+            ]
+        
+        cursor = mongo.db.tutors.find(query).sort([('gpa', -1), ('rating_average', -1), ('_id', -1)])
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
     
     @staticmethod
     def get_recommendations(user_subjects: List[str], limit: int = 5) -> List[dict]:
@@ -131,29 +176,99 @@ class Tutor:
         return list(mongo.db.tutors.aggregate(pipeline))
     
     @staticmethod
-    def update_stats(tutor_id: str, new_rating: float = None):
-        """Update tutor statistics."""
+    def update_stats(tutor_id: str, new_rating: float = None, user_id: str = None):
+        """Count a session and, optionally, its rating.
+
+        The rating is folded into ``rating_sum``/``rating_count`` and
+        ``rating_average`` with one atomic pipeline update, so concurrent
+        ratings cannot overwrite each other, and is then kept in
+        ``tutor_ratings`` as the source for ``rebuild_stats``.
+
+        Imported tutors carry a ``rating_average`` over ``total_sessions`` but
+        no ``rating_count``. Their first rating stores that history as
+        ``rating_prior_sum``/``rating_prior_count`` and adds to it, so the
+        imported average is extended rather than replaced.
+        """
         try:
-            updates = {'$inc': {'total_sessions': 1}}
-            
-            if new_rating is not None:
-                # Recalculate average rating (simplified approach)
-                tutor = mongo.db.tutors.find_one({'_id': ObjectId(tutor_id)})
-                if tutor:
-                    current_avg = tutor.get('rating_average', 0.0)
-                    total_sessions = tutor.get('total_sessions', 0)
-                    
-                    # Simple average update (in production, you'd want more sophisticated rating)
-                    new_avg = ((current_avg * total_sessions) + new_rating) / (total_sessions + 1)
-                    updates['$set'] = {'rating_average': round(new_avg, 2)}
-            
-            mongo.db.tutors.update_one(
+            if new_rating is None:
+                result = mongo.db.tutors.update_one(
+                    {'_id': ObjectId(tutor_id)},
+                    {'$inc': {'total_sessions': 1}}
+                )
+                return result.matched_count == 1
+
+            imported = {'$eq': [{'$type': '$rating_count'}, 'missing']}
+            prior_count = {'$cond': [
+                {'$and': [imported, {'$gt': [{'$ifNull': ['$rating_average', 0]}, 0]}]},
+                {'$ifNull': ['$total_sessions', 0]},
+                0
+            ]}
+            result = mongo.db.tutors.update_one(
                 {'_id': ObjectId(tutor_id)},
-                updates
+                [
+                    {'$set': {
+                        'rating_prior_count': {'$ifNull': ['$rating_prior_count', prior_count]},
+                        'rating_prior_sum': {'$ifNull': [
+                            '$rating_prior_sum',
+                            {'$multiply': [prior_count, {'$ifNull': ['$rating_average', 0]}]}
+                        ]}
+                    }},
+                    {'$set': {
+                        'rating_sum': {'$add': [{'$ifNull': ['$rating_sum', '$rating_prior_sum']}, new_rating]},
+                        'rating_count': {'$add': [{'$ifNull': ['$rating_count', '$rating_prior_count']}, 1]},
+                        'total_sessions': {'$add': [{'$ifNull': ['$total_sessions', 0]}, 1]}
+                    }},
+                    {'$set': {
+                        'rating_average': {'$round': [{'$divide': ['$rating_sum', '$rating_count']}, 2]}
+                    }}
+                ]
             )
+            if not result.matched_count:
+                return False
+
+            mongo.db.tutor_ratings.insert_one({
+                'tutor_id': ObjectId(tutor_id),
+                'user_id': ObjectId(user_id) if user_id else None,
+                'rating': new_rating,
+                'created_at': datetime.utcnow()
+            })
             return True
         except:
             return False
+
+    @staticmethod
+    def rebuild_stats() -> int:
+        """Recompute rating statistics for every tutor from ``tutor_ratings``.
+
+        Runs as one aggregation that looks up each tutor's ratings and merges
+        the totals, on top of any imported ``rating_prior_*`` history, back
+        into ``tutors``. Tutors that have never been rated through
+        ``update_stats`` keep their imported ``rating_average``. Returns the
+        number of tutors with rating statistics.
+        """
+        pipeline = [
+            {'$lookup': {
+                'from': 'tutor_ratings',
+                'localField': '_id',
+                'foreignField': 'tutor_id',
+                'as': 'ratings'
+            }},
+            {'$match': {'$or': [{'ratings.0': {'$exists': True}}, {'rating_count': {'$exists': True}}]}},
+            {'$project': {
+                'rating_sum': {'$add': [{'$ifNull': ['$rating_prior_sum', 0]}, {'$sum': '$ratings.rating'}]},
+                'rating_count': {'$add': [{'$ifNull': ['$rating_prior_count', 0]}, {'$size': '$ratings'}]}
+            }},
+            {'$set': {
+                'rating_average': {'$cond': [
+                    {'$gt': ['$rating_count', 0]},
+                    {'$round': [{'$divide': ['$rating_sum', '$rating_count']}, 2]},
+                    0.0
+                ]}
+            }},
+            {'$merge': {'into': 'tutors', 'on': '_id', 'whenMatched': 'merge', 'whenNotMatched': 'discard'}}
+        ]
+        mongo.db.tutors.aggregate(pipeline)
+        return mongo.db.tutors.count_documents({'rating_count': {'$exists': True}})
     
     def to_dict(self) -> dict:
         """Convert tutor to dictionary."""
@@ -167,5 +282,7 @@ class Tutor:
             'created_at': self.created_at,
             'is_active': self.is_active,
             'rating_average': self.rating_average,
+            'rating_sum': self.rating_sum,
+            'rating_count': self.rating_count,
             'total_sessions': self.total_sessions
         }
\ No newline at end of file
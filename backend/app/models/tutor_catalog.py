@@ -0,0 +1,169 @@
+from bisect import bisect_left
+from datetime import datetime
+import heapq
+import threading
+import time
+from types import MappingProxyType
+from typing import List, Optional
+from flask import current_app
+from app.extensions import mongo
+from app.models.tutor import Tutor
+from app.utils.helpers import normalize_school
+
+# Sort keys for the pre-sorted views of active tutors (all descending, _id breaks ties)
+SORT_KEYS = {
+    'gpa': lambda tutor: (tutor['gpa'], tutor['rating_average'], tutor['_id']),
+    'rating': lambda tutor: (tutor['rating_average'], tutor['gpa'], tutor['_id']),
+    'sessions': lambda tutor: (tutor['total_sessions'], tutor['gpa'], tutor['_id']),
+}
+
+class CatalogSnapshot:
+    """An immutable view of every tutor, indexed for the catalog endpoints.
+
+    Active tutors are pre-sorted by each of ``SORT_KEYS`` and grouped by
+    subject and by ``school_key``, each group sorted by gpa then rating.
+    """
+
+    __slots__ = ('version', 'loaded_at', 'by_id', 'all_by_gpa', 'active', 'by_subject', 'by_school',
+                 'school_keys', 'subjects')
+
+    def __init__(self, tutors: List[dict], version: int):
+        tutors = [MappingProxyType(tutor) for tutor in tutors]
+        active = [tutor for tutor in tutors if tutor.get('is_active')]
+
+        by_subject, by_school = {}, {}
+        for tutor in sorted(active, key=SORT_KEYS['gpa'], reverse=True):
+            for subject in tutor['subjects']:
+                by_subject.setdefault(subject, []).append(tutor)
+            school_key = tutor.get('school_key') or normalize_school(tutor['school'])
+            by_school.setdefault(school_key, []).append(tutor)
+
+        self.version = version
+        self.loaded_at = datetime.utcnow()
+        self.by_id = MappingProxyType({str(tutor['_id']): tutor for tutor in tutors})
+        self.all_by_gpa = tuple(sorted(tutors, key=lambda tutor: tutor['gpa'], reverse=True))
+        self.active = MappingProxyType({
+            name: tuple(sorted(active, key=key, reverse=True)) for name, key in SORT_KEYS.items()
+        })
+        self.by_subject = MappingProxyType({subject: tuple(group) for subject, group in by_subject.items()})
+        self.by_school = MappingProxyType({school: tuple(group) for school, group in by_school.items()})
+        self.school_keys = tuple(sorted(by_school))
+        self.subjects = tuple(sorted(
+            ({'subject': subject, 'tutor_count': len(group)} for subject, group in by_subject.items()),
+            key=lambda entry: entry['tutor_count'],
+            reverse=True
+        ))
+
+    def top(self, sort_by: str, limit: int) -> tuple:
+        """The first ``limit`` active tutors by ``sort_by``, without sorting."""
+        return self.active[sort_by][:max(limit, 0)]
+
+    def with_subjects(self, subjects: List[str]) -> List:
+        """Active tutors teaching any of ``subjects``, sorted by gpa then rating."""
+        seen, tutors = set(), []
+        for subject in subjects:
+            for tutor in self.by_subject.get(subject.strip().lower(), ()):
+                if tutor['_id'] not in seen:
+                    seen.add(tutor['_id'])
+                    tutors.append(tutor)
+        return sorted(tutors, key=SORT_KEYS['gpa'], reverse=True)
+
+    def at_school(self, school: str) -> List:
+        """Active tutors whose ``school_key`` starts with ``school``'s, sorted by gpa then rating."""
+        prefix = normalize_school(school)
+        groups = []
+        for key in self.school_keys[bisect_left(self.school_keys, prefix):]:
+            if not key.startswith(prefix):
+                break
+            groups.append(self.by_school[key])
+        return list(heapq.merge(*groups, key=SORT_KEYS['gpa'], reverse=True))
+
+    def search(self, school: str = None, min_gpa: float = None, subjects: List[str] = None,
+               max_rate: float = None, limit: int = None, after: tuple = None) -> List:
+        """In-memory equivalent of ``Tutor.search_tutors``, ranked by gpa then rating."""
+        school_key = normalize_school(school) if school else None
+        if subjects:
+            tutors = self.with_subjects(subjects)
+        elif school_key:
+            tutors = self.at_school(school)
+        else:
+            tutors = self.active['gpa']
+
+        results = []
+        for tutor in tutors:
+            if after and SORT_KEYS['gpa'](tutor) >= after:
+                continue
+            if school_key and not (tutor.get('school_key') or normalize_school(tutor['school'])).startswith(school_key):
+                continue
+            if min_gpa and tutor['gpa'] < min_gpa:
+                continue
+            if max_rate is not None and tutor['hourly_rate'] > max_rate:
+                continue
+            results.append(tutor)
+            if limit and len(results) >= limit:
+                break
+        return results
+
+class TutorCatalog:
+    """In-process snapshot of the tutor catalog, served without querying MongoDB.
+
+    Admin writes bump a version counter in ``catalog_versions``; each process
+    compares it with its snapshot at most every ``TUTOR_CATALOG_VERSION_CHECK``
+    seconds and reloads when it changed, or when the snapshot is older than
+    ``TUTOR_CATALOG_TTL``. Readers always get a complete snapshot: a reload
+    builds a new one and swaps it in.
+    """
+
+    _snapshot = None
+    _next_check = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _current_version() -> int:
+        document = mongo.db.catalog_versions.find_one({'_id': 'tutors'})
+        return document['version'] if document else 0
+
+    @staticmethod
+    def _load() -> CatalogSnapshot:
+        # Read the version first so a write racing with the load is picked up next check
+        version = TutorCatalog._current_version()
+        return CatalogSnapshot(Tutor.find_all(active_only=False), version)
+
+    @staticmethod
+    def get() -> CatalogSnapshot:
+        """Return the current snapshot, loading or refreshing it when due."""
+        snapshot = TutorCatalog._snapshot
+        if snapshot is None:
+            with TutorCatalog._lock:
+                if TutorCatalog._snapshot is None:
+                    TutorCatalog._snapshot = TutorCatalog._load()
+                    TutorCatalog._next_check = time.monotonic() + current_app.config.get('TUTOR_CATALOG_VERSION_CHECK', 5)
+                return TutorCatalog._snapshot
+
+        if time.monotonic() < TutorCatalog._next_check:
+            return snapshot
+
+        # One thread checks; the others keep serving the current snapshot
+        if not TutorCatalog._lock.acquire(blocking=False):
+            return snapshot
+        try:
+            ttl = current_app.config.get('TUTOR_CATALOG_TTL', 300)
+            age = (datetime.utcnow() - snapshot.loaded_at).total_seconds()
+            if age > ttl or TutorCatalog._current_version() != snapshot.version:
+                TutorCatalog._snapshot = TutorCatalog._load()
+            TutorCatalog._next_check = time.monotonic() + current_app.config.get('TUTOR_CATALOG_VERSION_CHECK', 5)
+        finally:
+            TutorCatalog._lock.release()
+        return TutorCatalog._snapshot
+
+    @staticmethod
+    def find_by_id(tutor_id: str) -> Optional[dict]:
+        """Find a tutor in the snapshot."""
+        return TutorCatalog.get().by_id.get(tutor_id)
+
+    @staticmethod
+    def invalidate():
+        """Record a tutor write so every process reloads its snapshot."""
+        mongo.db.catalog_versions.update_one({'_id': 'tutors'}, {'$inc': {'version': 1}}, upsert=True)
+        with TutorCatalog._lock:
+            TutorCatalog._snapshot = None
@@ -0,0 +1,194 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from bson import ObjectId
+from pymongo import IndexModel, UpdateOne, ReplaceOne
+from app.extensions import mongo
+
+METRICS = ('tokens', 'messages', 'latency_sum')
+
+def _key(value) -> str:
+    """Make a model or school name safe to use as a field name."""
+    return str(value or 'unknown').replace('.', '_').replace('$', '_')
+
+def _hour(when: datetime) -> datetime:
+    return when.replace(minute=0, second=0, microsecond=0)
+
+def _day(when: datetime) -> datetime:
+    return when.replace(hour=0, minute=0, second=0, microsecond=0)
+
+class UsageBucket:
+    """Time-bucketed AI usage rollups.
+
+    Every AI message adds its tokens, a message count and its response time
+    to three documents in ``usage_buckets`` with one ``bulk_write`` of
+    ``$inc`` upserts: the platform's hourly and daily buckets (broken down
+    ``by_model`` and ``by_school``) and the user's daily bucket. Thirty days
+    of platform usage is then at most 720 hourly documents.
+    """
+
+    INDEXES = {
+        'usage_buckets': [
+            IndexModel([('scope', 1), ('granularity', 1), ('start', 1)]),
+            IndexModel([('user_id', 1), ('start', 1)], sparse=True),
+        ]
+    }
+
+    @staticmethod
+    def _ids(when: datetime, user_id) -> dict:
+        return {
+            'hour': f"hour:{when:%Y%m%d%H}",
+            'day': f"day:{when:%Y%m%d}",
+            'user': f"day:{when:%Y%m%d}:{user_id}"
+        }
+
+    @staticmethod
+    def record(user_id: str, tokens: int, model: str = None, school: str = None,
+               latency: float = 0.0, when: datetime = None):
+        """Add one AI message to its usage buckets."""
+        when = when or datetime.utcnow()
+        ids = UsageBucket._ids(when, user_id)
+        values = {'tokens': tokens, 'messages': 1, 'latency_sum': latency or 0.0}
+
+        breakdown = dict(values)
+        for metric, value in values.items():
+            breakdown[f'by_model.{_key(model)}.{metric}'] = value
+            breakdown[f'by_school.{_key(school)}.{metric}'] = value
+
+        mongo.db.usage_buckets.bulk_write([
+            UpdateOne(
+                {'_id': ids['hour']},
+                {'$inc': breakdown,
+                 '$setOnInsert': {'scope': 'platform', 'granularity': 'hour', 'start': _hour(when)}},
+                upsert=True
+            ),
+            UpdateOne(
+                {'_id': ids['day']},
+                {'$inc': breakdown,
+                 '$setOnInsert': {'scope': 'platform', 'granularity': 'day', 'start': _day(when)}},
+                upsert=True
+            ),
+            UpdateOne(
+                {'_id': ids['user']},
+                {'$inc': values,
+                 '$setOnInsert': {'scope': 'user', 'granularity': 'day', 'start': _day(when),
+                                  'user_id': ObjectId(user_id), 'school': school}},
+                upsert=True
+            ),
+        ], ordered=False)
+
+    @staticmethod
+    def usage(date_from: datetime, date_to: datetime = None, user_id: str = None) -> dict:
+        """Usage totals and a time series between ``date_from`` and ``date_to``.
+
+        Platform usage reads hourly buckets for ranges up to 30 days and daily
+        buckets beyond that; a user's usage reads their daily buckets.
+        """
+        date_to = date_to or datetime.utcnow()
+        if user_id:
+            query = {'user_id': ObjectId(user_id), 'start': {'$gte': _day(date_from), '$lt': date_to}}
+            granularity = 'day'
+        else:
+            granularity = 'hour' if date_to - date_from <= timedelta(days=30) else 'day'
+            start = _hour(date_from) if granularity == 'hour' else _day(date_from)
+            query = {'scope': 'platform', 'granularity': granularity, 'start': {'$gte': start, '$lt': date_to}}
+
+        totals = {metric: 0 for metric in METRICS}
+        by_model, by_school, series = {}, {}, []
+        for bucket in mongo.db.usage_buckets.find(query).sort('start', 1):
+            for metric in METRICS:
+                totals[metric] += bucket.get(metric, 0)
+            for name, breakdown in (('by_model', by_model), ('by_school', by_school)):
+                for key, values in bucket.get(name, {}).items():
+                    entry = breakdown.setdefault(key, {metric: 0 for metric in METRICS})
+                    for metric in METRICS:
+                        entry[metric] += values.get(metric, 0)
+            series.append({
+                'start': bucket['start'],
+                'tokens': bucket.get('tokens', 0),
+                'messages': bucket.get('messages', 0)
+            })
+
+        return {
+            'granularity': granularity,
+            'total_tokens': totals['tokens'],
+            'total_messages': totals['messages'],
+            'avg_tokens_per_message': round(totals['tokens'] / totals['messages'], 2) if totals['messages'] else 0,
+            'avg_latency': round(totals['latency_sum'] / totals['messages'], 3) if totals['messages'] else 0,
+            'by_model': by_model,
+            'by_school': by_school,
+            'series': series
+        }
+
+    @staticmethod
+    def backfill(date_from: datetime, date_to: Optional[datetime] = None, batch_size: int = 1000) -> int:
+        """Rebuild buckets from the messages collection, one day at a time.
+
+        Buckets in the range are replaced, so the job can be rerun safely.
+        ``date_to`` defaults to the start of today so live ``$inc`` updates to
+        the current day are never overwritten.
+        """
+        day = _day(date_from)
+        date_to = _day(date_to or datetime.utcnow())
+        written = 0
+
+        while day < date_to:
+            next_day = day + timedelta(days=1)
+            groups = list(mongo.db.messages.aggregate([
+                {'$match': {'sender': 'ai', 'created_at': {'$gte': day, '$lt': next_day}}},
+                {'$group': {
+                    '_id': {
+                        'hour': {'$hour': '$created_at'},
+                        'user_id': '$user_id',
+                        'model': '$metadata.model'
+                    },
+                    'tokens': {'$sum': '$tokens_used'},
+                    'messages': {'$sum': 1},
+                    'latency_sum': {'$sum': {'$ifNull': ['$metadata.response_time', 0]}}
+                }}
+            ]))
+
+            user_ids = list({group['_id'].get('user_id') for group in groups} - {None})
+            schools = {
+                user['_id']: user.get('school')
+                for user in mongo.db.users.find({'_id': {'$in': user_ids}}, {'school': 1})
+            }
+
+            buckets = {}
+            for group in groups:
+                key = group['_id']
+                hour = day.replace(hour=key['hour'])
+                values = {metric: group[metric] for metric in METRICS}
+                school = schools.get(key.get('user_id'))
+
+                for bucket_id, granularity, start in (
+                    (f"hour:{hour:%Y%m%d%H}", 'hour', hour),
+                    (f"day:{day:%Y%m%d}", 'day', day)
+                ):
+                    bucket = buckets.setdefault(bucket_id, {
+                        'scope': 'platform', 'granularity': granularity, 'start': start,
+                        **{metric: 0 for metric in METRICS}, 'by_model': {}, 'by_school': {}
+                    })
+                    for name, dimension in (('by_model', key.get('model')), ('by_school', school)):
+                        entry = bucket[name].setdefault(_key(dimension), {metric: 0 for metric in METRICS})
+                        for metric in METRICS:
+                            entry[metric] += values[metric]
+                    for metric in METRICS:
+                        bucket[metric] += values[metric]
+
+                if key.get('user_id'):
+                    bucket = buckets.setdefault(f"day:{day:%Y%m%d}:{key['user_id']}", {
+                        'scope': 'user', 'granularity': 'day', 'start': day,
+                        'user_id': key['user_id'], 'school': school,
+                        **{metric: 0 for metric in METRICS}
+                    })
+                    for metric in METRICS:
+                        bucket[metric] += values[metric]
+
+            operations = [ReplaceOne({'_id': bucket_id}, bucket, upsert=True) for bucket_id, bucket in buckets.items()]
+            for i in range(0, len(operations), batch_size):
+                result = mongo.db.usage_buckets.bulk_write(operations[i:i + batch_size], ordered=False)
+                written += result.upserted_count + result.modified_count
+
+            day = next_day
+
+        return written
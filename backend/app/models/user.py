@@ -1,12 +1,25 @@
 from datetime import datetime
 from typing import Optional, List
 from bson import ObjectId
+from pymongo import IndexModel
 from app.extensions import mongo
+from app.models.school import School
+from app.utils.helpers import normalize_school
 from werkzeug.security import generate_password_hash, check_password_hash
+import logging
 
 class User:
     """User model for students and admins."""
     
+    INDEXES = {
+        'users': [
+            IndexModel([('email', 1)], unique=True),
+            IndexModel([('role', 1), ('created_at', -1)]),  # find_all_students
+            IndexModel([('role', 1), ('school_key', 1)]),  # bulk jobs and notifications by school
+            IndexModel([('student_id', 1)]),
+        ]
+    }
+    
     def __init__(self, email: str, password: str, name: str, role: str, 
                  school: str, student_id: str, is_verified: bool = False):
         self.email = email.lower().strip()
@@ -27,12 +40,18 @@ class User:
             'name': self.name,
             'role': self.role,
             'school': self.school,
+            'school_key': normalize_school(self.school),
             'student_id': self.student_id,
             'is_verified': self.is_verified,
             'created_at': self.created_at,
             'last_login': self.last_login
         }
         result = mongo.db.users.insert_one(user_data)
+        try:
+            School.register(self.school, self.role)
+        except Exception as e:
+            # The user exists now; School.rebuild repairs the registry
+            logging.error(f"Failed to register school {self.school!r}: {str(e)}")
         return str(result.inserted_id)
     
     def update_last_login(self):
@@ -67,6 +86,28 @@ class User:
             query['is_verified'] = True
         return list(mongo.db.users.find(query).sort('created_at', -1))
     
+    @staticmethod
+    def count_students_at_school(school: str) -> int:
+        """Count the students of a school, matched by its normalized key."""
+        return mongo.db.users.count_documents({'role': 'student', 'school_key': normalize_school(school)})
+    
+    @staticmethod
+    def iter_student_ids_at_school(school: str, batch_size: int = 1000):
+        """Yield the ids of a school's students, ``batch_size`` at a time, from one cursor."""
+        cursor = mongo.db.users.find(
+            {'role': 'student', 'school_key': normalize_school(school)},
+            {'_id': 1}
+        ).batch_size(batch_size)
+        
+        batch = []
+        for student in cursor:
+            batch.append(student['_id'])
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
     @staticmethod
     def verify_student(user_id: str) -> bool:
         """Verify a student account."""
@@ -91,6 +132,7 @@ class User:
             'name': self.name,
             'role': self.role,
             'school': self.school,
+            'school_key': normalize_school(self.school),
             'student_id': self.student_id,
             'is_verified': self.is_verified,
             'created_at': self.created_at,
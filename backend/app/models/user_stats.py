@@ -0,0 +1,170 @@
+from datetime import datetime
+from typing import List, Optional
+from bson import ObjectId
+from pymongo import ReplaceOne
+from app.extensions import mongo
+
+RATING_VALUES = range(1, 6)
+
+class UserStats:
+    """Per-user chat and rating statistics, maintained on write.
+
+    One document per user, keyed by the user's ``_id``, is adjusted with
+    ``$inc`` whenever that user's chats, messages or ratings change, so a
+    profile view is a single ``_id`` lookup. ``rebuild`` recomputes documents
+    from the source collections to correct any drift.
+
+    Increments never create a document: a user without one has it built in
+    full by ``rebuild`` on their first profile view, which already counts
+    every change made before it.
+    """
+
+    @staticmethod
+    def _inc(user_id, increments: dict):
+        mongo.db.user_stats.update_one(
+            {'_id': ObjectId(user_id)},
+            {'$inc': increments, '$set': {'updated_at': datetime.utcnow()}}
+        )
+
+    @staticmethod
+    def record_chat(user_id, is_ai_session: bool = True):
+        """Count a new chat."""
+        UserStats._inc(user_id, {'total_chats': 1, 'ai_sessions': 1 if is_ai_session else 0})
+
+    @staticmethod
+    def record_activity(user_id, token_count: int = 0):
+        """Count chat activity, mirroring ``Chat.update_activity``."""
+        UserStats._inc(user_id, {'total_messages': 1, 'total_tokens': max(token_count, 0)})
+
+    @staticmethod
+    def record_rating(user_id, rating: int, previous: int = None):
+        """Count a new rating, or replace ``previous`` when a rating was changed."""
+        increments = {'rating_sum': rating, f'rating_distribution.{rating}': 1}
+        if previous is None:
+            increments['total_ratings'] = 1
+        else:
+            increments['rating_sum'] -= previous
+            increments[f'rating_distribution.{previous}'] = increments.get(
+                f'rating_distribution.{previous}', 0) - 1
+        UserStats._inc(user_id, increments)
+
+    @staticmethod
+    def remove_rating(user_id, rating: int):
+        """Uncount a deleted rating."""
+        UserStats._inc(user_id, {
+            'total_ratings': -1,
+            'rating_sum': -rating,
+            f'rating_distribution.{rating}': -1
+        })
+
+    @staticmethod
+    def remove_chat(user_id, chat: dict, ratings: List[int]):
+        """Uncount a deleted chat and the ratings deleted with it."""
+        increments = {
+            'total_chats': -1,
+            'ai_sessions': -1 if chat.get('is_ai_session') else 0,
+            'total_messages': -chat.get('message_count', 0),
+            'total_tokens': -chat.get('total_tokens', 0),
+            'total_ratings': -len(ratings),
+            'rating_sum': -sum(ratings)
+        }
+        for rating in ratings:
+            key = f'rating_distribution.{rating}'
+            increments[key] = increments.get(key, 0) - 1
+        UserStats._inc(user_id, increments)
+
+    @staticmethod
+    def find_by_user(user_id: str) -> Optional[dict]:
+        """Find a user's statistics document."""
+        try:
+            return mongo.db.user_stats.find_one({'_id': ObjectId(user_id)})
+        except:
+            return None
+
+    @staticmethod
+    def chat_stats(stats: Optional[dict]) -> dict:
+        """Chat statistics in the shape of ``Chat.get_user_stats``."""
+        stats = stats or {}
+        return {
+            'total_chats': stats.get('total_chats', 0),
+            'total_messages': stats.get('total_messages', 0),
+            'total_tokens': stats.get('total_tokens', 0),
+            'ai_sessions': stats.get('ai_sessions', 0)
+        }
+
+    @staticmethod
+    def rating_stats(stats: Optional[dict]) -> dict:
+        """Rating statistics in the shape of ``Rating.get_user_rating_stats``."""
+        stats = stats or {}
+        total = stats.get('total_ratings', 0)
+        distribution = stats.get('rating_distribution', {})
+        return {
+            'avg_rating': round(stats.get('rating_sum', 0) / total, 2) if total else 0.0,
+            'total_ratings': total,
+            'rating_distribution': {i: distribution.get(str(i), 0) for i in RATING_VALUES}
+        }
+
+    @staticmethod
+    def rebuild(user_ids: List = None, batch_size: int = 500) -> int:
+        """Recompute statistics from chats and ratings.
+
+        Rebuilds the given users, or every student in batches when ``user_ids``
+        is omitted. Returns the number of documents written.
+        """
+        if user_ids is None:
+            written = 0
+            batch = []
+            students = mongo.db.users.find({'role': 'student'}, {'_id': 1}).batch_size(batch_size)
+            for student in students:
+                batch.append(student['_id'])
+                if len(batch) >= batch_size:
+                    written += UserStats.rebuild(batch)
+                    batch = []
+            if batch:
+                written += UserStats.rebuild(batch)
+            return written
+
+        user_ids = [ObjectId(user_id) for user_id in user_ids]
+        if not user_ids:
+            return 0
+
+        now = datetime.utcnow()
+        stats = {
+            user_id: {
+                'total_chats': 0, 'ai_sessions': 0, 'total_messages': 0, 'total_tokens': 0,
+                'total_ratings': 0, 'rating_sum': 0,
+                'rating_distribution': {str(i): 0 for i in RATING_VALUES},
+                'updated_at': now
+            }
+            for user_id in user_ids
+        }
+
+        chat_totals = mongo.db.chats.aggregate([
+            {'$match': {'user_id': {'$in': user_ids}}},
+            {'$group': {
+                '_id': '$user_id',
+                'total_chats': {'$sum': 1},
+                'ai_sessions': {'$sum': {'$cond': [{'$eq': ['$is_ai_session', True]}, 1, 0]}},
+                'total_messages': {'$sum': '$message_count'},
+                'total_tokens': {'$sum': '$total_tokens'}
+            }}
+        ])
+        for totals in chat_totals:
+            stats[totals.pop('_id')].update(totals)
+
+        rating_counts = mongo.db.ratings.aggregate([
+            {'$match': {'user_id': {'$in': user_ids}}},
+            {'$group': {'_id': {'user_id': '$user_id', 'rating': '$rating'}, 'count': {'$sum': 1}}}
+        ])
+        for counts in rating_counts:
+            user_stats = stats[counts['_id']['user_id']]
+            rating = counts['_id']['rating']
+            user_stats['total_ratings'] += counts['count']
+            user_stats['rating_sum'] += rating * counts['count']
+            user_stats['rating_distribution'][str(rating)] = counts['count']
+
+        result = mongo.db.user_stats.bulk_write([
+            ReplaceOne({'_id': user_id}, document, upsert=True)
+            for user_id, document in stats.items()
+        ], ordered=False)
+        return result.upserted_count + result.modified_count
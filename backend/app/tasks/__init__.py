@@ -1,10 +1,20 @@
 # Tasks package
 from .ai_tasks import *
+from .bulk_tasks import bulk_generate_task
+from .notification_tasks import send_bulk_notification_task, flush_notifications_task
 
 __all__ = [
     'generate_summary_task',
     'generate_quiz_task', 
+    'precompute_quizzes_task',
     'cleanup_old_chats_task',
+    'apply_retention_task',
+    'rebuild_user_stats_task',
+    'rebuild_tutor_stats_task',
+    'backfill_usage_task',
     'send_notification_task',
-    'daily_maintenance_task'
+    'daily_maintenance_task',
+    'bulk_generate_task',
+    'send_bulk_notification_task',
+    'flush_notifications_task'
 ]
\ No newline at end of file
@@ -1,57 +1,171 @@
-from celery import Celery
 from app.extensions import celery
 from app.models.chat import Chat
 from app.models.message import Message
+from app.models.summary import ChatSummary
+from app.models.quiz import QuizCache
+from app.models.retention import Retention
+from app.models.user_stats import UserStats
+from app.models.usage import UsageBucket
+from app.models.tutor import Tutor
+from app.tasks.backend import task_backend
+from app.tasks.worker import AppContextTask, get_model
+from app.tasks.notification_tasks import notify
 from app.utils.helpers import generate_chat_title
-import google.generativeai as genai
 from flask import current_app
 import logging
+import time
 
-@celery.task
-def generate_summary_task(chat_id: str) -> dict:
-    """Generate summary for a chat session (async task)."""
+def _format_conversation(messages: list) -> str:
+    """Render messages as a Student/AI Tutor transcript."""
+    conversation = []
+    for msg in messages:
+        sender = "Student" if msg['sender'] == 'user' else "AI Tutor"
+        conversation.append(f"{sender}: {msg['text']}")
+    return "\n".join(conversation)
+
+# Messages folded into a summary per model call
+SUMMARY_BATCH_SIZE = 50
+
+def load_summary_messages(chat_id: str, existing: dict = None) -> list:
+    """Load the next messages a summary must cover: a batch after ``existing``, or the last 20."""
+    if existing and existing.get('last_message_id'):
+        return Message.find_after(
+            chat_id, existing['last_message_at'], existing['last_message_id'], limit=SUMMARY_BATCH_SIZE
+        )
+    return list(reversed(Message.get_latest_messages(chat_id, count=20)))  # Last 20 messages
+
+def summarize_chat(model, chat_id: str, existing: dict = None, deadline: float = None) -> tuple:
+    """Fold every message after ``existing``'s watermark into the summary.
+    
+    Messages are sent a batch at a time until the chat is caught up, or until
+    the ``time.monotonic()`` ``deadline`` has passed, leaving the rest for the
+    next run. Returns (summary, first new message), where ``summary`` holds
+    the text, the (``last_message_at``, ``last_message_id``) of the last
+    message actually summarized and whether it is ``caught_up``, or
+    (None, None) when there was nothing new.
+    """
+    summary, first_message = None, None
+    messages = load_summary_messages(chat_id, existing)
+    while messages:
+        response = model.generate_content(build_summary_prompt(messages, summary or existing))
+        summary = {
+            'summary': response.text,
+            'last_message_id': messages[-1]['_id'],
+            'last_message_at': messages[-1]['created_at'],
+            'caught_up': len(messages) < SUMMARY_BATCH_SIZE
+        }
+        first_message = first_message or messages[0]
+        if summary['caught_up'] or (deadline is not None and time.monotonic() >= deadline):
+            break
+        messages = load_summary_messages(chat_id, summary)
+        summary['caught_up'] = not messages
+    return summary, first_message
+
+def build_summary_prompt(messages: list, existing: dict = None) -> str:
+    """Build the summary prompt, extending ``existing`` when there is one."""
+    conversation_text = _format_conversation(messages)
+    
+    if existing:
+        return (
+            "Below is an existing summary of a conversation between a student and an AI tutor, "
+            "followed by the messages exchanged since it was written. Update the summary so it "
+            "covers the whole conversation, keeping it concise and focused on the main topics "
+            "and key learning points.\n\n"
+            f"Existing summary:\n{existing['summary']}\n\n"
+            f"New messages:\n{conversation_text}"
+        )
+    return (
+        "Please provide a concise summary of the following conversation between a student and an AI tutor. "
+        "Focus on the main topics discussed and key learning points:\n\n"
+        f"{conversation_text}"
+    )
+
+@celery.task(bind=True, base=AppContextTask)
+def generate_summary_task(self, chat_id: str) -> dict:
+    """Generate summary for a chat session (async task).
+
+    Summaries are stored per chat with the position of the last message they
+    cover and the chat's ``message_count`` when they were written. An
+    unchanged chat returns the stored summary without calling the model; a
+    chat with new activity only sends the previous summary plus the messages
+    written since it, a batch at a time until it is caught up. Editing or
+    deleting a message discards the summary.
+
+    The threaded LLM worker never enforces the soft time limit, so no batch
+    is started once another model call could overrun it; the summary is
+    saved as far as it got and the next request continues from there.
+    """
     try:
+        task_backend.update_progress(self, 'Loading messages', 10)
+        
         # Get chat and messages
         chat_data = Chat.find_by_id(chat_id)
         if not chat_data:
             return {'success': False, 'message': 'Chat not found'}
         
-        messages = Message.find_by_chat(chat_id, limit=20)  # Last 20 messages
-        
-        if not messages:
-            return {'success': False, 'message': 'No messages to summarize'}
-        
-        # Prepare conversation text
-        conversation = []
-        for msg in messages:
-            sender = "Student" if msg['sender'] == 'user' else "AI Tutor"
-            conversation.append(f"{sender}: {msg['text']}")
-        
-        conversation_text = "\n".join(conversation)
+        existing = ChatSummary.find_by_chat(chat_id)
+        if ChatSummary.is_current(existing, chat_data):
+            return {
+                'success': True,
+                'summary': existing['summary'],
+                'chat_id': chat_id,
+                'cached': True
+            }
         
         # Generate summary using Gemini
         try:
-            genai.configure(api_key=current_app.config['GEMINI_API_KEY'])
-            model = genai.GenerativeModel('gemini-pro')
-            
-            prompt = (
-                "Please provide a concise summary of the following conversation between a student and an AI tutor. "
-                "Focus on the main topics discussed and key learning points:\n\n"
-                f"{conversation_text}"
+            task_backend.update_progress(self, 'Calling model', 30)
+            model = get_model()
+            deadline = time.monotonic() + (
+                current_app.config['CELERY_LLM_SOFT_TIME_LIMIT'] - current_app.config['GEMINI_REQUEST_TIMEOUT']
             )
             
-            response = model.generate_content(prompt)
-            summary = response.text
+            generated, first_message = summarize_chat(model, chat_id, existing, deadline)
+            
+            if not generated:
+                if existing:
+                    # Nothing after the watermark: the count moved without new messages
+                    # (e.g. saved before update_activity ran), so refresh it
+                    ChatSummary.mark_current(existing, chat_data.get('message_count', 0))
+                    return {
+                        'success': True,
+                        'summary': existing['summary'],
+                        'chat_id': chat_id,
+                        'cached': True
+                    }
+                return {'success': False, 'message': 'No messages to summarize'}
+            
+            task_backend.update_progress(self, 'Post-processing', 80)
+            summary = generated['summary']
+            
+            task_backend.update_progress(self, 'Saving summary', 90)
+            # chat_data was read before any message was loaded, so its count never
+            # claims more than the summary covers; a partial summary stores no
+            # count so it is never current
+            ChatSummary.upsert(
+                chat_id,
+                summary,
+                message_count=chat_data.get('message_count', 0) if generated['caught_up'] else None,
+                last_message_id=generated['last_message_id'],
+                last_message_at=generated['last_message_at']
+            )
             
             # Update chat title if it's still "New Chat"
-            if chat_data.get('title') == 'New Chat' and messages:
-                new_title = generate_chat_title(messages[0]['text'])
+            if chat_data.get('title') == 'New Chat' and not existing:
+                new_title = generate_chat_title(first_message['text'])
                 Chat.update_title(chat_id, new_title)
             
+            notify([{
+                'user_id': str(chat_data['user_id']),
+                'message': f"Your summary for \"{chat_data.get('title', 'New Chat')}\" is ready",
+                'type': 'summary'
+            }])
+            
             return {
                 'success': True,
                 'summary': summary,
-                'chat_id': chat_id
+                'chat_id': chat_id,
+                'cached': False
             }
             
         except Exception as e:
@@ -68,50 +182,83 @@ def generate_summary_task(chat_id: str) -> dict:
             'message': f'Task failed: {str(e)}'
         }
 
-@celery.task
-def generate_quiz_task(chat_id: str, topic: str = None) -> dict:
+# Messages from the start of a chat a quiz is generated from
+QUIZ_SOURCE_MESSAGES = 10
+
+def _quiz_text(messages: list) -> str:
+    # Focus on AI responses for educational content
+    content = [msg['text'] for msg in messages if msg['sender'] == 'ai']
+    return "\n".join(content)
+
+def get_quiz_content(chat_id: str) -> str:
+    """Collect the AI-authored text a quiz for this chat is generated from."""
+    return _quiz_text(Message.find_by_chat(chat_id, limit=QUIZ_SOURCE_MESSAGES))
+
+def get_quiz_contents(chat_ids: list) -> dict:
+    """Quiz source text for many chats in one query, keyed by chat ``_id``."""
+    messages = Message.find_first_by_chats(chat_ids, limit=QUIZ_SOURCE_MESSAGES)
+    return {chat_id: _quiz_text(chat_messages) for chat_id, chat_messages in messages.items()}
+
+def build_quiz_prompt(content_text: str, topic: str = None) -> str:
+    """Build the quiz generation prompt."""
+    quiz_prompt = (
+        "Based on the following educational content, create 5 multiple-choice quiz questions. "
+        "Format each question with 4 options (A, B, C, D) and indicate the correct answer. "
+        "Make the questions test understanding of key concepts:\n\n"
+        f"{content_text}"
+    )
+    
+    if topic:
+        quiz_prompt = f"Focus on the topic of '{topic}'. " + quiz_prompt
+    
+    return quiz_prompt
+
+@celery.task(bind=True, base=AppContextTask)
+def generate_quiz_task(self, chat_id: str, topic: str = None) -> dict:
     """Generate quiz questions based on chat content (async task)."""
     try:
-        # Get chat messages
-        messages = Message.find_by_chat(chat_id, limit=10)
-        
-        if not messages:
-            return {'success': False, 'message': 'No messages found for quiz generation'}
+        task_backend.update_progress(self, 'Loading messages', 10)
         
         # Extract content for quiz generation
-        content = []
-        for msg in messages:
-            if msg['sender'] == 'ai':  # Focus on AI responses for educational content
-                content.append(msg['text'])
+        content_text = get_quiz_content(chat_id)
         
-        if not content:
+        if not content_text:
             return {'success': False, 'message': 'No educational content found'}
         
-        content_text = "\n".join(content)
+        content_key = QuizCache.content_key(content_text, topic)
+        cached = QuizCache.find(content_key)
+        if cached:
+            return {
+                'success': True,
+                'quiz': cached['quiz'],
+                'chat_id': chat_id,
+                'topic': topic,
+                'cached': True
+            }
         
         # Generate quiz using Gemini
         try:
-            genai.configure(api_key=current_app.config['GEMINI_API_KEY'])
-            model = genai.GenerativeModel('gemini-pro')
-            
-            quiz_prompt = (
-                "Based on the following educational content, create 5 multiple-choice quiz questions. "
-                "Format each question with 4 options (A, B, C, D) and indicate the correct answer. "
-                "Make the questions test understanding of key concepts:\n\n"
-                f"{content_text}"
-            )
-            
-            if topic:
-                quiz_prompt = f"Focus on the topic of '{topic}'. " + quiz_prompt
+            task_backend.update_progress(self, 'Calling model', 30)
+            model = get_model()
             
+            quiz_prompt = build_quiz_prompt(content_text, topic)
             response = model.generate_content(quiz_prompt)
+            
+            task_backend.update_progress(self, 'Post-processing', 80)
             quiz_content = response.text
             
+            task_backend.update_progress(self, 'Saving quiz', 90)
+            QuizCache.store(
+                content_key, chat_id, topic, quiz_content,
+                ttl=current_app.config.get('QUIZ_CACHE_TTL', 7 * 24 * 3600)
+            )
+            
             return {
                 'success': True,
                 'quiz': quiz_content,
                 'chat_id': chat_id,
-                'topic': topic
+                'topic': topic,
+                'cached': False
             }
             
         except Exception as e:
@@ -128,29 +275,58 @@ def generate_quiz_task(chat_id: str, topic: str = None) -> dict:
             'message': f'Task failed: {str(e)}'
         }
 
-@celery.task
-def cleanup_old_chats_task() -> dict:
-    """Clean up old inactive chats (runs periodically)."""
+@celery.task(base=AppContextTask)
+def precompute_quizzes_task() -> dict:
+    """Warm the quiz cache for recently active chats (runs off-peak via celery beat)."""
     try:
         from datetime import datetime, timedelta
         from app.extensions import mongo
         
-        # Delete chats older than 90 days with no activity
-        cutoff_date = datetime.utcnow() - timedelta(days=90)
+        window_hours = current_app.config.get('QUIZ_PRECOMPUTE_WINDOW_HOURS', 24)
+        limit = current_app.config.get('QUIZ_PRECOMPUTE_LIMIT', 500)
+        since = datetime.utcnow() - timedelta(hours=window_hours)
         
-        # Find old chats
-        old_chats = list(mongo.db.chats.find({
-            'last_activity': {'$lt': cutoff_date},
-            'message_count': {'$lt': 5}  # Only delete chats with very few messages
-        }))
+        recent_chats = mongo.db.chats.find(
+            {'last_activity': {'$gte': since}},
+            {'_id': 1}
+        ).sort('last_activity', -1).limit(limit)
         
-        deleted_count = 0
-        for chat in old_chats:
+        generated = 0
+        skipped = 0
+        for chat in recent_chats:
             chat_id = str(chat['_id'])
-            user_id = str(chat['user_id'])
+            content_text = get_quiz_content(chat_id)
             
-            if Chat.delete_chat(chat_id, user_id):
-                deleted_count += 1
+            if not content_text or QuizCache.find(QuizCache.content_key(content_text)):
+                skipped += 1
+                continue
+            
+            result = generate_quiz_task(chat_id)
+            if result.get('success'):
+                generated += 1
+        
+        return {
+            'success': True,
+            'generated': generated,
+            'skipped': skipped,
+            'message': f'Precomputed {generated} quizzes'
+        }
+        
+    except Exception as e:
+        logging.error(f"Quiz precompute task error: {str(e)}")
+        return {
+            'success': False,
+            'message': f'Quiz precompute failed: {str(e)}'
+        }
+
+@celery.task(base=AppContextTask)
+def cleanup_old_chats_task() -> dict:
+    """Clean up old inactive chats (runs periodically).
+    
+    Deletes in chunks per the ``chats`` retention policy; see ``Retention.sweep_chats``.
+    """
+    try:
+        deleted_count = Retention.sweep_chats()
         
         return {
             'success': True,
@@ -165,21 +341,104 @@ def cleanup_old_chats_task() -> dict:
             'message': f'Cleanup failed: {str(e)}'
         }
 
-@celery.task
-def send_notification_task(user_id: str, message: str, notification_type: str = 'info') -> dict:
-    """Send notification to user (placeholder for future notification system)."""
+@celery.task(base=AppContextTask)
+def apply_retention_task() -> dict:
+    """Apply every retention policy: TTL indexes, partition drops and chat sweeps."""
     try:
-        # This is a placeholder for future notification implementation
-        # Could integrate with email, push notifications, etc.
+        results = Retention.apply_all()
         
-        logging.info(
-            f"Notification sent - User: {user_id}, Type: {notification_type}, Message: {message}"
-        )
+        return {
+            'success': True,
+            **results,
+            'message': f"Retention applied, {results['deleted_chats']} chats and "
+                       f"{len(results['dropped_partitions'])} partitions removed"
+        }
+        
+    except Exception as e:
+        logging.error(f"Retention task error: {str(e)}")
+        return {
+            'success': False,
+            'message': f'Retention failed: {str(e)}'
+        }
+
+@celery.task(base=AppContextTask)
+def rebuild_user_stats_task(user_ids: list = None) -> dict:
+    """Recompute materialized user statistics to correct drift (runs weekly)."""
+    try:
+        rebuilt = UserStats.rebuild(user_ids)
+        
+        return {
+            'success': True,
+            'rebuilt': rebuilt,
+            'message': f'Rebuilt statistics for {rebuilt} users'
+        }
+        
+    except Exception as e:
+        logging.error(f"User stats rebuild error: {str(e)}")
+        return {
+            'success': False,
+            'message': f'User stats rebuild failed: {str(e)}'
+        }
+
+@celery.task(base=AppContextTask)
+def rebuild_tutor_stats_task() -> dict:
+    """Recompute tutor rating statistics from recorded ratings (runs weekly)."""
+    try:
+        rebuilt = Tutor.rebuild_stats()
+        
+        return {
+            'success': True,
+            'rebuilt': rebuilt,
+            'message': f'Rebuilt rating statistics for {rebuilt} tutors'
+        }
+        
+    except Exception as e:
+        logging.error(f"Tutor stats rebuild error: {str(e)}")
+        return {
+            'success': False,
+            'message': f'Tutor stats rebuild failed: {str(e)}'
+        }
+
+@celery.task(base=AppContextTask)
+def backfill_usage_task(days: int = 1) -> dict:
+    """Rebuild usage buckets for the last ``days`` complete days from messages.
+
+    Runs nightly for yesterday to correct drift; pass a larger ``days`` once to
+    backfill history.
+    """
+    try:
+        from datetime import datetime, timedelta
+        
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        written = UsageBucket.backfill(today - timedelta(days=days), today)
+        
+        return {
+            'success': True,
+            'written': written,
+            'message': f'Rebuilt {written} usage buckets'
+        }
+        
+    except Exception as e:
+        logging.error(f"Usage backfill error: {str(e)}")
+        return {
+            'success': False,
+            'message': f'Usage backfill failed: {str(e)}'
+        }
+
+@celery.task(base=AppContextTask)
+def send_notification_task(user_id: str, message: str, notification_type: str = 'info') -> dict:
+    """Send notification to one user.
+    
+    Kept for existing callers; prefer ``notify`` or ``send_bulk_notification_task``,
+    which stage many notifications at once for the batched flush.
+    """
+    try:
+        notify([{'user_id': user_id, 'message': message, 'type': notification_type}])
         
         return {
             'success': True,
             'user_id': user_id,
-            'message': 'Notification sent successfully'
+            'message': 'Notification queued successfully'
         }
         
     except Exception as e:
@@ -190,15 +449,14 @@ def send_notification_task(user_id: str, message: str, notification_type: str =
         }
 
 # Periodic tasks configuration (would be set up with celery beat)
-@celery.task
+@celery.task(base=AppContextTask)
 def daily_maintenance_task() -> dict:
     """Run daily maintenance tasks."""
     try:
         results = []
         
-        # Run cleanup
-        cleanup_result = cleanup_old_chats_task.delay()
-        results.append(cleanup_result.get())
+        # Run cleanup inline; blocking on a subtask result inside a task can deadlock the worker
+        results.append(apply_retention_task())
         
         # Add other maintenance tasks here
         # - Database cleanup
@@ -0,0 +1,225 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+import threading
+import logging
+import time
+import uuid
+
+READY_STATES = ('SUCCESS', 'FAILURE')
+
+class LocalAsyncResult:
+    """Minimal stand-in for celery.result.AsyncResult backed by a result store."""
+
+    def __init__(self, task_id: str, store):
+        self.id = task_id
+        self._store = store
+
+    def _meta(self) -> dict:
+        return self._store.get(self.id) or {'state': 'PENDING', 'info': None}
+
+    @property
+    def state(self) -> str:
+        return self._meta()['state']
+
+    status = state
+
+    @property
+    def info(self):
+        return self._meta().get('info')
+
+    @property
+    def result(self):
+        return self.info
+
+    def ready(self) -> bool:
+        return self.state in READY_STATES
+
+class InMemoryResultStore:
+    """Process-local task result store (single-process deployments)."""
+
+    def __init__(self, ttl: int = 3600):
+        self.ttl = ttl
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def set(self, task_id: str, state: str, info=None):
+        with self._lock:
+            self._purge_expired()
+            self._results[task_id] = {
+                'state': state,
+                'info': info,
+                'date_done': datetime.utcnow()
+            }
+
+    def get(self, task_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._results.get(task_id)
+
+    def _purge_expired(self):
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        expired = [
+            task_id for task_id, meta in self._results.items()
+            if meta['state'] in READY_STATES and meta['date_done'] < cutoff
+        ]
+        for task_id in expired:
+            del self._results[task_id]
+
+class MongoResultStore:
+    """Task result store shared by every web process through MongoDB."""
+
+    def __init__(self, collection: str = 'task_results'):
+        self.collection = collection
+
+    def _coll(self):
+        from app.extensions import mongo
+        return mongo.db[self.collection]
+
+    def set(self, task_id: str, state: str, info=None):
+        self._coll().update_one(
+            {'_id': task_id},
+            {'$set': {'state': state, 'info': info, 'date_done': datetime.utcnow()}},
+            upsert=True
+        )
+
+    def get(self, task_id: str) -> Optional[dict]:
+        return self._coll().find_one({'_id': task_id})
+
+class TaskQueueFull(RuntimeError):
+    """The in-process executor already holds its maximum of pending tasks.
+
+    Views answer it with 503 and a ``Retry-After`` of ``retry_after`` seconds.
+    """
+
+    retry_after = 30
+
+    def __init__(self):
+        super().__init__('Task queue is full, please try again later')
+
+class TaskBackend:
+    """Dispatch tasks to Celery when a broker is configured, otherwise run
+    them on a bounded in-process thread pool.
+
+    Both modes hand back objects exposing ``id``, ``state``, ``info`` and
+    ``result`` so views can treat them the same way. Locally, each Celery
+    queue gets its own pool so maintenance work cannot starve LLM tasks.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.executors = {}
+        self.store = None
+        self._slots = None
+        self._local = threading.local()
+
+    def init_app(self, app):
+        self.app = app
+
+        if self.uses_celery:
+            return
+
+        queue_workers = dict(app.config.get('TASK_EXECUTOR_QUEUE_WORKERS', {}))
+        queue_workers['llm'] = app.config.get('TASK_EXECUTOR_WORKERS', 4)
+        queue_workers.setdefault('default', 2)
+        max_pending = app.config.get('TASK_EXECUTOR_MAX_PENDING', 100)
+
+        if not self.executors:
+            for queue, max_workers in queue_workers.items():
+                self.executors[queue] = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix=f'task-executor-{queue}'
+                )
+            self._slots = threading.BoundedSemaphore(max_pending)
+
+        if app.config.get('TASK_RESULT_STORE') == 'mongo':
+            self.store = MongoResultStore()
+        else:
+            self.store = InMemoryResultStore(ttl=app.config.get('TASK_RESULT_TTL', 3600))
+
+    @property
+    def uses_celery(self) -> bool:
+        return bool(self.app and self.app.config.get('CELERY_BROKER_URL'))
+
+    def delay(self, task, *args, **kwargs):
+        """Queue ``task`` for execution and return an AsyncResult-like handle."""
+        if self.uses_celery:
+            return task.delay(*args, **kwargs)
+
+        if not self._slots.acquire(blocking=False):
+            raise TaskQueueFull()
+
+        task_id = str(uuid.uuid4())
+        self.store.set(task_id, 'PENDING')
+
+        try:
+            self._executor_for(task).submit(self._run, task, task_id, args, kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+
+        return LocalAsyncResult(task_id, self.store)
+
+    def _executor_for(self, task) -> ThreadPoolExecutor:
+        """Pick the pool matching the queue the task is routed to in Celery."""
+        from app.extensions import celery
+        route = (celery.conf.task_routes or {}).get(task.name, {})
+        queue = route.get('queue', 'default')
+        return self.executors.get(queue) or self.executors['default']
+
+    def AsyncResult(self, task_id: str):
+        """Look up a task by id in whichever backend is active."""
+        if self.uses_celery:
+            from app.extensions import celery
+            return celery.AsyncResult(task_id)
+        return LocalAsyncResult(task_id, self.store)
+
+    def update_progress(self, task, status: str, progress: int):
+        """Publish a PROGRESS state for the task currently executing ``task``."""
+        try:
+            current = getattr(self._local, 'current', None)
+            # Bound tasks receive the Task instance, not the registered proxy
+            if current and current[1] == task.name:
+                self.store.set(current[0], 'PROGRESS', {'status': status, 'progress': progress})
+            elif task.request.id:
+                task.update_state(state='PROGRESS', meta={'status': status, 'progress': progress})
+        except Exception as e:
+            # Progress is informational; never fail the task because of it
+            logging.warning(f"Failed to report progress for {task.name}: {str(e)}")
+
+    def watch(self, task_id: str, timeout: float = 300, poll_interval: float = 0.5) -> Iterator:
+        """Yield the task handle each time its state or progress changes.
+
+        Stops once the task is ready or ``timeout`` seconds have elapsed.
+        """
+        deadline = time.monotonic() + timeout
+        last_seen = None
+
+        while True:
+            task = self.AsyncResult(task_id)
+            state = task.state
+            info = task.info if state == 'PROGRESS' else None
+            snapshot = (state, repr(info))
+
+            if snapshot != last_seen:
+                last_seen = snapshot
+                yield task
+
+            if state in READY_STATES or time.monotonic() >= deadline:
+                return
+
+            time.sleep(poll_interval)
+
+    def _run(self, task, task_id: str, args: tuple, kwargs: dict):
+        self._local.current = (task_id, task.name)
+        try:
+            with self.app.app_context():
+                result = task.run(*args, **kwargs)
+                self.store.set(task_id, 'SUCCESS', result)
+        except Exception as e:
+            logging.error(f"Local task {task.name} [{task_id}] failed: {str(e)}")
+            self.store.set(task_id, 'FAILURE', str(e))
+        finally:
+            self._local.current = None
+            self._slots.release()
+
+task_backend = TaskBackend()
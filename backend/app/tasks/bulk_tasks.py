@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
+from celery.exceptions import SoftTimeLimitExceeded
+from app.extensions import celery
+from app.models.bulk_job import BulkJob
+from app.models.summary import ChatSummary
+from app.models.quiz import QuizCache
+from app.tasks.ai_tasks import (
+    summarize_chat, get_quiz_contents, build_quiz_prompt
+)
+from app.tasks.backend import task_backend
+from app.tasks.worker import AppContextTask, get_model
+from flask import current_app
+import logging
+import time
+
+def _summarize_chunk(model, pool, chats: list) -> tuple:
+    """Summarize the chats in a chunk that changed since their stored summary.
+    
+    Returns (generated, skipped) counts and the ids of the chats that failed.
+    """
+    existing = ChatSummary.find_by_chats([chat['_id'] for chat in chats])
+    pending = [
+        chat for chat in chats
+        if not ChatSummary.is_current(existing.get(chat['_id']), chat)
+    ]
+    
+    def summarize(chat):
+        chat_id = str(chat['_id'])
+        summary, _ = summarize_chat(model, chat_id, existing.get(chat['_id']))
+        if not summary:
+            return None
+        
+        return dict(summary, chat_id=chat_id, message_count=chat.get('message_count', 0))
+    
+    entries, failed = _map_bounded(pool, summarize, pending)
+    ChatSummary.bulk_upsert(entries)
+    return len(entries), len(chats) - len(entries) - len(failed), [chat['_id'] for chat in failed]
+
+def _quiz_chunk(model, pool, chats: list, topic: str = None) -> tuple:
+    """Generate quizzes for the chats in a chunk that aren't cached yet.
+    
+    Returns (generated, skipped) counts and the ids of the chats that failed.
+    """
+    contents = get_quiz_contents([chat['_id'] for chat in chats])
+    sources = []
+    for chat in chats:
+        content_text = contents.get(chat['_id'])
+        if content_text:
+            sources.append((chat, content_text, QuizCache.content_key(content_text, topic)))
+    
+    cached = QuizCache.find_existing_keys([content_key for _, _, content_key in sources])
+    pending = [source for source in sources if source[2] not in cached]
+    
+    def generate(source):
+        chat, content_text, content_key = source
+        response = model.generate_content(build_quiz_prompt(content_text, topic))
+        return {
+            'content_key': content_key,
+            'chat_id': str(chat['_id']),
+            'topic': topic,
+            'quiz': response.text
+        }
+    
+    entries, failed = _map_bounded(pool, generate, pending)
+    QuizCache.bulk_store(entries, ttl=current_app.config.get('QUIZ_CACHE_TTL', 7 * 24 * 3600))
+    return len(entries), len(chats) - len(entries) - len(failed), [chat['_id'] for chat, _, _ in failed]
+
+def _map_bounded(pool, func, items: list) -> tuple:
+    """Run ``func`` over ``items`` on ``pool``; return (non-empty results, failed items)."""
+    results = []
+    failed = []
+    futures = [(item, pool.submit(func, item)) for item in items]
+    
+    for item, future in futures:
+        try:
+            result = future.result()
+            if result:
+                results.append(result)
+        except Exception as e:
+            logging.error(f"Bulk generation item failed: {str(e)}")
+            failed.append(item)
+    
+    return results, failed
+
+@celery.task(bind=True, base=AppContextTask)
+def bulk_generate_task(self, job_id: str) -> dict:
+    """Generate summaries or quizzes for every chat matching a bulk job's filters.
+    
+    Chats are streamed in ``_id`` order in chunks of BULK_CHUNK_SIZE. The
+    worker's shared model client serves the whole run, at most BULK_LLM_CONCURRENCY model calls
+    are in flight at once, and each chunk's results are written with a single
+    bulk write before the job checkpoint advances. Re-running the task for the
+    same job resumes after the last checkpointed chat, first retrying the
+    chats that failed on earlier runs. The LLM worker's
+    thread pool never delivers the soft time limit, so the task also checks
+    it between chunks and pauses at the checkpoint once it has passed.
+    """
+    job = BulkJob.find_by_id(job_id)
+    if not job:
+        return {'success': False, 'message': 'Bulk job not found'}
+    
+    if job['status'] == 'completed':
+        return {'success': True, 'job_id': job_id, 'message': 'Bulk job already completed'}
+    
+    BulkJob.set_status(job_id, 'running')
+    chunk_size = current_app.config.get('BULK_CHUNK_SIZE', 100)
+    concurrency = current_app.config.get('BULK_LLM_CONCURRENCY', 8)
+    deadline = time.monotonic() + current_app.config['CELERY_MAINTENANCE_SOFT_TIME_LIMIT']
+    
+    try:
+        model = get_model()
+        
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bulk-llm') as pool:
+            def run_chunk(chats):
+                if job['kind'] == 'quiz':
+                    return _quiz_chunk(model, pool, chats, job.get('topic'))
+                return _summarize_chunk(model, pool, chats)
+            
+            # Progress is the percentage of this run's chats, counted up front
+            total = BulkJob.count_remaining(job)
+            done = 0
+            
+            def report(count):
+                task_backend.update_progress(
+                    self, f'Processed {count} of {total} chats', int(count * 100 / total) if total else 100
+                )
+            
+            for chat_ids, chats in BulkJob.iter_failed_chunks(job, chunk_size):
+                generated, skipped, failed_ids = run_chunk(chats)
+                BulkJob.record_retry(job_id, chat_ids, generated, skipped, failed_ids)
+                done += len(chat_ids)
+                report(done)
+            
+            for chats in BulkJob.iter_chat_chunks(job, chunk_size):
+                generated, skipped, failed_ids = run_chunk(chats)
+                BulkJob.checkpoint(job_id, chats[-1]['_id'], len(chats), generated, skipped, failed_ids)
+                done += len(chats)
+                report(min(done, total))
+                if time.monotonic() >= deadline:
+                    raise SoftTimeLimitExceeded()
+        
+        BulkJob.set_status(job_id, 'completed')
+        return {'success': True, 'job_id': job_id, 'message': 'Bulk job completed'}
+        
+    except SoftTimeLimitExceeded:
+        BulkJob.set_status(job_id, 'paused', 'Time limit reached; resume to continue from the checkpoint')
+        return {'success': False, 'job_id': job_id, 'message': 'Bulk job paused at checkpoint'}
+        
+    except Exception as e:
+        logging.error(f"Bulk job {job_id} failed: {str(e)}")
+        BulkJob.set_status(job_id, 'failed', str(e))
+        return {'success': False, 'job_id': job_id, 'message': f'Bulk job failed: {str(e)}'}
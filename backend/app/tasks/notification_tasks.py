@@ -0,0 +1,166 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from app.extensions import celery
+from app.models.notification import Notification
+from app.models.user import User
+from app.tasks.backend import task_backend
+from app.tasks.worker import AppContextTask
+from flask import current_app
+import threading
+import logging
+import uuid
+
+class NotificationChannel(ABC):
+    """Delivery channel for coalesced notifications.
+
+    Subclasses implement ``send``; ``max_concurrency`` bounds how many
+    deliveries the channel runs at once during a flush.
+    """
+
+    name = 'base'
+    max_concurrency = 1
+
+    @abstractmethod
+    def send(self, notification: dict):
+        """Deliver one coalesced notification; raise to report a failure."""
+
+class LogChannel(NotificationChannel):
+    """Write notifications to the application log."""
+
+    name = 'log'
+    max_concurrency = 4
+
+    def send(self, notification: dict):
+        logging.info(
+            f"Notification sent - User: {notification['user_id']}, Type: {notification['type']}, "
+            f"Messages: {notification['messages']}"
+        )
+
+_channels = {}
+
+def register_channel(channel: NotificationChannel):
+    """Register a delivery channel; every flush delivers through all registered channels."""
+    _channels[channel.name] = channel
+
+register_channel(LogChannel())
+
+def _deliver(notifications: List[dict]) -> dict:
+    """Deliver notifications through every channel, honoring per-channel concurrency."""
+    delivered = {}
+    for channel in list(_channels.values()):
+        sent = []
+        with ThreadPoolExecutor(max_workers=channel.max_concurrency) as pool:
+            futures = [(n, pool.submit(channel.send, n)) for n in notifications]
+            for notification, future in futures:
+                try:
+                    future.result()
+                    sent.append(notification)
+                except Exception as e:
+                    logging.error(f"Notification channel {channel.name} failed: {str(e)}")
+
+        Notification.mark_delivered(sent, channel.name)
+        delivered[channel.name] = len(sent)
+
+    return delivered
+
+_flush_timer = None
+_flush_lock = threading.Lock()
+
+def _schedule_local_flush():
+    """Without a broker there is no beat; flush once the coalescing window closes."""
+    global _flush_timer
+    with _flush_lock:
+        if _flush_timer is not None and _flush_timer.is_alive():
+            return
+        window = current_app.config.get('NOTIFICATION_WINDOW', 30)
+        _flush_timer = threading.Timer(window, task_backend.delay, args=(flush_notifications_task,))
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+def notify(items: List[dict]) -> int:
+    """Stage (user, message) notifications; they are coalesced and delivered on the next flush."""
+    count = Notification.enqueue(items)
+    if count and not task_backend.uses_celery:
+        _schedule_local_flush()
+    return count
+
+@celery.task(base=AppContextTask)
+def send_bulk_notification_task(user_ids: List[str], message: str, notification_type: str = 'info',
+                                school: str = None) -> dict:
+    """Stage one notice for many users (e.g. a whole class) as a single job.
+
+    Recipients are ``user_ids`` plus, when ``school`` is given, every student
+    of that school, read and staged NOTIFICATION_BATCH_SIZE at a time.
+    """
+    try:
+        def stage(recipient_ids):
+            return notify([
+                {'user_id': user_id, 'message': message, 'type': notification_type}
+                for user_id in recipient_ids
+            ])
+
+        count = stage(user_ids)
+        if school:
+            batch_size = current_app.config.get('NOTIFICATION_BATCH_SIZE', 5000)
+            for student_ids in User.iter_student_ids_at_school(school, batch_size):
+                count += stage(student_ids)
+
+        return {
+            'success': True,
+            'queued': count,
+            'message': f'Queued {count} notifications'
+        }
+
+    except Exception as e:
+        logging.error(f"Bulk notification task error: {str(e)}")
+        return {
+            'success': False,
+            'message': f'Failed to queue notifications: {str(e)}'
+        }
+
+@celery.task(base=AppContextTask)
+def flush_notifications_task() -> dict:
+    """Coalesce staged notifications per user, store them and deliver them (runs every window).
+
+    The outbox is drained NOTIFICATION_BATCH_SIZE entries at a time until it
+    is empty, since the in-process timer only fires once per window.
+    """
+    try:
+        limit = current_app.config.get('NOTIFICATION_BATCH_SIZE', 5000)
+        total_entries, total_notifications, delivered = 0, 0, {}
+
+        while True:
+            batch_id = str(uuid.uuid4())
+            entries = Notification.claim_pending(batch_id, limit=limit)
+            if not entries:
+                break
+
+            notifications = Notification.coalesce(entries)
+            Notification.insert_many(notifications)  # sets _id on each notification
+            Notification.release_batch(batch_id)
+            for channel, count in _deliver(notifications).items():
+                delivered[channel] = delivered.get(channel, 0) + count
+
+            total_entries += len(entries)
+            total_notifications += len(notifications)
+            if len(entries) < limit:
+                break
+
+        if not total_entries:
+            return {'success': True, 'notifications': 0, 'message': 'Nothing to deliver'}
+
+        return {
+            'success': True,
+            'entries': total_entries,
+            'notifications': total_notifications,
+            'delivered': delivered,
+            'message': f'Delivered {total_notifications} notifications'
+        }
+
+    except Exception as e:
+        logging.error(f"Notification flush task error: {str(e)}")
+        return {
+            'success': False,
+            'message': f'Failed to flush notifications: {str(e)}'
+        }
@@ -0,0 +1,78 @@
+from celery import Task
+from celery.signals import worker_process_init
+from flask import current_app, has_app_context
+import google.generativeai as genai
+import threading
+import logging
+
+# Per-process state: one Flask app and one Gemini client per worker process
+_app = None
+_model = None
+_app_lock = threading.Lock()
+_model_lock = threading.Lock()
+
+def get_worker_app():
+    """Return the Flask app for this worker process, creating it on first use."""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                from app import create_app
+                _app = create_app()
+    return _app
+
+class TimeoutModel:
+    """Gemini model whose calls give up after ``timeout`` seconds.
+
+    The threaded LLM worker pool (and the in-process executor) cannot
+    interrupt a task, so Celery's time limits never fire there; the request
+    deadline is what actually bounds a stuck call.
+    """
+
+    def __init__(self, model, timeout: float):
+        self.model = model
+        self.timeout = timeout
+
+    def generate_content(self, *args, **kwargs):
+        kwargs.setdefault('request_options', {'timeout': self.timeout})
+        return self.model.generate_content(*args, **kwargs)
+
+def get_model():
+    """Return this process's shared Gemini model client.
+
+    ``genai.configure`` discards the cached API client, so calling it per task
+    also threw away the underlying connection. Configuring once per process
+    keeps a single long-lived channel that every task call reuses.
+    """
+    global _model
+    if _model is None:
+        # Resolved first: building the worker app takes its own lock
+        config = current_app.config if has_app_context() else get_worker_app().config
+        with _model_lock:
+            if _model is None:
+                genai.configure(api_key=config['GEMINI_API_KEY'])
+                _model = TimeoutModel(genai.GenerativeModel('gemini-pro'), config['GEMINI_REQUEST_TIMEOUT'])
+    return _model
+
+class AppContextTask(Task):
+    """Task base that runs inside a Flask app context.
+
+    In-process execution already has one; Celery workers use the per-process
+    app, so tasks can rely on ``current_app`` wherever they run.
+    """
+
+    def __call__(self, *args, **kwargs):
+        if has_app_context():
+            return super().__call__(*args, **kwargs)
+        with get_worker_app().app_context():
+            return super().__call__(*args, **kwargs)
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Build the app (and its Mongo client) and model client after each prefork child starts."""
+    try:
+        with get_worker_app().app_context():
+            get_model()
+    except Exception as e:
+        # Tasks retry initialization lazily on first use
+        logging.error(f"Worker initialization failed: {str(e)}")
@@ -1,7 +1,11 @@
 import uuid
 import hashlib
+import base64
+import re
+import unicodedata
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+from bson import ObjectId
 import json
 
 def generate_request_id() -> str:
@@ -46,6 +50,47 @@ def paginate_results(data: List[Any], page: int, per_page: int) -> Dict:
         }
     }
 
+def encode_cursor(created_at: datetime, document_id: ObjectId) -> str:
+    """Encode a (created_at, _id) position as an opaque pagination cursor."""
+    raw = f"{created_at.isoformat()}|{document_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode a cursor from ``encode_cursor``; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, document_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), ObjectId(document_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def encode_rank_cursor(gpa: float, rating_average: float, document_id: ObjectId) -> str:
+    """Encode a (gpa, rating_average, _id) position in a tutor ranking as a cursor."""
+    raw = f"{gpa}|{rating_average}|{document_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, float, ObjectId]:
+    """Decode a cursor from ``encode_rank_cursor``; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        gpa, rating_average, document_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return float(gpa), float(rating_average), ObjectId(document_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def normalize_school(name: str) -> str:
+    """Lookup key for a school name: casefolded, accents stripped, punctuation collapsed."""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    # Dots and apostrophes join ("M.I.T." -> "mit"); other punctuation separates words
+    joined = re.sub(r"[.'\u2019]", '', stripped.casefold())
+    return ' '.join(re.sub(r'[\W_]+', ' ', joined).split())
+
+def trigrams(key: str) -> List[str]:
+    """Distinct three-character windows of a normalized key, padded at both ends."""
+    padded = f"  {key} "
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)}) if key else []
+
 def safe_int(value: Any, default: int = 0) -> int:
     """Safely convert value to integer."""
     try:
@@ -123,6 +168,43 @@ def extract_keywords(text: str, min_length: int = 3) -> List[str]:
     
     return unique_keywords
 
+def search_terms(query: str) -> List[str]:
+    """Terms of a text search query, without negated (``-word``) terms."""
+    return [term for term in re.findall(r'-?\w+', query.lower()) if not term.startswith('-')]
+
+def build_snippet(text: str, query: str, width: int = 160) -> Dict:
+    """Excerpt of ``text`` around the first search match, with match offsets.
+    
+    Words are matched on a crude stem of each query term (so "integrals"
+    highlights for "integral"), close to what MongoDB's text stemmer matches.
+    ``highlights`` holds ``[start, end]`` offsets into ``snippet``.
+    """
+    stems = []
+    for term in search_terms(query):
+        for suffix in ('ing', 'es', 'ed', 's'):
+            if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+                term = term[:-len(suffix)]
+                break
+        stems.append(term)
+    
+    matches = [
+        (m.start(), m.end()) for m in re.finditer(r'\w+', text)
+        if any(m.group().lower().startswith(stem) for stem in stems)
+    ]
+    
+    start = max(matches[0][0] - width // 3, 0) if matches else 0
+    end = min(start + width, len(text))
+    prefix = '...' if start > 0 else ''
+    suffix = '...' if end < len(text) else ''
+    
+    return {
+        'snippet': prefix + text[start:end] + suffix,
+        'highlights': [
+            [s - start + len(prefix), e - start + len(prefix)]
+            for s, e in matches if s >= start and e <= end
+        ]
+    }
+
 def calculate_similarity(text1: str, text2: str) -> float:
     """Calculate basic text similarity (Jaccard similarity)."""
     keywords1 = set(extract_keywords(text1))
@@ -202,8 +284,8 @@ def jwt_current_user():
 
     flask_jwt_extended historically allowed arbitrary identity objects, but
     recent JWT libraries require the JWT 'sub' (subject) claim to be a string.
-    This helper returns a consistent dict with keys 'user_id', 'email', 'role'
-    whether the token's identity was stored as a dict (legacy) or as a string
+    This helper returns a consistent dict with keys 'user_id', 'email', 'role',
+    'school' whether the token's identity was stored as a dict (legacy) or as a string
     identity + additional claims.
     """
     try:
@@ -219,7 +301,8 @@ def jwt_current_user():
         return {
             'user_id': str(identity) if identity is not None else None,
             'email': claims.get('email'),
-            'role': claims.get('role')
+            'role': claims.get('role'),
+            'school': claims.get('school')
         }
     except Exception:
         return None
\ No newline at end of file
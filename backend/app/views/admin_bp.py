@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify, g
 from app.utils.helpers import jwt_current_user
 from app.controllers.admin_controller import AdminController
+from app.models.tutor_catalog import TutorCatalog
 from app.middlewares import require_role, validate_json, log_user_action
 from app.extensions import limiter
 from app.utils.helpers import safe_int
+from app.tasks.backend import TaskQueueFull
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -113,6 +115,25 @@ def get_platform_stats():
             'message': f'Failed to get platform stats: {str(e)}'
         }), 500
 
+@admin_bp.route('/usage', methods=['GET'])
+@require_role('admin')
+def get_usage():
+    """Get AI token usage over the last N days, optionally for one user."""
+    try:
+        days = min(max(safe_int(request.args.get('days', 30), 30), 1), 365)
+        user_id = request.args.get('user_id')
+        
+        result = AdminController.get_usage(days, user_id)
+        
+        status_code = 200 if result['success'] else 400
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to get usage: {str(e)}'
+        }), 500
+
 @admin_bp.route('/activity', methods=['GET'])
 @require_role('admin')
 def get_recent_activity():
@@ -191,6 +212,7 @@ def deactivate_tutor(tutor_id):
         )
         
         if result.modified_count > 0:
+            TutorCatalog.invalidate()
             return jsonify({
                 'success': True,
                 'message': 'Tutor deactivated successfully'
@@ -222,6 +244,7 @@ def activate_tutor(tutor_id):
         )
         
         if result.modified_count > 0:
+            TutorCatalog.invalidate()
             return jsonify({
                 'success': True,
                 'message': 'Tutor activated successfully'
@@ -246,8 +269,9 @@ def manual_cleanup():
     """Manually trigger cleanup tasks."""
     try:
         from app.tasks.ai_tasks import cleanup_old_chats_task
+        from app.tasks.backend import task_backend
         
-        task = cleanup_old_chats_task.delay()
+        task = task_backend.delay(cleanup_old_chats_task)
         
         return jsonify({
             'success': True,
@@ -255,8 +279,85 @@ def manual_cleanup():
             'task_id': task.id
         }), 202
         
+    except TaskQueueFull as e:
+        return jsonify({'success': False, 'message': str(e)}), 503, {'Retry-After': str(e.retry_after)}
+        
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Failed to start cleanup: {str(e)}'
+        }), 500
+
+@admin_bp.route('/bulk-jobs', methods=['POST'])
+@require_role('admin')
+@limiter.limit("10 per hour")
+@validate_json(required_fields=['kind'])
+@log_user_action('start_bulk_job')
+def start_bulk_job():
+    """Start bulk summary/quiz generation for every chat of a school or set of students."""
+    try:
+        current_user = jwt_current_user()
+        admin_id = current_user.get('user_id') if current_user else None
+        
+        result = AdminController.start_bulk_job(admin_id, g.json_data)
+        
+        status_code = 202 if result['success'] else 400
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to start bulk job: {str(e)}'
+        }), 500
+
+@admin_bp.route('/bulk-jobs/<job_id>', methods=['GET'])
+@require_role('admin')
+def get_bulk_job(job_id):
+    """Get bulk job progress."""
+    try:
+        result = AdminController.get_bulk_job(job_id)
+        
+        status_code = 200 if result['success'] else 404
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to get bulk job: {str(e)}'
+        }), 500
+
+@admin_bp.route('/bulk-jobs/<job_id>/resume', methods=['POST'])
+@require_role('admin')
+@log_user_action('resume_bulk_job')
+def resume_bulk_job(job_id):
+    """Resume a paused or failed bulk job from its checkpoint."""
+    try:
+        result = AdminController.resume_bulk_job(job_id)
+        
+        status_code = 202 if result['success'] else 400
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to resume bulk job: {str(e)}'
+        }), 500
+
+@admin_bp.route('/notifications', methods=['POST'])
+@require_role('admin')
+@limiter.limit("20 per hour")
+@validate_json(required_fields=['message'])
+@log_user_action('send_notification')
+def send_notification():
+    """Send a notice to every student of a school or to a list of users."""
+    try:
+        result = AdminController.send_notification(g.json_data)
+        
+        status_code = 202 if result['success'] else 400
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to send notification: {str(e)}'
         }), 500
\ No newline at end of file
@@ -1,9 +1,11 @@
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, Response, current_app, request, jsonify, g, stream_with_context
 from app.utils.helpers import jwt_current_user
 from app.controllers.ai_controller import AIController
 from app.middlewares import require_verified_student, validate_json, log_user_action
 from app.extensions import limiter
-from app.tasks.ai_tasks import generate_summary_task, generate_quiz_task
+from app.tasks.ai_tasks import generate_summary_task, generate_quiz_task, get_quiz_content
+from app.tasks.backend import task_backend, TaskQueueFull
+import json
 
 ai_bp = Blueprint('ai', __name__)
 
@@ -39,7 +41,8 @@ def chat():
             chat_id = chat_result['chat_id']
         
         # Process AI chat
-        result = get_ai_controller().chat_with_ai(user_id, chat_id, message)
+        school = current_user.get('school') if current_user else None
+        result = get_ai_controller().chat_with_ai(user_id, chat_id, message, school=school)
         
         # Add chat_id to response
         if result['success']:
@@ -116,8 +119,20 @@ def request_summary(chat_id):
                 'message': 'Chat not found or access denied'
             }), 404
         
+        # Return the stored summary if the chat hasn't changed since it was written
+        from app.models.summary import ChatSummary
+        summary = ChatSummary.find_by_chat(chat_id)
+        if ChatSummary.is_current(summary, chat_data):
+            return jsonify({
+                'success': True,
+                'summary': summary['summary'],
+                'chat_id': chat_id,
+                'cached': True,
+                'updated_at': summary['updated_at']
+            }), 200
+        
         # Start async summary generation
-        task = generate_summary_task.delay(chat_id)
+        task = task_backend.delay(generate_summary_task, chat_id)
         
         return jsonify({
             'success': True,
@@ -126,6 +141,9 @@ def request_summary(chat_id):
             'chat_id': chat_id
         }), 202
         
+    except TaskQueueFull as e:
+        return jsonify({'success': False, 'message': str(e)}), 503, {'Retry-After': str(e.retry_after)}
+        
     except Exception as e:
         return jsonify({
             'success': False,
@@ -155,8 +173,22 @@ def request_quiz(chat_id):
         data = g.json_data
         topic = data.get('topic')  # Optional topic focus
         
+        # Serve a cached quiz for identical content and topic without queuing a task
+        from app.models.quiz import QuizCache
+        content_text = get_quiz_content(chat_id)
+        if content_text:
+            cached = QuizCache.find(QuizCache.content_key(content_text, topic))
+            if cached:
+                return jsonify({
+                    'success': True,
+                    'quiz': cached['quiz'],
+                    'chat_id': chat_id,
+                    'topic': topic,
+                    'cached': True
+                }), 200
+        
         # Start async quiz generation
-        task = generate_quiz_task.delay(chat_id, topic)
+        task = task_backend.delay(generate_quiz_task, chat_id, topic)
         
         return jsonify({
             'success': True,
@@ -166,48 +198,51 @@ def request_quiz(chat_id):
             'topic': topic
         }), 202
         
+    except TaskQueueFull as e:
+        return jsonify({'success': False, 'message': str(e)}), 503, {'Retry-After': str(e.retry_after)}
+        
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Failed to request quiz: {str(e)}'
         }), 500
 
+def _task_payload(task) -> dict:
+    """Build the JSON payload describing an async task's state."""
+    if task.state == 'PENDING':
+        return {
+            'success': True,
+            'state': task.state,
+            'status': 'Task is waiting to be processed'
+        }
+    elif task.state == 'PROGRESS':
+        return {
+            'success': True,
+            'state': task.state,
+            'status': task.info.get('status', 'Processing...'),
+            'progress': task.info.get('progress', 0)
+        }
+    elif task.state == 'SUCCESS':
+        return {
+            'success': True,
+            'state': task.state,
+            'result': task.result
+        }
+    else:  # FAILURE
+        return {
+            'success': False,
+            'state': task.state,
+            'error': str(task.info)
+        }
+
 @ai_bp.route('/task/<task_id>', methods=['GET'])
 @require_verified_student
 def get_task_result(task_id):
     """Get result of async task."""
     try:
-        from app.extensions import celery
+        task = task_backend.AsyncResult(task_id)
         
-        task = celery.AsyncResult(task_id)
-        
-        if task.state == 'PENDING':
-            response = {
-                'success': True,
-                'state': task.state,
-                'status': 'Task is waiting to be processed'
-            }
-        elif task.state == 'PROGRESS':
-            response = {
-                'success': True,
-                'state': task.state,
-                'status': task.info.get('status', 'Processing...'),
-                'progress': task.info.get('progress', 0)
-            }
-        elif task.state == 'SUCCESS':
-            response = {
-                'success': True,
-                'state': task.state,
-                'result': task.result
-            }
-        else:  # FAILURE
-            response = {
-                'success': False,
-                'state': task.state,
-                'error': str(task.info)
-            }
-        
-        return jsonify(response), 200
+        return jsonify(_task_payload(task)), 200
         
     except Exception as e:
         return jsonify({
@@ -215,6 +250,36 @@ def get_task_result(task_id):
             'message': f'Failed to get task result: {str(e)}'
         }), 500
 
+@ai_bp.route('/task/<task_id>/stream', methods=['GET'])
+@require_verified_student(locations=['headers', 'query_string'])
+def stream_task_result(task_id):
+    """Stream async task state changes as server-sent events.
+    
+    One ``data:`` event is pushed per state/progress change; the stream
+    closes once the task succeeds or fails (or after the configured timeout).
+    Browsers' ``EventSource`` cannot send an Authorization header, so the
+    access token is also accepted as ``?jwt=<token>``.
+    """
+    timeout = current_app.config.get('TASK_STREAM_TIMEOUT', 300)
+    
+    def generate():
+        try:
+            for task in task_backend.watch(task_id, timeout=timeout):
+                payload = _task_payload(task)
+                yield f"event: {payload['state'].lower()}\ndata: {json.dumps(payload, default=str)}\n\n"
+        except Exception as e:
+            error = {'success': False, 'message': f'Failed to stream task result: {str(e)}'}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Disable proxy buffering so events arrive immediately
+        }
+    )
+
 @ai_bp.route('/rate', methods=['POST'])
 @require_verified_student
 @validate_json(required_fields=['message_id', 'rating'])
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify, g
 from flask_jwt_extended import jwt_required
-from app.utils.helpers import jwt_current_user
+from app.utils.helpers import jwt_current_user, safe_int
 from app.controllers.auth_controller import AuthController
 from app.middlewares import validate_json, log_user_action
 from app.extensions import limiter
@@ -28,6 +28,25 @@ def register():
             'message': f'Registration failed: {str(e)}'
         }), 500
 
+@auth_bp.route('/schools', methods=['GET'])
+@limiter.limit("120 per minute")
+def suggest_schools():
+    """School name typeahead (public, used by registration)."""
+    try:
+        query = request.args.get('q', '')
+        limit = max(min(safe_int(request.args.get('limit', 10), 10), 20), 1)
+        
+        result = AuthController.suggest_schools(query, limit)
+        
+        status_code = 200 if result['success'] else 400
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Failed to suggest schools: {str(e)}'
+        }), 500
+
 @auth_bp.route('/login', methods=['POST'])
 @limiter.limit("10 per minute")
 @validate_json(required_fields=['email', 'password'])
@@ -38,9 +38,17 @@ def get_chat_history():
         # Get query parameters
         chat_id = request.args.get('chat_id')
         page = safe_int(request.args.get('page', 1), 1)
-        per_page = min(safe_int(request.args.get('per_page', 50), 50), 100)
+        per_page = max(min(safe_int(request.args.get('per_page', 50), 50), 100), 1)
+        before = request.args.get('before')
+        after = request.args.get('after')
 
-        result = StudentController.get_chat_history(user_id, chat_id, page, per_page)
+        if before and after:
+            return jsonify({
+                'success': False,
+                'message': 'Use either before or after, not both'
+            }), 400
+
+        result = StudentController.get_chat_history(user_id, chat_id, page, per_page, before, after)
 
         status_code = 200 if result['success'] else 400
         return jsonify(result), status_code
@@ -105,7 +113,8 @@ def search_messages():
         user_id = current_user.get('user_id') if current_user else None
 
         query = request.args.get('q', '').strip()
-        limit = min(safe_int(request.args.get('limit', 20), 20), 50)
+        limit = max(min(safe_int(request.args.get('limit', 20), 20), 50), 1)
+        page = max(safe_int(request.args.get('page', 1), 1), 1)
 
         if not query:
             return jsonify({
@@ -113,7 +122,7 @@ def search_messages():
                 'message': 'Search query is required'
             }), 400
 
-        result = StudentController.search_messages(user_id, query, limit)
+        result = StudentController.search_messages(user_id, query, limit, page)
 
         status_code = 200 if result['success'] else 400
         return jsonify(result), status_code
@@ -174,15 +183,18 @@ def get_tutors():
 
         if subjects or school or min_gpa or max_rate:
             # Use search with filters
+            limit = max(min(safe_int(request.args.get('limit', 20), 20), 50), 1)
             result = TutorController.search_tutors(
                 school=school,
                 min_gpa=min_gpa,
                 subjects=subjects,
-                max_rate=max_rate
+                max_rate=max_rate,
+                limit=limit,
+                after=request.args.get('after')
             )
         else:
             # Get top tutors
-            limit = min(safe_int(request.args.get('limit', 10), 10), 50)
+            limit = max(min(safe_int(request.args.get('limit', 10), 10), 50), 1)
             result = TutorController.get_top_tutors(limit, sort_by)
 
         status_code = 200 if result['success'] else 400
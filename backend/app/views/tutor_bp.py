@@ -63,11 +63,15 @@ def search_tutors():
             except ValueError:
                 max_rate = None
         
+        limit = max(min(safe_int(request.args.get('limit', 20), 20), 50), 1)
+        
         result = TutorController.search_tutors(
             school=school,
             min_gpa=min_gpa,
             subjects=subjects,
-            max_rate=max_rate
+            max_rate=max_rate,
+            limit=limit,
+            after=request.args.get('after')
         )
         
         status_code = 200 if result['success'] else 400
@@ -85,7 +89,7 @@ def get_tutors_by_subjects():
     """Get tutors by specific subjects (public endpoint)."""
     try:
         subjects = request.args.getlist('subjects')
-        limit = min(safe_int(request.args.get('limit', 10), 10), 50)
+        limit = max(min(safe_int(request.args.get('limit', 10), 10), 50), 1)
         
         if not subjects:
             return jsonify({
@@ -109,7 +113,7 @@ def get_tutors_by_subjects():
 def get_top_tutors():
     """Get top tutors (public endpoint)."""
     try:
-        limit = min(safe_int(request.args.get('limit', 10), 10), 50)
+        limit = max(min(safe_int(request.args.get('limit', 10), 10), 50), 1)
         sort_by = request.args.get('sort_by', 'gpa')
         
         # Validate sort_by parameter
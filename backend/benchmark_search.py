@@ -0,0 +1,155 @@
+"""Benchmark message search on a large synthetic dataset.
+
+Seeds BENCH_MONGO_URI (default: a separate learning_platform_bench database;
+the script refuses to run against a database whose name lacks "bench") with --messages synthetic messages spread over --users users, builds the
+model indexes, then times the indexed text search against the previous
+unanchored $regex scan for the same users and terms.
+
+    python benchmark_search.py --messages 10000000 --users 20000
+
+Seeding is skipped when the database already holds enough messages, so the
+timing part can be rerun cheaply. Use --regex-samples 0 to skip the slow
+$regex baseline.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import uri_parser
+
+VOCABULARY = (
+    'integral derivative limit matrix vector eigenvalue probability variance '
+    'photosynthesis mitochondria enzyme protein molecule atom electron orbital '
+    'newton force momentum energy velocity acceleration thermodynamics entropy '
+    'revolution empire treaty parliament democracy economy inflation market '
+    'python function recursion algorithm complexity database index query '
+    'essay thesis paragraph argument citation grammar vocabulary metaphor'
+).split()
+FILLER = 'the a of to and in is it that for on with as this can you how what why'.split()
+
+def _sentence(rng, length):
+    words = [rng.choice(VOCABULARY) if rng.random() < 0.3 else rng.choice(FILLER) for _ in range(length)]
+    return ' '.join(words).capitalize() + '?'
+
+def seed(db, messages, users, batch_size, rng):
+    existing = db.messages.estimated_document_count()
+    if existing >= messages:
+        print(f"Reusing {existing} existing messages")
+        return
+
+    print(f"Seeding {messages} messages for {users} users...")
+    user_ids = [ObjectId() for _ in range(users)]
+    chats_per_user = max(messages // (users * 40), 1)
+    now = datetime.utcnow()
+
+    chats = []
+    for user_id in user_ids:
+        for _ in range(chats_per_user):
+            chats.append({
+                '_id': ObjectId(),
+                'user_id': user_id,
+                'title': _sentence(rng, 4),
+                'is_ai_session': True,
+                'created_at': now,
+                'last_activity': now,
+                'message_count': 0,
+                'total_tokens': 0
+            })
+    db.users.insert_many([{'_id': user_id, 'role': 'student'} for user_id in user_ids])
+    db.chats.insert_many(chats)
+
+    started = time.perf_counter()
+    written = existing
+    while written < messages:
+        batch = []
+        for _ in range(min(batch_size, messages - written)):
+            chat = rng.choice(chats)
+            batch.append({
+                'chat_id': chat['_id'],
+                'user_id': chat['user_id'],
+                'sender': rng.choice(('user', 'ai')),
+                'text': _sentence(rng, rng.randint(8, 60)),
+                'tokens_used': rng.randint(0, 800),
+                'created_at': now - timedelta(minutes=written),
+                'is_edited': False
+            })
+        db.messages.insert_many(batch, ordered=False)
+        written += len(batch)
+        if written % (batch_size * 100) == 0:
+            rate = (written - existing) / (time.perf_counter() - started)
+            print(f"  {written} messages ({rate:.0f}/s)")
+
+def _timed(fn, samples):
+    timings = []
+    for args in samples:
+        started = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def _report(name, timings):
+    if not timings:
+        return
+    timings = sorted(timings)
+    p95 = timings[min(int(len(timings) * 0.95), len(timings) - 1)]
+    print(f"{name:<12} n={len(timings):<4} p50={statistics.median(timings):8.1f}ms "
+          f"p95={p95:8.1f}ms max={timings[-1]:8.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=10_000_000)
+    parser.add_argument('--users', type=int, default=20_000)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--samples', type=int, default=200, help='text searches to time')
+    parser.add_argument('--regex-samples', type=int, default=20, help='$regex baseline searches to time')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    # Always overrides MONGO_URI: seeding writes millions of documents
+    uri = os.environ.get('BENCH_MONGO_URI', 'mongodb://localhost:27017/learning_platform_bench')
+    database = uri_parser.parse_uri(uri).get('database') or ''
+    if 'bench' not in database:
+        raise SystemExit(f"Refusing to benchmark against database {database!r}; "
+                         f"point BENCH_MONGO_URI at a database whose name contains 'bench'")
+    os.environ['MONGO_URI'] = uri
+    os.environ['INDEX_SYNC_ON_STARTUP'] = 'false'
+
+    from app import create_app
+    from app.extensions import mongo
+    from app.models.indexes import Indexes
+    from app.models.message import Message
+
+    app = create_app()
+    rng = random.Random(args.seed)
+
+    with app.app_context():
+        seed(mongo.db, args.messages, args.users, args.batch_size, rng)
+
+        print('Building indexes...')
+        started = time.perf_counter()
+        print(Indexes.ensure())
+        print(f"Indexes ready in {time.perf_counter() - started:.1f}s")
+
+        user_ids = [user['_id'] for user in mongo.db.users.aggregate([{'$sample': {'size': args.samples}}])]
+        samples = [
+            (str(rng.choice(user_ids)), ' '.join(rng.sample(VOCABULARY, rng.randint(1, 2))))
+            for _ in range(args.samples)
+        ]
+
+        def regex_search(user_id, query):
+            chat_ids = [c['_id'] for c in mongo.db.chats.find({'user_id': ObjectId(user_id)}, {'_id': 1})]
+            return list(
+                mongo.db.messages.find({'chat_id': {'$in': chat_ids}, 'text': {'$regex': query, '$options': 'i'}})
+                .sort('created_at', -1)
+                .limit(20)
+            )
+
+        _report('text', _timed(lambda user_id, query: Message.search_messages(user_id, query, 20), samples))
+        _report('regex', _timed(regex_search, samples[:args.regex_samples]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+from app import create_app
+from app.extensions import celery
+
+# Load configuration (broker, queues, routes) into the shared Celery instance
+app = create_app()
@@ -1,34 +1,21 @@
-// Initialize database with collections and indexes
+// Initialize database with collections and the admin user
 db = db.getSiblingDB('learning_platform');
 
 // Create collections
 db.createCollection('users');
 db.createCollection('tutors');
+db.createCollection('tutor_ratings');
 db.createCollection('chats');
 db.createCollection('messages');
 db.createCollection('ratings');
-
-// Create indexes for better performance
-db.users.createIndex({ "email": 1 }, { unique: true });
-db.users.createIndex({ "student_id": 1 });
-db.users.createIndex({ "role": 1 });
-db.users.createIndex({ "is_verified": 1 });
-
-db.tutors.createIndex({ "subjects": 1 });
-db.tutors.createIndex({ "school": 1 });
-db.tutors.createIndex({ "gpa": -1 });
-
-db.chats.createIndex({ "user_id": 1 });
-db.chats.createIndex({ "created_at": -1 });
-db.chats.createIndex({ "is_ai_session": 1 });
-
-db.messages.createIndex({ "chat_id": 1 });
-db.messages.createIndex({ "created_at": -1 });
-db.messages.createIndex({ "sender": 1 });
-
-db.ratings.createIndex({ "chat_id": 1 });
-db.ratings.createIndex({ "user_id": 1 });
-db.ratings.createIndex({ "rating": 1 });
+db.createCollection('chat_summaries');
+db.createCollection('quiz_cache');
+db.createCollection('bulk_jobs');
+db.createCollection('notification_outbox');
+
+// Indexes are declared on the models (INDEXES in backend/app/models) and built
+// when the app starts, or with `flask ensure-indexes`; TTL indexes and the
+// monthly notifications_YYYYMM partitions follow RETENTION_POLICIES in app/config.py
 
 // Create admin user
 db.users.insertOne({
@@ -4,6 +4,7 @@ from getpass import getpass
 from datetime import datetime
 
 from app.config import config
+from app.utils.helpers import normalize_school
 from werkzeug.security import generate_password_hash
 
 
@@ -42,6 +43,7 @@ def seed_database(client, data):
                 'name': admin.get('name', 'Admin').strip(),
                 'role': 'admin',
                 'school': admin.get('school', '').strip(),
+                'school_key': normalize_school(admin.get('school')),
                 'student_id': admin.get('student_id', '').strip(),
                 'is_verified': True,
                 'created_at': datetime.utcnow(),
@@ -65,6 +67,7 @@ def seed_database(client, data):
             'name': s.get('name', '').strip(),
             'role': 'student',
             'school': s.get('school', '').strip(),
+            'school_key': normalize_school(s.get('school')),
             'student_id': s.get('student_id', '').strip(),
             'is_verified': bool(s.get('is_verified', False)),
             'created_at': datetime.utcnow(),
@@ -0,0 +1,194 @@
+"""Shared fixtures for tests that run against a real MongoDB.
+
+Point ``TEST_MONGO_URI`` at a disposable database; it is dropped after the
+session. Tests are skipped when the backend dependencies are not installed
+or MongoDB is unreachable.
+"""
+from datetime import datetime, timedelta
+import os
+import random
+import pytest
+
+QUERY_COMMANDS = ('find', 'aggregate', 'count', 'distinct')
+
+class QueryRecorder:
+    """Read commands sent to MongoDB, captured by a pymongo CommandListener."""
+
+    def __init__(self):
+        self.commands = []
+
+    def record(self, event):
+        if event.command_name in QUERY_COMMANDS:
+            self.commands.append((event.command_name, event.database_name, dict(event.command)))
+
+    def clear(self):
+        self.commands = []
+
+    @property
+    def count(self) -> int:
+        return len(self.commands)
+
+_recorder = QueryRecorder()
+
+def _register_listener():
+    from pymongo import monitoring
+
+    class Listener(monitoring.CommandListener):
+        def started(self, event):
+            _recorder.record(event)
+
+        def succeeded(self, event):
+            pass
+
+        def failed(self, event):
+            pass
+
+    monitoring.register(Listener())
+
+@pytest.fixture(scope='session')
+def app():
+    pytest.importorskip('flask_pymongo')
+    pytest.importorskip('celery')
+    from pymongo import MongoClient
+
+    uri = os.environ.get('TEST_MONGO_URI', 'mongodb://localhost:27017/learning_platform_test')
+    try:
+        MongoClient(uri, serverSelectionTimeoutMS=2000).admin.command('ping')
+    except Exception as e:
+        pytest.skip(f"MongoDB is not reachable at {uri}: {e}")
+
+    # Listeners only apply to clients created after registration
+    _register_listener()
+
+    from app import create_app
+    from app.extensions import mongo
+
+    app = create_app('testing')
+    with app.app_context():
+        mongo.cx.drop_database(mongo.db.name)
+        yield app
+        mongo.cx.drop_database(mongo.db.name)
+
+@pytest.fixture(scope='session')
+def dataset(app):
+    """Seed a realistically shaped dataset and build the declared indexes.
+
+    Returns the ids the tests query by.
+    """
+    from bson import ObjectId
+    from app.extensions import mongo
+    from app.models.indexes import Indexes
+    from app.models.school import School
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    schools = ['MIT', 'Stanford', 'Berkeley', 'Harvard', 'Oxford']
+    subjects = ['math', 'physics', 'chemistry', 'biology', 'history', 'english', 'programming']
+
+    users = [
+        {
+            '_id': ObjectId(),
+            'email': f'student{i}@uni.edu',
+            'password_hash': 'x',
+            'name': f'Student {i}',
+            'role': 'student',
+            'school': rng.choice(schools),
+            'student_id': f'S{i:05d}',
+            'is_verified': rng.random() < 0.8,
+            'created_at': now - timedelta(days=rng.randint(0, 365)),
+            'last_login': None
+        }
+        for i in range(300)
+    ]
+    mongo.db.users.insert_many(users)
+
+    tutors = [
+        {
+            '_id': ObjectId(),
+            'name': f'Tutor {i}',
+            'subjects': rng.sample(subjects, rng.randint(1, 3)),
+            'hourly_rate': rng.randint(15, 80),
+            'school': rng.choice(schools),
+            'gpa': round(rng.uniform(2.5, 4.0), 2),
+            'contact_info': {'email': f'tutor{i}@uni.edu', 'phone': ''},
+            'created_by_admin': ObjectId(),
+            'created_at': now - timedelta(days=rng.randint(0, 365)),
+            'is_active': rng.random() < 0.9,
+            'rating_average': round(rng.uniform(0, 5), 2),
+            'total_sessions': rng.randint(0, 200)
+        }
+        for i in range(120)
+    ]
+    mongo.db.tutors.insert_many(tutors)
+
+    chats, messages, ratings = [], [], []
+    for user in users:
+        for _ in range(rng.randint(1, 6)):
+            started = now - timedelta(days=rng.randint(0, 180), minutes=rng.randint(0, 1440))
+            chat = {
+                '_id': ObjectId(),
+                'user_id': user['_id'],
+                'title': f'Chat about {rng.choice(subjects)}',
+                'is_ai_session': True,
+                'ai_model': 'gemini-pro',
+                'created_at': started,
+                'message_count': 0,
+                'total_tokens': 0
+            }
+            for n in range(rng.randint(2, 60)):
+                sender = 'user' if n % 2 == 0 else 'ai'
+                message = {
+                    '_id': ObjectId(),
+                    'chat_id': chat['_id'],
+                    'user_id': user['_id'],
+                    'sender': sender,
+                    'text': f'{rng.choice(subjects)} question {n} ' + 'lorem ipsum ' * rng.randint(1, 20),
+                    'tokens_used': rng.randint(10, 800) if sender == 'ai' else 0,
+                    'metadata': {},
+                    'created_at': started + timedelta(minutes=n),
+                    'is_edited': False,
+                    'edited_at': None
+                }
+                messages.append(message)
+                chat['message_count'] += 1
+                chat['total_tokens'] += message['tokens_used']
+                if sender == 'ai' and rng.random() < 0.3:
+                    ratings.append({
+                        '_id': ObjectId(),
+                        'chat_id': chat['_id'],
+                        'message_id': message['_id'],
+                        'user_id': user['_id'],
+                        'rating': rng.randint(1, 5),
+                        'feedback': 'helpful' if rng.random() < 0.4 else None,
+                        'created_at': message['created_at'] + timedelta(minutes=1)
+                    })
+            chat['last_activity'] = messages[-1]['created_at']
+            chats.append(chat)
+
+    mongo.db.chats.insert_many(chats)
+    mongo.db.messages.insert_many(messages)
+    mongo.db.ratings.insert_many(ratings)
+
+    # Fills in school_key and the schools registry
+    School.rebuild()
+    Indexes.ensure()
+
+    busiest_chat = max(chats, key=lambda chat: chat['message_count'])
+    chat_messages = [m for m in messages if m['chat_id'] == busiest_chat['_id']]
+    ai_message = next(m for m in chat_messages if m['sender'] == 'ai')
+
+    return {
+        'user': users[0],
+        'tutor': tutors[0],
+        'chat': busiest_chat,
+        'messages': chat_messages,
+        'ai_message': ai_message,
+        'now': now
+    }
+
+@pytest.fixture
+def query_recorder(app):
+    """Commands issued during the test, most recent last."""
+    _recorder.clear()
+    yield _recorder
+    _recorder.clear()
@@ -0,0 +1,41 @@
+"""Chat history must cost a constant number of MongoDB round trips per page."""
+import pytest
+
+# Chat lookup, message page, message count and one batched rating lookup
+EXPECTED_QUERIES = 4
+
+def _history(dataset, **kwargs):
+    from app.controllers.student_controller import StudentController
+
+    chat = dataset['chat']
+    result = StudentController.get_chat_history(str(chat['user_id']), str(chat['_id']), **kwargs)
+    assert result['success'], result
+    return result
+
+@pytest.mark.parametrize('per_page', [2, 10, 50])
+def test_page_query_count_is_constant(app, dataset, query_recorder, per_page):
+    result = _history(dataset, page=1, per_page=per_page)
+
+    assert len(result['messages']) == min(per_page, dataset['chat']['message_count'])
+    assert query_recorder.count == EXPECTED_QUERIES, query_recorder.commands
+
+@pytest.mark.parametrize('per_page', [2, 10, 50])
+def test_cursor_query_count_is_constant(app, dataset, query_recorder, per_page):
+    first_page = _history(dataset, page=1, per_page=per_page)
+    query_recorder.clear()
+
+    _history(dataset, per_page=per_page, after=first_page['pagination']['after'])
+
+    assert query_recorder.count == EXPECTED_QUERIES, query_recorder.commands
+
+def test_ratings_are_attached(app, dataset):
+    from app.extensions import mongo
+
+    result = _history(dataset, page=1, per_page=100)
+    rated = {
+        str(rating['message_id'])
+        for rating in mongo.db.ratings.find({'chat_id': dataset['chat']['_id']})
+    }
+
+    returned = {message['id'] for message in result['messages'] if 'rating' in message}
+    assert returned == rated & {message['id'] for message in result['messages']}
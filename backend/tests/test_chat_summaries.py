@@ -0,0 +1,58 @@
+"""Incremental summaries must cover every message and never outlive an edit."""
+import math
+
+class FakeModel:
+    """Stands in for the Gemini model, counting calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        return type('Response', (), {'text': f'summary {self.calls}'})()
+
+def _watermark_at(message):
+    return {'summary': 'old', 'last_message_id': message['_id'], 'last_message_at': message['created_at']}
+
+def test_summary_catches_up_in_batches(app, dataset):
+    from app.tasks.ai_tasks import summarize_chat, SUMMARY_BATCH_SIZE
+
+    messages = dataset['messages']
+    model = FakeModel()
+    summary, first_message = summarize_chat(model, str(dataset['chat']['_id']), _watermark_at(messages[0]))
+
+    assert model.calls == math.ceil((len(messages) - 1) / SUMMARY_BATCH_SIZE)
+    assert first_message['_id'] == messages[1]['_id']
+    assert summary['last_message_id'] == messages[-1]['_id']
+
+def test_summary_of_caught_up_chat_is_empty(app, dataset):
+    from app.tasks.ai_tasks import summarize_chat
+
+    model = FakeModel()
+    summary, _ = summarize_chat(model, str(dataset['chat']['_id']), _watermark_at(dataset['messages'][-1]))
+
+    assert summary is None
+    assert model.calls == 0
+
+def test_edit_discards_summary(app, dataset):
+    from app.models.message import Message
+    from app.models.summary import ChatSummary
+
+    chat = dataset['chat']
+    last = dataset['messages'][-1]
+    ChatSummary.upsert(str(chat['_id']), 'summary', chat['message_count'], last['_id'], last['created_at'])
+    assert ChatSummary.is_current(ChatSummary.find_by_chat(str(chat['_id'])), chat)
+
+    assert Message.update_message(str(last['_id']), last['text'])
+
+    assert ChatSummary.find_by_chat(str(chat['_id'])) is None
+
+def test_summary_stops_at_deadline(app, dataset):
+    from app.tasks.ai_tasks import summarize_chat, SUMMARY_BATCH_SIZE
+
+    messages = dataset['messages']
+    model = FakeModel()
+    summary, _ = summarize_chat(model, str(dataset['chat']['_id']), _watermark_at(messages[0]), deadline=0)
+
+    assert model.calls == 1
+    assert summary['caught_up'] == (len(messages) - 1 < SUMMARY_BATCH_SIZE)
@@ -0,0 +1,28 @@
+"""Declared indexes must be built under their names and recognized once built."""
+
+def test_ensure_leaves_nothing_missing(app, dataset):
+    from app.models.indexes import Indexes
+
+    diff = Indexes.diff()
+
+    assert diff['missing'] == {}
+    assert diff['conflicts'] == []
+
+def test_declared_names_are_kept(app, dataset):
+    from app.extensions import mongo
+    from app.models.indexes import Indexes
+
+    for collection, indexes in Indexes.declared().items():
+        existing = mongo.db[collection].index_information()
+        for index in indexes:
+            assert index.document['name'] in existing, (collection, index.document['name'])
+
+def test_text_index_is_declared_in_report(app, dataset):
+    from app.models.indexes import Indexes
+
+    undeclared = {
+        finding['index'] for finding in Indexes.report()
+        if finding['collection'] == 'messages' and finding['issue'] == 'undeclared'
+    }
+
+    assert 'user_text_search' not in undeclared
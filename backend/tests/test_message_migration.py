@@ -0,0 +1,20 @@
+"""migrate-message-users must replace whichever legacy text index exists."""
+import pytest
+
+@pytest.mark.parametrize('legacy_name', ['text_search', None])  # None: server default, text_text
+def test_migration_replaces_legacy_text_index(app, dataset, legacy_name):
+    from pymongo import TEXT
+    from app.extensions import mongo
+    from app.models.message import Message
+
+    mongo.db.messages.drop_index(Message.TEXT_INDEX)
+    options = {'name': legacy_name} if legacy_name else {}
+    mongo.db.messages.create_index([('text', TEXT)], default_language='english', **options)
+
+    result = app.test_cli_runner().invoke(args=['migrate-message-users'])
+
+    assert result.exit_code == 0, result.output
+    text_indexes = [
+        name for name, info in mongo.db.messages.index_information().items() if 'weights' in info
+    ]
+    assert text_indexes == [Message.TEXT_INDEX]
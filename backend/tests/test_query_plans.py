@@ -0,0 +1,202 @@
+"""Explain-plan regression suite for the model finders.
+
+Every query a finder issues is re-run through ``explain`` (executionStats)
+and fails when the winning plan:
+
+- scans the whole collection (COLLSCAN),
+- sorts documents in memory instead of reading them in index order, or
+- examines more than ``EXPLAIN_MAX_EXAMINED_RATIO`` documents per document
+  returned (aggregations that ``$group`` are exempt from this check).
+
+Known, deliberate exceptions go in ``ALLOWED`` with the reason.
+"""
+from datetime import timedelta
+import os
+import pytest
+
+MAX_EXAMINED_RATIO = float(os.environ.get('EXPLAIN_MAX_EXAMINED_RATIO', 10))
+
+SESSION_FIELDS = ('lsid', 'txnNumber', 'autocommit', 'startTransaction')
+
+# finder -> plan issues it may have, and why
+ALLOWED = {
+    'Tutor.search_tutors[school]': {'sort'},  # the school_key prefix range precedes the ranking
+    'Tutor.get_recommendations[subjects]': {'sort'},  # sorts on the computed subject_match_count
+    'School.suggest[fuzzy]': {'sort'},  # ranks by the computed trigram overlap
+    'Message.search_messages': {'sort', 'examined'},  # textScore relevance is computed per match
+    'Rating.get_average_rating': {'collscan'},  # platform-wide aggregate
+    'Rating.get_rating_distribution': {'collscan'},  # platform-wide aggregate
+}
+
+def _finders():
+    from app.models import User, Tutor, Chat, Message, Rating, UsageBucket, School
+    from app.models.tutor_catalog import TutorCatalog
+
+    def oid(document):
+        return str(document['_id'])
+
+    return {
+        'User.find_by_email': lambda d: User.find_by_email(d['user']['email']),
+        'User.find_by_id': lambda d: User.find_by_id(oid(d['user'])),
+        'User.find_all_students': lambda d: User.find_all_students(),
+        'User.find_all_students[verified]': lambda d: User.find_all_students(verified_only=True),
+        'User.email_exists': lambda d: User.email_exists(d['user']['email']),
+
+        'Tutor.find_by_id': lambda d: Tutor.find_by_id(oid(d['tutor'])),
+        'Tutor.find_all': lambda d: Tutor.find_all(),
+        'Tutor.find_all[inactive]': lambda d: Tutor.find_all(active_only=False),
+        'Tutor.find_by_subjects': lambda d: Tutor.find_by_subjects(['math', 'physics']),
+        'Tutor.search_tutors[gpa,subjects]': lambda d: Tutor.search_tutors(min_gpa=3.0, subjects=['math']),
+        'Tutor.search_tutors[school]': lambda d: Tutor.search_tutors(school='MIT'),
+        'Tutor.search_tutors[max_rate,page]': lambda d: Tutor.search_tutors(
+            max_rate=40, limit=21, after=(d['tutor']['gpa'], d['tutor']['rating_average'], d['tutor']['_id'])
+        ),
+        'Tutor.get_recommendations': lambda d: Tutor.get_recommendations([]),
+        'Tutor.get_recommendations[subjects]': lambda d: Tutor.get_recommendations(['math', 'history']),
+        'TutorCatalog._load': lambda d: TutorCatalog._load(),
+
+        'Chat.find_by_id': lambda d: Chat.find_by_id(oid(d['chat'])),
+        'Chat.find_by_user': lambda d: Chat.find_by_user(oid(d['user'])),
+        'Chat.find_titles': lambda d: Chat.find_titles([d['chat']['_id']]),
+        'Chat.get_user_stats': lambda d: Chat.get_user_stats(oid(d['user'])),
+
+        'Message.find_by_id': lambda d: Message.find_by_id(oid(d['ai_message'])),
+        'Message.find_with_chat_owner': lambda d: Message.find_with_chat_owner(oid(d['ai_message'])),
+        'Message.find_by_chat': lambda d: Message.find_by_chat(oid(d['chat']), limit=20),
+        'Message.get_latest_messages': lambda d: Message.get_latest_messages(oid(d['chat'])),
+        'Message.find_after': lambda d: Message.find_after(
+            oid(d['chat']), d['messages'][10]['created_at'], d['messages'][10]['_id'], limit=20
+        ),
+        'Message.find_before': lambda d: Message.find_before(
+            oid(d['chat']), d['messages'][-10]['created_at'], d['messages'][-10]['_id'], limit=20
+        ),
+        'Message.count_by_chat': lambda d: Message.count_by_chat(oid(d['chat'])),
+        'Message.get_ai_messages_for_rating': lambda d: Message.get_ai_messages_for_rating(oid(d['chat'])),
+        'Message.search_messages': lambda d: Message.search_messages(oid(d['user']), 'math question'),
+        'Message.get_token_usage_stats': lambda d: Message.get_token_usage_stats(),
+        'Message.get_token_usage_stats[user]': lambda d: Message.get_token_usage_stats(oid(d['user'])),
+        'Message.get_token_usage_stats[date]': lambda d: Message.get_token_usage_stats(
+            date_from=d['now'] - timedelta(days=7)
+        ),
+
+        'Rating.find_by_message': lambda d: Rating.find_by_message(oid(d['ai_message'])),
+        'Rating.find_by_messages': lambda d: Rating.find_by_messages(
+            [m['_id'] for m in d['messages'] if m['sender'] == 'ai'], oid(d['user'])
+        ),
+        'Rating.find_by_user': lambda d: Rating.find_by_user(oid(d['user'])),
+        'Rating.get_average_rating': lambda d: Rating.get_average_rating(),
+        'Rating.get_rating_distribution': lambda d: Rating.get_rating_distribution(),
+        'Rating.get_user_rating_stats': lambda d: Rating.get_user_rating_stats(oid(d['user'])),
+        'Rating.get_recent_feedback': lambda d: Rating.get_recent_feedback(),
+
+        'School.suggest': lambda d: School.suggest('sta'),
+        'School.suggest[fuzzy]': lambda d: School.suggest('stanfrod'),
+
+        'UsageBucket.usage': lambda d: UsageBucket.usage(d['now'] - timedelta(days=30)),
+        'UsageBucket.usage[user]': lambda d: UsageBucket.usage(d['now'] - timedelta(days=30), user_id=oid(d['user'])),
+    }
+
+FINDER_NAMES = [
+    'User.find_by_email', 'User.find_by_id', 'User.find_all_students',
+    'User.find_all_students[verified]', 'User.email_exists',
+    'Tutor.find_by_id', 'Tutor.find_all', 'Tutor.find_all[inactive]', 'Tutor.find_by_subjects',
+    'Tutor.search_tutors[gpa,subjects]', 'Tutor.search_tutors[school]', 'Tutor.search_tutors[max_rate,page]',
+    'Tutor.get_recommendations', 'Tutor.get_recommendations[subjects]',
+    'TutorCatalog._load',
+    'Chat.find_by_id', 'Chat.find_by_user', 'Chat.find_titles', 'Chat.get_user_stats',
+    'Message.find_by_id', 'Message.find_with_chat_owner', 'Message.find_by_chat', 'Message.get_latest_messages',
+    'Message.find_after', 'Message.find_before', 'Message.count_by_chat', 'Message.get_ai_messages_for_rating',
+    'Message.search_messages', 'Message.get_token_usage_stats',
+    'Message.get_token_usage_stats[user]', 'Message.get_token_usage_stats[date]',
+    'Rating.find_by_message', 'Rating.find_by_messages', 'Rating.find_by_user', 'Rating.get_average_rating',
+    'Rating.get_rating_distribution', 'Rating.get_user_rating_stats', 'Rating.get_recent_feedback',
+    'School.suggest', 'School.suggest[fuzzy]',
+    'UsageBucket.usage', 'UsageBucket.usage[user]',
+]
+
+def _explain(db, command: dict) -> dict:
+    command = {
+        key: value for key, value in command.items()
+        if not key.startswith('$') and key not in SESSION_FIELDS
+    }
+    return db.command({'explain': command, 'verbosity': 'executionStats'})
+
+def _find_all(node, key):
+    """Yield every value stored under ``key``, ignoring rejected plans."""
+    if isinstance(node, dict):
+        for k, value in node.items():
+            if k in ('rejectedPlans', 'allPlansExecution'):
+                continue
+            if k == key:
+                yield value
+            yield from _find_all(value, key)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _find_all(item, key)
+
+def _stages(plan):
+    """Yield (stage name, subtree) for every node of a winning plan."""
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage'], plan
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+def plan_issues(explain: dict, command_name: str, command: dict) -> dict:
+    """Return {issue: detail} for one explained command."""
+    issues = {}
+    grouped = command_name == 'aggregate' and any('$group' in stage for stage in command.get('pipeline', []))
+
+    for plan in _find_all(explain, 'winningPlan'):
+        for stage, subtree in _stages(plan):
+            if stage == 'COLLSCAN':
+                issues['collscan'] = f"COLLSCAN on {command.get(command_name)}"
+            elif stage == 'SORT':
+                # Sorting the output of a pushed-down $group is not a document sort
+                if not any(name == 'GROUP' for name, _ in _stages(subtree.get('inputStage', {}))):
+                    issues['sort'] = f"in-memory SORT by {subtree.get('sortPattern')}"
+            elif stage == 'GROUP':
+                grouped = True
+
+    # $sort stages left in the pipeline run in memory unless they sort $group output
+    seen_group = False
+    for stage in explain.get('stages', []):
+        if '$group' in stage:
+            seen_group = True
+        elif '$sort' in stage and not seen_group:
+            issues['sort'] = f"in-memory $sort by {stage['$sort'].get('sortKey')}"
+
+    if not grouped:
+        for stats in _find_all(explain, 'executionStats'):
+            examined = stats.get('totalDocsExamined', 0)
+            returned = max(stats.get('nReturned', 0), 1)
+            if examined / returned > MAX_EXAMINED_RATIO:
+                issues['examined'] = f"examined {examined} documents to return {returned}"
+            break
+
+    return issues
+
+@pytest.mark.parametrize('finder', FINDER_NAMES)
+def test_finder_uses_indexes(app, dataset, query_recorder, finder):
+    from app.extensions import mongo
+
+    _finders()[finder](dataset)
+    commands = list(query_recorder.commands)
+    assert commands, f"{finder} issued no queries"
+
+    allowed = ALLOWED.get(finder, set())
+    problems = []
+    for command_name, database, command in commands:
+        explain = _explain(mongo.cx[database], command)
+        for issue, detail in plan_issues(explain, command_name, command).items():
+            if issue not in allowed:
+                problems.append(f"{command_name} {command.get(command_name)}: {detail}")
+
+    assert not problems, f"{finder}: " + '; '.join(problems)
+
+def test_allowlist_is_current():
+    """Entries for finders that no longer exist would hide nothing and rot."""
+    assert set(ALLOWED) <= set(FINDER_NAMES)
@@ -0,0 +1,27 @@
+"""Rating a message must cost one read and one upsert, whatever its history."""
+
+def _rate(dataset, rating, user_id=None):
+    from app.controllers.student_controller import StudentController
+
+    user_id = user_id or str(dataset['ai_message']['user_id'])
+    return StudentController.rate_ai_response(user_id, str(dataset['ai_message']['_id']), rating)
+
+def test_rating_reads_once(app, dataset, query_recorder):
+    first = _rate(dataset, 4)
+    assert first['success'], first
+    assert query_recorder.count == 1, query_recorder.commands
+
+    query_recorder.clear()
+    second = _rate(dataset, 2)
+
+    assert second['success'], second
+    assert second['rating_id'] == first['rating_id']
+    assert query_recorder.count == 1, query_recorder.commands
+
+def test_rating_requires_chat_owner(app, dataset):
+    from bson import ObjectId
+
+    result = _rate(dataset, 5, user_id=str(ObjectId()))
+
+    assert not result['success']
+    assert result['message'] == 'Access denied'
@@ -0,0 +1,44 @@
+"""School names are matched on a normalized key, by prefix or by trigrams."""
+import pytest
+
+def test_normalize_school():
+    pytest.importorskip('bson')
+    from app.utils.helpers import normalize_school
+
+    assert normalize_school('  Université de  Montréal ') == 'universite de montreal'
+    assert normalize_school('M.I.T.') == normalize_school('mit') == 'mit'
+    assert normalize_school('St. John’s College') == 'st johns college'
+    assert normalize_school('Texas A&M') == 'texas a m'
+    assert normalize_school(None) == ''
+
+def test_trigrams():
+    pytest.importorskip('bson')
+    from app.utils.helpers import trigrams
+
+    assert trigrams('mit') == ['  m', ' mi', 'it ', 'mit']
+    assert trigrams('') == []
+
+def test_suggest_prefix(app, dataset):
+    from app.models import School
+
+    suggestions = School.suggest('STAN')
+
+    assert [s['name'] for s in suggestions][:1] == ['Stanford']
+    assert suggestions[0]['match'] == 'prefix'
+    assert suggestions[0]['tutors'] > 0
+    assert 'students' not in suggestions[0]
+
+def test_suggest_fuzzy(app, dataset):
+    from app.models import School
+
+    suggestions = School.suggest('Stanfrod')
+
+    assert 'Stanford' in [s['name'] for s in suggestions if s['match'] == 'fuzzy']
+
+def test_search_tutors_by_school_key(app, dataset):
+    from app.models import Tutor
+
+    tutors = Tutor.search_tutors(school='mit')
+
+    assert tutors
+    assert all(tutor['school'] == 'MIT' for tutor in tutors)
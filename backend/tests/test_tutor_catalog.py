@@ -0,0 +1,85 @@
+"""Tutor catalog endpoints must be served from the in-process snapshot."""
+import pytest
+
+@pytest.fixture
+def catalog(app, dataset):
+    from app.models import TutorCatalog
+
+    TutorCatalog.invalidate()
+    TutorCatalog.get()
+    return TutorCatalog
+
+def test_catalog_reads_skip_mongo(catalog, dataset, query_recorder):
+    from app.controllers.student_controller import StudentController
+    from app.controllers.tutor_controller import TutorController
+
+    results = [
+        TutorController.get_all_tutors(),
+        TutorController.get_tutor_by_id(str(dataset['tutor']['_id'])),
+        TutorController.search_tutors(school='MIT', min_gpa=3.0, subjects=['math']),
+        TutorController.get_tutors_by_subjects(['math', 'physics']),
+        TutorController.get_top_tutors(10, 'rating'),
+        TutorController.get_available_subjects(),
+        StudentController.get_recommended_tutors(str(dataset['user']['_id']), ['math']),
+        StudentController.get_recommended_tutors(str(dataset['user']['_id'])),
+    ]
+
+    assert all(result['success'] for result in results), results
+    assert query_recorder.count == 0, query_recorder.commands
+
+def test_catalog_matches_queries(catalog, dataset):
+    from app.controllers.tutor_controller import TutorController
+    from app.models import Tutor
+
+    searched = TutorController.search_tutors(min_gpa=3.0, subjects=['math'], limit=20)['tutors']
+    expected = Tutor.search_tutors(min_gpa=3.0, subjects=['math'], limit=20)
+    assert [t['id'] for t in searched] == [str(t['_id']) for t in expected]
+
+    top = TutorController.get_top_tutors(5, 'sessions')['tutors']
+    sessions = [t['total_sessions'] for t in top]
+    assert sessions == sorted(sessions, reverse=True)
+
+def test_search_pages_cover_every_match(catalog, dataset):
+    from app.controllers.tutor_controller import TutorController
+    from app.models import Tutor
+
+    pages, after = [], None
+    while True:
+        result = TutorController.search_tutors(max_rate=60, limit=7, after=after)
+        assert result['success'], result
+        assert len(result['tutors']) <= 7
+        pages.extend(t['id'] for t in result['tutors'])
+        after = result['pagination']['after']
+        if not result['pagination']['has_more']:
+            break
+
+    assert pages == [str(t['_id']) for t in Tutor.search_tutors(max_rate=60)]
+
+def test_admin_write_refreshes_catalog(catalog, dataset):
+    from bson import ObjectId
+    from app.controllers.admin_controller import AdminController
+    from app.controllers.tutor_controller import TutorController
+
+    result = AdminController.add_tutor(str(ObjectId()), {
+        'name': 'Catalog Tutor', 'subjects': ['astronomy'], 'hourly_rate': 40, 'school': 'MIT',
+        'gpa': 3.9, 'contact_info': {'email': 'catalog@uni.edu'}
+    })
+    assert result['success'], result
+
+    subjects = {entry['subject'] for entry in TutorController.get_available_subjects()['subjects']}
+    assert 'astronomy' in subjects
+
+@pytest.mark.parametrize('sort_by, sort', [
+    ('gpa', [('gpa', -1), ('rating_average', -1)]),
+    ('rating', [('rating_average', -1), ('gpa', -1)]),
+    ('sessions', [('total_sessions', -1), ('gpa', -1)]),
+])
+def test_top_tutors_match_indexed_sort(catalog, dataset, sort_by, sort):
+    from app.controllers.tutor_controller import TutorController
+    from app.extensions import mongo
+
+    top = TutorController.get_top_tutors(10, sort_by)['tutors']
+    expected = mongo.db.tutors.find({'is_active': True}).sort(sort).limit(10)
+
+    key = [field for field, _ in sort]
+    assert [[t[f] for f in key] for t in top] == [[t[f] for f in key] for t in expected]
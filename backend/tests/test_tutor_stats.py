@@ -0,0 +1,76 @@
+"""Tutor rating statistics must stay exact under concurrent updates."""
+from concurrent.futures import ThreadPoolExecutor
+
+def _new_tutor():
+    from bson import ObjectId
+    from app.models import Tutor
+
+    return Tutor(
+        name='Concurrent Tutor', subjects=['math'], hourly_rate=30, school='MIT', gpa=3.5,
+        contact_info={'email': 'concurrent@uni.edu', 'phone': ''}, created_by_admin=str(ObjectId())
+    ).save()
+
+def test_concurrent_ratings_are_not_lost(app, dataset):
+    from app.models import Tutor
+
+    tutor_id = _new_tutor()
+    ratings = [(i % 5) + 1 for i in range(40)]
+
+    def rate(rating):
+        with app.app_context():
+            return Tutor.update_stats(tutor_id, rating)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(rate, ratings))
+
+    tutor = Tutor.find_by_id(tutor_id)
+    assert tutor['rating_count'] == len(ratings)
+    assert tutor['rating_sum'] == sum(ratings)
+    assert tutor['total_sessions'] == len(ratings)
+    assert tutor['rating_average'] == round(sum(ratings) / len(ratings), 2)
+
+def test_rebuild_restores_drifted_stats(app, dataset):
+    from bson import ObjectId
+    from app.extensions import mongo
+    from app.models import Tutor
+
+    tutor_id = _new_tutor()
+    for rating in (5, 4, 4):
+        Tutor.update_stats(tutor_id, rating)
+    mongo.db.tutors.update_one(
+        {'_id': ObjectId(tutor_id)},
+        {'$set': {'rating_sum': 1, 'rating_count': 9, 'rating_average': 0.11}}
+    )
+
+    Tutor.rebuild_stats()
+
+    tutor = Tutor.find_by_id(tutor_id)
+    assert (tutor['rating_sum'], tutor['rating_count'], tutor['rating_average']) == (13, 3, 4.33)
+
+def test_rebuild_keeps_unrated_tutors(app, dataset):
+    from app.models import Tutor
+
+    Tutor.rebuild_stats()
+
+    tutor = Tutor.find_by_id(str(dataset['tutor']['_id']))
+    assert tutor['rating_average'] == dataset['tutor']['rating_average']
+
+def test_first_rating_extends_imported_average(app, dataset):
+    from bson import ObjectId
+    from app.extensions import mongo
+    from app.models import Tutor
+
+    tutor_id = mongo.db.tutors.insert_one({
+        'name': 'Imported Tutor', 'subjects': ['math'], 'school': 'MIT', 'gpa': 3.2,
+        'is_active': False, 'rating_average': 4.0, 'total_sessions': 9
+    }).inserted_id
+
+    assert Tutor.update_stats(str(tutor_id), 5)
+    tutor = Tutor.find_by_id(str(tutor_id))
+    assert (tutor['rating_sum'], tutor['rating_count'], tutor['rating_average']) == (41, 10, 4.1)
+    assert tutor['total_sessions'] == 10
+
+    mongo.db.tutors.update_one({'_id': ObjectId(tutor_id)}, {'$set': {'rating_average': 0.0}})
+    Tutor.rebuild_stats()
+
+    assert Tutor.find_by_id(str(tutor_id))['rating_average'] == 4.1
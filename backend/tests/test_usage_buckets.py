@@ -0,0 +1,53 @@
+"""Usage buckets must agree with the messages they roll up."""
+from datetime import timedelta
+
+def _backfill(dataset):
+    from app.models import UsageBucket
+
+    now = dataset['now']
+    # Include today so every seeded message is covered
+    UsageBucket.backfill(now - timedelta(days=200), now + timedelta(days=1))
+
+def test_backfill_matches_messages(app, dataset):
+    from app.models import Message, UsageBucket
+
+    _backfill(dataset)
+    date_from = dataset['now'] - timedelta(days=30)
+
+    expected = Message.get_token_usage_stats(date_from=date_from.replace(minute=0, second=0, microsecond=0))
+    usage = UsageBucket.usage(date_from, dataset['now'] + timedelta(hours=1))
+
+    assert usage['granularity'] == 'hour'
+    assert usage['total_tokens'] == expected['total_tokens']
+    assert usage['total_messages'] == expected['total_messages']
+    assert len(usage['series']) <= 31 * 24
+
+def test_user_usage_matches_messages(app, dataset):
+    from app.models import Message, UsageBucket
+
+    _backfill(dataset)
+    user_id = str(dataset['user']['_id'])
+    date_from = (dataset['now'] - timedelta(days=200)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    expected = Message.get_token_usage_stats(user_id)
+    usage = UsageBucket.usage(date_from, dataset['now'] + timedelta(days=1), user_id=user_id)
+
+    assert usage['total_tokens'] == expected['total_tokens']
+    assert usage['total_messages'] == expected['total_messages']
+
+def test_record_increments_buckets(app, dataset):
+    from app.models import UsageBucket
+
+    _backfill(dataset)
+    user_id = str(dataset['user']['_id'])
+    date_from = dataset['now'] - timedelta(days=1)
+    date_to = dataset['now'] + timedelta(days=1)
+    before = UsageBucket.usage(date_from, date_to)
+
+    UsageBucket.record(user_id, 120, model='gemini-pro', school='MIT', latency=1.5, when=dataset['now'])
+    after = UsageBucket.usage(date_from, date_to)
+
+    assert after['total_tokens'] == before['total_tokens'] + 120
+    assert after['total_messages'] == before['total_messages'] + 1
+    assert after['by_model']['gemini-pro']['tokens'] == before['by_model'].get('gemini-pro', {}).get('tokens', 0) + 120
+    assert after['by_school']['MIT']['messages'] == before['by_school'].get('MIT', {}).get('messages', 0) + 1
@@ -0,0 +1,18 @@
+"""Statistics are built in full on first view, never from partial increments."""
+
+def test_first_view_rebuilds_after_increments(app, dataset):
+    from app.extensions import mongo
+    from app.controllers.student_controller import StudentController
+    from app.models.user_stats import UserStats
+
+    user = dataset['user']
+    mongo.db.user_stats.delete_one({'_id': user['_id']})
+
+    UserStats.record_activity(user['_id'], token_count=10)
+    assert UserStats.find_by_user(str(user['_id'])) is None
+
+    result = StudentController.get_profile(str(user['_id']))
+
+    assert result['success'], result
+    expected = mongo.db.chats.count_documents({'user_id': user['_id']})
+    assert UserStats.find_by_user(str(user['_id']))['total_chats'] == expected
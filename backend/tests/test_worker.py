@@ -0,0 +1,21 @@
+"""Per-process worker state must initialize outside a Flask app context."""
+import threading
+import pytest
+
+def test_get_model_outside_app_context(monkeypatch):
+    pytest.importorskip('flask_pymongo')
+    pytest.importorskip('celery')
+    pytest.importorskip('google.generativeai')
+    from app.tasks import worker
+
+    monkeypatch.setattr(worker, '_app', None)
+    monkeypatch.setattr(worker, '_model', None)
+    models = []
+
+    thread = threading.Thread(target=lambda: models.append(worker.get_model()), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive(), 'get_model() deadlocked building the worker app'
+    assert models and models[0] is worker.get_model()
+    assert worker.get_worker_app() is worker._app